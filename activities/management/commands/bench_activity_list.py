@@ -0,0 +1,165 @@
+import random
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from activities.views import ACTIVITY_LIST_FIELDS, ActivityListView
+
+STAR_FIELDS = ("situation", "task", "action", "result", "contribution")
+WORDS = ("경험", "프로젝트", "팀", "개선", "결과")
+
+
+def _text(words):
+    return " ".join(random.choice(WORDS) for _ in range(words))
+
+
+def _event(activity_id, event_id):
+    return {
+        "id": event_id,
+        "activity_id": activity_id,
+        "event_name": _text(4),
+        "start_date": "2025-01-01T00:00:00+00:00",
+        "end_date": "2025-02-01T00:00:00+00:00",
+        "created_at": "2025-01-01T00:00:00+00:00",
+        "updated_at": "2025-01-01T00:00:00+00:00",
+        **{field: _text(60) for field in STAR_FIELDS},
+    }
+
+
+def _activity(activity_id):
+    return {
+        "id": activity_id,
+        "user_id": "bench-user",
+        "activity_name": _text(3),
+        "category": "동아리",
+        "position": "팀장",
+        "description": _text(40),
+        "keywords": ["협업", "리더십"],
+        "file_list": None,
+        "favorite": False,
+        "start_date": "2025-01-01T00:00:00+00:00",
+        "end_date": "2025-06-01T00:00:00+00:00",
+        "last_visit": f"2025-06-01T00:00:{activity_id % 60:02d}+00:00",
+        "created_at": "2025-01-01T00:00:00+00:00",
+        "updated_at": "2025-01-01T00:00:00+00:00",
+    }
+
+
+def _legacy_card(activity):
+    # ActivityListView before pagination: every full event body embedded
+    return {
+        "id": activity.get("id"),
+        "title": activity.get("activity_name"),
+        "category": activity.get("category"),
+        "startDate": activity.get("start_date"),
+        "endDate": activity.get("end_date"),
+        "lastVisit": activity.get("last_visit"),
+        "isFavorite": activity.get("favorite", False),
+        "recentEvents": activity.get("event", []),
+        "event_count": len(activity.get("event", [])),
+    }
+
+
+def _page_row(activity, events, recent):
+    # What PostgREST returns for ActivityListView._activity_list_query
+    card_columns = (
+        "id",
+        "activity_name",
+        "category",
+        "start_date",
+        "end_date",
+        "last_visit",
+        "favorite",
+    )
+    summary_columns = ("id", "event_name", "start_date", "end_date")
+    return {
+        **{column: activity[column] for column in card_columns},
+        "event_count": [{"count": len(events)}],
+        "recent_events": [
+            {column: event[column] for column in summary_columns}
+            for event in events[:recent]
+        ],
+    }
+
+
+def _measure(build, runs):
+    timings, size = [], 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        size = len(JSONRenderer().render({"activities": build()}))
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), size
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the activity list response before and after pagination on a "
+        "synthetic archive: payload size and transform + JSON render time "
+        "(no database access)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--activities", type=int, default=500)
+        parser.add_argument(
+            "--events", type=int, default=20, help="Events per activity"
+        )
+        parser.add_argument(
+            "--page-sizes", type=int, nargs="+", default=[20, 50, 100]
+        )
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        random.seed(options["seed"])
+        recent = settings.ACTIVITY_RECENT_EVENTS
+        view = ActivityListView()
+
+        archive = []
+        event_id = 0
+        for activity_id in range(1, options["activities"] + 1):
+            events = []
+            for _ in range(options["events"]):
+                event_id += 1
+                events.append(_event(activity_id, event_id))
+            archive.append((_activity(activity_id), events))
+        legacy_rows = [{**activity, "event": events} for activity, events in archive]
+        page_rows = [
+            _page_row(activity, events, recent) for activity, events in archive
+        ]
+
+        self.stdout.write(
+            f"{options['activities']} activities x {options['events']} events, "
+            f"{recent} recent event summaries per card"
+        )
+        self.stdout.write(
+            f"{'response':>22} {'rows':>6} {'bytes':>11} {'p50 ms':>8}"
+        )
+
+        elapsed, size = _measure(
+            lambda: [_legacy_card(row) for row in legacy_rows], options["runs"]
+        )
+        self._row("full archive (before)", len(legacy_rows), size, elapsed)
+
+        for page_size in options["page_sizes"]:
+            rows = page_rows[:page_size]
+            elapsed, size = _measure(
+                lambda: [
+                    view._activity_card(row, ACTIVITY_LIST_FIELDS) for row in rows
+                ],
+                options["runs"],
+            )
+            self._row(f"page of {page_size}", len(rows), size, elapsed)
+
+        rows = page_rows[: options["page_sizes"][0]]
+        fields = ("id", "title", "event_count")
+        elapsed, size = _measure(
+            lambda: [view._activity_card(row, fields) for row in rows],
+            options["runs"],
+        )
+        self._row(f"page of {len(rows)}, 3 fields", len(rows), size, elapsed)
+
+    def _row(self, label, rows, size, elapsed):
+        self.stdout.write(f"{label:>22} {rows:>6} {size:>11,} {elapsed:>8.1f}")
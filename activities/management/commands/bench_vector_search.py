@@ -0,0 +1,164 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+BENCH_TABLE = "bench_activity_embedding"
+DIMENSIONS = 1536
+SEED_CHUNK = 10_000
+
+# Same query shapes as match_user_documents and the old global match_documents
+USER_SEARCH_SQL = f"""
+    WITH user_embeddings AS MATERIALIZED (
+        SELECT id, event_id, embedding FROM {BENCH_TABLE} WHERE user_id = %s
+    )
+    SELECT event_id, 1 - (embedding <=> %s::vector) AS similarity
+    FROM user_embeddings
+    ORDER BY embedding <=> %s::vector
+    LIMIT %s
+"""
+GLOBAL_SEARCH_SQL = f"""
+    SELECT event_id, 1 - (embedding <=> %s::vector) AS similarity
+    FROM {BENCH_TABLE}
+    ORDER BY embedding <=> %s::vector
+    LIMIT %s
+"""
+
+
+def _random_vector():
+    return "[" + ",".join(f"{random.uniform(-1, 1):.5f}" for _ in range(DIMENSIONS)) + "]"
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class Command(BaseCommand):
+    help = (
+        f"Seed synthetic embeddings into a scratch {BENCH_TABLE} table at growing "
+        "sizes and report p50/p99 latency of user-scoped vs global vector search"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=int,
+            nargs="+",
+            default=[10_000, 100_000, 1_000_000, 10_000_000],
+            help="Total row counts to measure at (ascending)",
+        )
+        parser.add_argument(
+            "--rows-per-user",
+            type=int,
+            default=50,
+            help="Synthetic events per user",
+        )
+        parser.add_argument(
+            "--queries", type=int, default=200, help="Queries per measurement"
+        )
+        parser.add_argument(
+            "--match-count", type=int, default=5, help="Results per query"
+        )
+        parser.add_argument(
+            "--global",
+            dest="global_search",
+            action="store_true",
+            help="Also measure the unscoped search through the HNSW index",
+        )
+        parser.add_argument(
+            "--keep", action="store_true", help=f"Keep {BENCH_TABLE} afterwards"
+        )
+
+    def handle(self, *args, **options):
+        rows_per_user = options["rows_per_user"]
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+            cursor.execute(
+                f"""
+                CREATE TABLE {BENCH_TABLE} (
+                    id bigserial PRIMARY KEY,
+                    user_id text NOT NULL,
+                    event_id bigint NOT NULL,
+                    embedding vector({DIMENSIONS}) NOT NULL
+                )
+                """
+            )
+            cursor.execute(f"CREATE INDEX ON {BENCH_TABLE} (user_id)")
+            if options["global_search"]:
+                cursor.execute(
+                    f"CREATE INDEX ON {BENCH_TABLE} USING hnsw "
+                    "(embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64)"
+                )
+
+            self.stdout.write(
+                f"{'rows':>10} {'user p50':>10} {'user p99':>10}"
+                + (f" {'global p50':>11} {'global p99':>11}" if options["global_search"] else "")
+            )
+            seeded = 0
+            try:
+                for size in sorted(options["sizes"]):
+                    while seeded < size:
+                        chunk = min(SEED_CHUNK, size - seeded)
+                        # Vectors are generated server-side; the correlated
+                        # WHERE makes Postgres build a fresh one per row
+                        cursor.execute(
+                            f"""
+                            INSERT INTO {BENCH_TABLE} (user_id, event_id, embedding)
+                            SELECT 'bench-user-' || (g / %s), g,
+                                   (SELECT array_agg(random() * 2 - 1)
+                                    FROM generate_series(1, {DIMENSIONS})
+                                    WHERE g IS NOT NULL)::vector
+                            FROM generate_series(%s, %s) AS g
+                            """,
+                            [rows_per_user, seeded, seeded + chunk - 1],
+                        )
+                        seeded += chunk
+                    cursor.execute(f"ANALYZE {BENCH_TABLE}")
+
+                    user_count = max(1, seeded // rows_per_user)
+                    user_times = self._measure(
+                        cursor,
+                        options["queries"],
+                        lambda vector: (
+                            USER_SEARCH_SQL,
+                            [
+                                f"bench-user-{random.randrange(user_count)}",
+                                vector,
+                                vector,
+                                options["match_count"],
+                            ],
+                        ),
+                    )
+                    line = (
+                        f"{seeded:>10} {_percentile(user_times, 50):>8.2f}ms "
+                        f"{_percentile(user_times, 99):>8.2f}ms"
+                    )
+                    if options["global_search"]:
+                        global_times = self._measure(
+                            cursor,
+                            options["queries"],
+                            lambda vector: (
+                                GLOBAL_SEARCH_SQL,
+                                [vector, vector, options["match_count"]],
+                            ),
+                        )
+                        line += (
+                            f" {_percentile(global_times, 50):>9.2f}ms "
+                            f"{_percentile(global_times, 99):>9.2f}ms"
+                        )
+                    self.stdout.write(line)
+            finally:
+                if not options["keep"]:
+                    cursor.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+
+    def _measure(self, cursor, queries, build_query):
+        timings = []
+        for _ in range(queries):
+            sql, params = build_query(_random_vector())
+            start = time.perf_counter()
+            cursor.execute(sql, params)
+            cursor.fetchall()
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings
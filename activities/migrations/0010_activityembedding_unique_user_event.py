@@ -0,0 +1,30 @@
+# Generated by Django 5.2.4 on 2026-10-18 18:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0009_remove_activityembedding_favorite'),
+        ('users', '0005_alter_profile_user_id_delete_supabaseuser'),
+    ]
+
+    operations = [
+        # Re-embedded events used to be inserted again instead of updated;
+        # keep only the newest row per (user_id, event_id) before adding the key
+        migrations.RunSQL(
+            sql="""
+                DELETE FROM activity_embedding a
+                USING activity_embedding b
+                WHERE a.user_id = b.user_id
+                  AND a.event_id = b.event_id
+                  AND (a.updated_at, a.id) < (b.updated_at, b.id);
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddConstraint(
+            model_name='activityembedding',
+            constraint=models.UniqueConstraint(fields=('user', 'event'), name='unique_activity_embedding_user_event'),
+        ),
+    ]
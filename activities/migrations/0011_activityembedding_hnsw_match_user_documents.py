@@ -0,0 +1,53 @@
+# Generated by Django 5.2.4 on 2026-10-18 18:48
+
+import pgvector.django.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0010_activityembedding_unique_user_event'),
+        ('users', '0005_alter_profile_user_id_delete_supabaseuser'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activityembedding',
+            index=pgvector.django.indexes.HnswIndex(ef_construction=64, fields=['embedding'], m=16, name='activity_embedding_hnsw_idx', opclasses=['vector_cosine_ops']),
+        ),
+        # User-scoped replacement for the global match_documents RPC. The
+        # user's rows are read through the user_id btree first (materialized
+        # so the planner cannot switch to a filtered HNSW scan, which could
+        # drop matches), so the cost follows one user's row count rather
+        # than the size of the whole table.
+        migrations.RunSQL(
+            sql="""
+                CREATE OR REPLACE FUNCTION match_user_documents(
+                    query_embedding vector(1536),
+                    match_user_id text,
+                    match_threshold float,
+                    match_count int
+                )
+                RETURNS TABLE (id bigint, event_id bigint, similarity float)
+                LANGUAGE sql STABLE
+                AS $$
+                    WITH user_embeddings AS MATERIALIZED (
+                        SELECT ae.id, ae.event_id, ae.embedding
+                        FROM activity_embedding ae
+                        WHERE ae.user_id = match_user_id
+                    )
+                    SELECT ue.id,
+                           ue.event_id,
+                           1 - (ue.embedding <=> query_embedding) AS similarity
+                    FROM user_embeddings ue
+                    WHERE 1 - (ue.embedding <=> query_embedding) > match_threshold
+                    ORDER BY ue.embedding <=> query_embedding
+                    LIMIT match_count;
+                $$;
+            """,
+            reverse_sql="""
+                DROP FUNCTION IF EXISTS match_user_documents(vector, text, float, int);
+            """,
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 19:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0011_activityembedding_hnsw_match_user_documents'),
+        ('users', '0005_alter_profile_user_id_delete_supabaseuser'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['user', '-last_visit', '-id'], name='activity_user_last_visit_idx'),
+        ),
+    ]
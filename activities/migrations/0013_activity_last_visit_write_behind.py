@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-18 19:11
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0012_activity_user_last_visit_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='activity',
+            name='last_visit',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='마지막 방문일'),
+        ),
+    ]
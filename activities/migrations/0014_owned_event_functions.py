@@ -0,0 +1,108 @@
+# Generated by Django 5.2.4 on 2026-10-18 19:11
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0013_activity_last_visit_write_behind'),
+    ]
+
+    operations = [
+        # Event writes that check ownership in the same statement: the event
+        # must belong to the activity and the activity to the user, and zero
+        # rows come back otherwise (the views answer 404). SECURITY INVOKER,
+        # so RLS applies as it does to the plain table calls they replace.
+        migrations.RunSQL(
+            sql="""
+                CREATE OR REPLACE FUNCTION insert_owned_event(
+                    p_user_id text,
+                    p_activity_id bigint,
+                    p_event jsonb
+                )
+                RETURNS SETOF event
+                LANGUAGE sql
+                SECURITY INVOKER
+                AS $$
+                    INSERT INTO event (
+                        activity_id, event_name, situation, task, action, result,
+                        start_date, end_date, created_at, updated_at
+                    )
+                    SELECT a.id,
+                           p_event->>'event_name',
+                           p_event->>'situation',
+                           p_event->>'task',
+                           p_event->>'action',
+                           p_event->>'result',
+                           (p_event->>'start_date')::timestamptz,
+                           (p_event->>'end_date')::timestamptz,
+                           now(),
+                           now()
+                    FROM activity a
+                    WHERE a.id = p_activity_id AND a.user_id = p_user_id
+                    RETURNING *;
+                $$;
+
+                -- Only the keys present in p_changes are written
+                CREATE OR REPLACE FUNCTION update_owned_event(
+                    p_user_id text,
+                    p_activity_id bigint,
+                    p_event_id bigint,
+                    p_changes jsonb
+                )
+                RETURNS SETOF event
+                LANGUAGE sql
+                SECURITY INVOKER
+                AS $$
+                    UPDATE event e
+                    SET event_name = CASE WHEN p_changes ? 'event_name'
+                                          THEN p_changes->>'event_name' ELSE e.event_name END,
+                        situation = CASE WHEN p_changes ? 'situation'
+                                         THEN p_changes->>'situation' ELSE e.situation END,
+                        task = CASE WHEN p_changes ? 'task'
+                                    THEN p_changes->>'task' ELSE e.task END,
+                        action = CASE WHEN p_changes ? 'action'
+                                      THEN p_changes->>'action' ELSE e.action END,
+                        result = CASE WHEN p_changes ? 'result'
+                                      THEN p_changes->>'result' ELSE e.result END,
+                        start_date = CASE WHEN p_changes ? 'start_date'
+                                          THEN (p_changes->>'start_date')::timestamptz
+                                          ELSE e.start_date END,
+                        end_date = CASE WHEN p_changes ? 'end_date'
+                                        THEN (p_changes->>'end_date')::timestamptz
+                                        ELSE e.end_date END,
+                        updated_at = now()
+                    FROM activity a
+                    WHERE e.id = p_event_id
+                      AND e.activity_id = p_activity_id
+                      AND a.id = e.activity_id
+                      AND a.user_id = p_user_id
+                    RETURNING e.*;
+                $$;
+
+                CREATE OR REPLACE FUNCTION delete_owned_event(
+                    p_user_id text,
+                    p_activity_id bigint,
+                    p_event_id bigint
+                )
+                RETURNS SETOF event
+                LANGUAGE sql
+                SECURITY INVOKER
+                AS $$
+                    DELETE FROM event e
+                    USING activity a
+                    WHERE e.id = p_event_id
+                      AND e.activity_id = p_activity_id
+                      AND a.id = e.activity_id
+                      AND a.user_id = p_user_id
+                    RETURNING e.*;
+                $$;
+            """,
+            reverse_sql="""
+                DROP FUNCTION IF EXISTS insert_owned_event(text, bigint, jsonb);
+                DROP FUNCTION IF EXISTS update_owned_event(text, bigint, bigint, jsonb);
+                DROP FUNCTION IF EXISTS delete_owned_event(text, bigint, bigint);
+            """,
+        ),
+    ]
@@ -0,0 +1,152 @@
+# Generated by Django 5.2.4 on 2026-10-18 19:14
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0014_owned_event_functions'),
+    ]
+
+    operations = [
+        # Applies a batch of event deletes, updates and creates for one of the
+        # caller's activities in one transaction, one multi-row statement per
+        # kind. Embeddings of updated events lose their input_hash in the same
+        # transaction, so the next embedding run re-embeds them; those of
+        # deleted events are removed. Returns NULL if the activity isn't the
+        # user's, else {"created": [...], "updated": [...], "deleted": [...]}
+        # (created in input order). SECURITY INVOKER, so RLS still applies.
+        migrations.RunSQL(
+            sql="""
+                CREATE OR REPLACE FUNCTION apply_event_batch(
+                    p_user_id text,
+                    p_activity_id bigint,
+                    p_create jsonb,
+                    p_update jsonb,
+                    p_delete bigint[]
+                )
+                RETURNS jsonb
+                LANGUAGE plpgsql
+                SECURITY INVOKER
+                AS $$
+                DECLARE
+                    v_created jsonb;
+                    v_updated jsonb;
+                    v_deleted jsonb;
+                BEGIN
+                    PERFORM 1 FROM activity
+                    WHERE id = p_activity_id AND user_id = p_user_id
+                    FOR UPDATE;
+                    IF NOT FOUND THEN
+                        RETURN NULL;
+                    END IF;
+
+                    WITH dropped AS (
+                        DELETE FROM activity_embedding ae
+                        USING event e
+                        WHERE ae.event_id = e.id
+                          AND e.activity_id = p_activity_id
+                          AND e.id = ANY(p_delete)
+                    ),
+                    deleted AS (
+                        DELETE FROM event e
+                        WHERE e.activity_id = p_activity_id
+                          AND e.id = ANY(p_delete)
+                        RETURNING e.id
+                    )
+                    SELECT coalesce(jsonb_agg(deleted.id), '[]'::jsonb)
+                    INTO v_deleted
+                    FROM deleted;
+
+                    WITH items AS (
+                        SELECT (c.value->>'id')::bigint AS id, c.value AS changes
+                        FROM jsonb_array_elements(p_update) AS c(value)
+                    ),
+                    updated AS (
+                        UPDATE event e
+                        SET event_name = CASE WHEN i.changes ? 'event_name'
+                                              THEN i.changes->>'event_name' ELSE e.event_name END,
+                            situation = CASE WHEN i.changes ? 'situation'
+                                             THEN i.changes->>'situation' ELSE e.situation END,
+                            task = CASE WHEN i.changes ? 'task'
+                                        THEN i.changes->>'task' ELSE e.task END,
+                            action = CASE WHEN i.changes ? 'action'
+                                          THEN i.changes->>'action' ELSE e.action END,
+                            result = CASE WHEN i.changes ? 'result'
+                                          THEN i.changes->>'result' ELSE e.result END,
+                            start_date = CASE WHEN i.changes ? 'start_date'
+                                              THEN (i.changes->>'start_date')::timestamptz
+                                              ELSE e.start_date END,
+                            end_date = CASE WHEN i.changes ? 'end_date'
+                                            THEN (i.changes->>'end_date')::timestamptz
+                                            ELSE e.end_date END,
+                            updated_at = now()
+                        FROM items i
+                        WHERE e.id = i.id AND e.activity_id = p_activity_id
+                        RETURNING e.id, e.updated_at
+                    ),
+                    staled AS (
+                        UPDATE activity_embedding ae
+                        SET metadata = ae.metadata - 'input_hash'
+                        FROM updated u
+                        WHERE ae.event_id = u.id
+                    )
+                    SELECT coalesce(
+                        jsonb_agg(jsonb_build_object('id', u.id, 'updated_at', u.updated_at)),
+                        '[]'::jsonb
+                    )
+                    INTO v_updated
+                    FROM updated u;
+
+                    -- ids are drawn up front so each row maps back to its item
+                    WITH items AS (
+                        SELECT nextval(pg_get_serial_sequence('event', 'id')) AS id,
+                               c.value,
+                               c.position
+                        FROM jsonb_array_elements(p_create)
+                             WITH ORDINALITY AS c(value, position)
+                    ),
+                    created AS (
+                        INSERT INTO event (
+                            id, activity_id, event_name, situation, task, action,
+                            result, start_date, end_date, created_at, updated_at
+                        )
+                        SELECT i.id,
+                               p_activity_id,
+                               i.value->>'event_name',
+                               i.value->>'situation',
+                               i.value->>'task',
+                               i.value->>'action',
+                               i.value->>'result',
+                               (i.value->>'start_date')::timestamptz,
+                               (i.value->>'end_date')::timestamptz,
+                               now(),
+                               now()
+                        FROM items i
+                        RETURNING id, updated_at
+                    )
+                    SELECT coalesce(
+                        jsonb_agg(
+                            jsonb_build_object('id', c.id, 'updated_at', c.updated_at)
+                            ORDER BY i.position
+                        ),
+                        '[]'::jsonb
+                    )
+                    INTO v_created
+                    FROM items i
+                    JOIN created c ON c.id = i.id;
+
+                    RETURN jsonb_build_object(
+                        'created', v_created,
+                        'updated', v_updated,
+                        'deleted', v_deleted
+                    );
+                END;
+                $$;
+            """,
+            reverse_sql="""
+                DROP FUNCTION IF EXISTS apply_event_batch(text, bigint, jsonb, jsonb, bigint[]);
+            """,
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.4 on 2026-10-18 19:29
+
+from django.db import migrations
+
+
+def _replace_fk(table, column, target, target_column, on_delete=""):
+    # Django emulates on_delete=CASCADE in the ORM and creates the constraint
+    # without a database action; swap it for one that has it
+    return f"""
+        DO $$
+        DECLARE
+            fk record;
+        BEGIN
+            FOR fk IN
+                SELECT c.conname
+                FROM pg_constraint c
+                JOIN pg_attribute a
+                  ON a.attrelid = c.conrelid AND a.attnum = ANY(c.conkey)
+                WHERE c.contype = 'f'
+                  AND c.conrelid = '{table}'::regclass
+                  AND c.confrelid = '{target}'::regclass
+                  AND a.attname = '{column}'
+            LOOP
+                EXECUTE format('ALTER TABLE {table} DROP CONSTRAINT %I', fk.conname);
+            END LOOP;
+        END;
+        $$;
+        ALTER TABLE {table}
+            ADD CONSTRAINT {table}_{column}_fk
+            FOREIGN KEY ({column}) REFERENCES {target} ({target_column})
+            {on_delete} DEFERRABLE INITIALLY DEFERRED;
+    """
+
+
+FOREIGN_KEYS = (
+    ("activity_embedding", "event_id", "event", "id"),
+    ("event_suggestion", "event_id", "event", "id"),
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0015_event_batch'),
+        ('ai', '0008_embeddingjob_cascade_lockdown'),
+    ]
+
+    operations = [
+        # delete_owned_event and apply_event_batch delete events in SQL, so
+        # their embeddings and suggestions have to go with them in the
+        # database (embedding_job_event already does, see ai 0008)
+        migrations.RunSQL(
+            sql="".join(
+                _replace_fk(*fk, on_delete="ON DELETE CASCADE") for fk in FOREIGN_KEYS
+            ),
+            reverse_sql="".join(_replace_fk(*fk) for fk in FOREIGN_KEYS),
+        ),
+    ]
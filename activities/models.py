@@ -1,5 +1,6 @@
 from django.db import models
-from pgvector.django import VectorField
+from django.utils import timezone
+from pgvector.django import VectorField, HnswIndex
 from django.contrib.postgres.fields import ArrayField
 
 # from django.contrib.postgres.fields import ArrayField  # postgress specific
@@ -19,7 +20,8 @@ class Activity(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     start_date = models.DateTimeField(null=True, blank=True, help_text="활동 시작일")
     end_date = models.DateTimeField(null=True, blank=True, help_text="활동 종료일")
-    last_visit = models.DateTimeField(auto_now=True, help_text="마지막 방문일")
+    # Written in batches by activities.visits, not on every save
+    last_visit = models.DateTimeField(default=timezone.now, help_text="마지막 방문일")
     description = models.TextField(null=True, blank=True, help_text="활동 설명")
     keywords = ArrayField(
         models.TextField(), null=True, blank=True, help_text="키워드 목록"
@@ -27,6 +29,13 @@ class Activity(models.Model):
 
     class Meta:
         db_table = "activity"
+        indexes = [
+            # Keyset pagination of a user's activities (ActivityListView.get)
+            models.Index(
+                fields=["user", "-last_visit", "-id"],
+                name="activity_user_last_visit_idx",
+            ),
+        ]
 
 
 class Event(models.Model):
@@ -56,3 +65,17 @@ class ActivityEmbedding(models.Model):
 
     class Meta:
         db_table = "activity_embedding"
+        indexes = [
+            HnswIndex(
+                name="activity_embedding_hnsw_idx",
+                fields=["embedding"],
+                m=16,
+                ef_construction=64,
+                opclasses=["vector_cosine_ops"],
+            )
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "event"], name="unique_activity_embedding_user_event"
+            )
+        ]
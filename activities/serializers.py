@@ -19,7 +19,8 @@ class ActivityListSerializer(serializers.Serializer):
         source="favorite", default=False, help_text="즐겨찾기 여부"
     )
     recentEvents = serializers.ListField(
-        child=serializers.CharField(), help_text="최근 활동 목록"
+        child=serializers.DictField(),
+        help_text="최근 이벤트 요약 목록 (id, event_name, start_date, end_date)",
     )
     event_count = serializers.IntegerField(help_text="활동 개수")
 
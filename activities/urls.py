@@ -4,11 +4,13 @@ from .views import (
     ActivityDetailView,
     EventListView,
     EventDetailView,
+    EventBatchView,
 )
 
 urlpatterns = [
     path("", ActivityListView.as_view(), name="activity-list"),
     path("<int:activity_id>/", ActivityDetailView.as_view(), name="activity-detail"),
     path("<int:activity_id>/events/", EventListView.as_view(), name="event-list"),
+    path("<int:activity_id>/events/batch/", EventBatchView.as_view(), name="event-batch"),
     path("<int:activity_id>/events/<int:event_id>/", EventDetailView.as_view(), name="event-detail"),
 ]
@@ -7,7 +7,15 @@ from django.conf import settings
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from utils.formatdate import _format_date
+from utils.pagination import InvalidPage, keyset_after, page_limit, paginate
+from utils.conditional import (
+    collection_validators,
+    not_modified_response,
+    with_validators,
+)
 from utils.supabase_utils import get_supabase_client, get_user_id_from_token
+from ai.similarity import user_embedding_cache
+from .visits import visit_buffer
 from .serializers import (
     ActivityListSerializer,
     ActivityCreateSerializer,
@@ -18,32 +26,88 @@ from .serializers import (
 )
 
 
+# Activity card fields: response key -> activity column
+ACTIVITY_CARD_FIELDS = {
+    "id": "id",
+    "title": "activity_name",
+    "category": "category",
+    "startDate": "start_date",
+    "endDate": "end_date",
+    "lastVisit": "last_visit",
+    "isFavorite": "favorite",
+}
+ACTIVITY_LIST_FIELDS = (*ACTIVITY_CARD_FIELDS, "recentEvents", "event_count")
+# Activity list sort key; also the cursor's contents
+ACTIVITY_PAGE_ORDER = ("last_visit", "id")
+# Event summary shown on a card (no STAR text)
+RECENT_EVENT_COLUMNS = "id, event_name, start_date, end_date"
+
+
 class ActivityListView(APIView):
-    def _get_all_activities(self, supabase, request):
-        """Get all activities with event counts"""
+    def _parse_fields(self, value):
+        """`?fields=` as a tuple of response keys (all of them by default)"""
+        if not value:
+            return ACTIVITY_LIST_FIELDS
+        fields = tuple(field.strip() for field in value.split(",") if field.strip())
+        unknown = [field for field in fields if field not in ACTIVITY_LIST_FIELDS]
+        if unknown:
+            raise InvalidPage(f"Unknown fields: {', '.join(unknown)}")
+        return fields
+
+    def _activity_list_query(self, supabase, user_id, fields):
+        """One page of activity cards; events are counted and trimmed in the database"""
+        columns = dict.fromkeys(
+            [*ACTIVITY_PAGE_ORDER]
+            + [ACTIVITY_CARD_FIELDS[f] for f in fields if f in ACTIVITY_CARD_FIELDS]
+        )
+        select = list(columns)
+        if "event_count" in fields:
+            select.append("event_count:event(count)")
+        if "recentEvents" in fields:
+            select.append(f"recent_events:event({RECENT_EVENT_COLUMNS})")
+
+        query = (
+            supabase.table("activity").select(", ".join(select)).eq("user_id", user_id)
+        )
+        if "recentEvents" in fields:
+            query = query.order(
+                "created_at", desc=True, foreign_table="recent_events"
+            ).limit(settings.ACTIVITY_RECENT_EVENTS, foreign_table="recent_events")
+        return query
+
+    def _get_all_activities(self, supabase, request, fields, limit):
+        """Get one page of activities with event counts"""
+        activities_query = keyset_after(
+            self._activity_list_query(
+                supabase, get_user_id_from_token(request), fields
+            ),
+            request.query_params.get("cursor"),
+            ACTIVITY_PAGE_ORDER,
+        )
         activities_result = (
-            supabase.table("activity")
-            .select("*, event!activity_id(*)")  # left join with event table
-            .eq("user_id", get_user_id_from_token(request))
+            activities_query.order("last_visit", desc=True)
+            .order("id", desc=True)
+            .limit(limit + 1)
             .execute()
         )
-
-        activities_data = []
-        for activity in activities_result.data:
-            activity_data = {
-                "id": activity.get("id"),
-                "title": activity.get("activity_name"),
-                "category": activity.get("category"),
-                "startDate": activity.get("start_date"),
-                "endDate": activity.get("end_date"),
-                "lastVisit": activity.get("last_visit"),
-                "isFavorite": activity.get("favorite", False),
-                "recentEvents": activity.get("event", []),
-                "event_count": len(activity.get("event", [])),
-            }
-            activities_data.append(activity_data)
-
-        return activities_data
+        rows, next_cursor = paginate(
+            activities_result.data, limit, ACTIVITY_PAGE_ORDER
+        )
+        return [self._activity_card(row, fields) for row in rows], next_cursor
+
+    def _activity_card(self, activity, fields):
+        activity_data = {}
+        for field in fields:
+            if field in ACTIVITY_CARD_FIELDS:
+                activity_data[field] = activity.get(ACTIVITY_CARD_FIELDS[field])
+            elif field == "recentEvents":
+                activity_data[field] = activity.get("recent_events") or []
+            elif field == "event_count":
+                counts = activity.get("event_count") or [{"count": 0}]
+                activity_data[field] = counts[0]["count"]
+        if "isFavorite" in activity_data:
+            activity_data["isFavorite"] = activity_data["isFavorite"] or False
+        return activity_data
 
     def _get_event_by_id(self, supabase, event_id):
         """Get specific event with activities"""
@@ -62,8 +126,37 @@ class ActivityListView(APIView):
 
     @swagger_auto_schema(
         operation_summary="사용자의 전체 활동 리스트를 조회",
-        operation_description="활동 아카이빙 메인페이지 진입 시, 사용자의 전체 활동 리스트를 조회합니다.",
-        responses={200: ActivityListSerializer(many=True)},
+        operation_description=(
+            "활동 아카이빙 메인페이지 진입 시, 사용자의 활동 리스트를 최근 방문 순으로 "
+            "조회합니다. 응답의 `next_cursor`를 `cursor`로 넘기면 다음 페이지를 조회합니다."
+        ),
+        manual_parameters=[
+            openapi.Parameter(
+                "limit",
+                openapi.IN_QUERY,
+                description="페이지당 활동 수",
+                type=openapi.TYPE_INTEGER,
+            ),
+            openapi.Parameter(
+                "cursor",
+                openapi.IN_QUERY,
+                description="이전 페이지의 next_cursor",
+                type=openapi.TYPE_STRING,
+            ),
+            openapi.Parameter(
+                "fields",
+                openapi.IN_QUERY,
+                description=(
+                    "응답에 포함할 필드 (쉼표 구분): " + ", ".join(ACTIVITY_LIST_FIELDS)
+                ),
+                type=openapi.TYPE_STRING,
+            ),
+        ],
+        responses={
+            200: ActivityListSerializer(many=True),
+            304: "Not Modified (If-None-Match)",
+            400: "Bad Request",
+        },
         tags=["Activity"],
     )
     def get(self, request):
@@ -71,11 +164,37 @@ class ActivityListView(APIView):
         try:
             supabase = get_supabase_client(request)
 
-            # Get all events
-            activities = self._get_all_activities(supabase, request)
-            return Response(
-                {"activities": activities},
-                status=status.HTTP_200_OK,
+            etag, last_modified = collection_validators(
+                request, get_user_id_from_token(request), "activities"
+            )
+            not_modified = not_modified_response(request, etag, last_modified)
+            if not_modified is not None:
+                return not_modified
+
+            try:
+                fields = self._parse_fields(request.query_params.get("fields"))
+                limit = page_limit(
+                    request.query_params.get("limit"),
+                    settings.ACTIVITY_PAGE_SIZE,
+                    settings.ACTIVITY_MAX_PAGE_SIZE,
+                )
+                # Get one page of activities
+                activities, next_cursor = self._get_all_activities(
+                    supabase, request, fields, limit
+                )
+            except InvalidPage as e:
+                return Response(
+                    {"error": "Invalid list parameters", "detail": str(e)},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            return with_validators(
+                Response(
+                    {"activities": activities, "next_cursor": next_cursor},
+                    status=status.HTTP_200_OK,
+                ),
+                etag,
+                last_modified,
             )
 
         except Exception as e:
@@ -137,16 +256,21 @@ class ActivityDetailView(APIView):
             print(
                 f"Fetching details for activity_id: {activity_id}, user_id: {user_id}"
             )
-            # Call stored procedure - automatically updates last_visit
-            result = supabase.rpc(
-                "get_activity_details",
-                {"p_activity_id": activity_id, "p_user_id": user_id},
-            ).execute()
+            # Plain read; last_visit is written behind by activities.visits
+            result = (
+                supabase.table("activity")
+                .select("*, events:event(*)")
+                .eq("id", activity_id)
+                .eq("user_id", user_id)
+                .order("created_at", desc=True, foreign_table="events")
+                .execute()
+            )
 
             if not result.data:
                 return Response(
                     {"error": "Activity not found"}, status=status.HTTP_404_NOT_FOUND
                 )
+            visit_buffer.record(activity_id, user_id)
             activity = result.data[0]
             for field in ["start_date", "end_date", "created_at", "updated_at"]:
                 activity[field] = _format_date(activity.get(field))
@@ -254,6 +378,8 @@ class ActivityDetailView(APIView):
             .eq("user_id", user_id)
             .execute()
         )
+        # Deleting the activity cascades to its events' embeddings
+        user_embedding_cache.invalidate(user_id)
 
         return (
             Response(status=status.HTTP_204_NO_CONTENT)
@@ -265,11 +391,27 @@ class ActivityDetailView(APIView):
         )
 
 
+def _event_columns(validated_data):
+    """Event columns present in validated EventCreateUpdateSerializer data"""
+    columns = {}
+    for field in ("event_name", "situation", "task", "action", "result"):
+        if field in validated_data:
+            columns[field] = validated_data[field]
+    for field in ("start_date", "end_date"):
+        if validated_data.get(field):
+            columns[field] = validated_data[field].isoformat()
+    return columns
+
+
 class EventListView(APIView):
     @swagger_auto_schema(
         operation_summary="특정 활동에 등록된 이벤트 전체 조회",
         operation_description="특정 활동에 등록된 모든 이벤트를 조회합니다.",
-        responses={200: EventSerializer(many=True), 404: "Activity not found"},
+        responses={
+            200: EventSerializer(many=True),
+            304: "Not Modified (If-None-Match)",
+            404: "Activity not found",
+        },
         tags=["Event"],
     )
     def get(self, request, activity_id):
@@ -277,32 +419,32 @@ class EventListView(APIView):
             supabase = get_supabase_client(request)
             user_id = get_user_id_from_token(request)
 
-            # Check if activity exists and belongs to user
-            activity_result = (
+            etag, last_modified = collection_validators(request, user_id, "activities")
+            not_modified = not_modified_response(request, etag, last_modified)
+
+            # Ownership check and events in one request; a revalidation only
+            # needs the ownership check (304 is never sent for another
+            # user's or a missing activity)
+            query = (
                 supabase.table("activity")
-                .select("id")
+                .select("id" if not_modified is not None else "id, events:event(*)")
                 .eq("id", activity_id)
                 .eq("user_id", user_id)
-                .execute()
             )
+            if not_modified is None:
+                query = query.order("created_at", desc=True, foreign_table="events")
+            activity_result = query.execute()
 
             if not activity_result.data:
                 return Response(
                     {"error": "Activity not found"}, status=status.HTTP_404_NOT_FOUND
                 )
-
-            # Get all events for this activity
-            events_result = (
-                supabase.table("event")
-                .select("*")
-                .eq("activity_id", activity_id)
-                .order("created_at", desc=True)
-                .execute()
-            )
+            if not_modified is not None:
+                return not_modified
 
             # Format events data to match specification
             events_data = []
-            for event in events_result.data:
+            for event in activity_result.data[0].get("events") or []:
                 event_data = {
                     "id": str(event.get("id")),
                     "activity": str(activity_id),
@@ -319,7 +461,9 @@ class EventListView(APIView):
                 }
                 events_data.append(event_data)
 
-            return Response(events_data, status=status.HTTP_200_OK)
+            return with_validators(
+                Response(events_data, status=status.HTTP_200_OK), etag, last_modified
+            )
 
         except Exception as e:
             return Response(
@@ -349,53 +493,24 @@ class EventListView(APIView):
             supabase = get_supabase_client(request)
             user_id = get_user_id_from_token(request)
 
-            # Check if activity exists and belongs to user
-            activity_result = (
-                supabase.table("activity")
-                .select("id")
-                .eq("id", activity_id)
-                .eq("user_id", user_id)
-                .execute()
-            )
-
-            if not activity_result.data:
-                return Response(
-                    {"error": "Activity not found"}, status=status.HTTP_404_NOT_FOUND
-                )
-
             # Validate request data
             serializer = EventCreateUpdateSerializer(data=request.data)
             if not serializer.is_valid():
                 return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-            # Prepare data for Supabase insertion
-            validated_data = serializer.validated_data
-            event_data = {
-                "activity_id": activity_id,
-                "event_name": validated_data.get("event_name"),
-                "situation": validated_data.get("situation"),
-                "task": validated_data.get("task"),
-                "action": validated_data.get("action"),
-                "result": validated_data.get("result"),
-                "start_date": (
-                    validated_data.get("start_date").isoformat()
-                    if validated_data.get("start_date")
-                    else None
-                ),
-                "end_date": (
-                    validated_data.get("end_date").isoformat()
-                    if validated_data.get("end_date")
-                    else None
-                ),
-            }
-
-            # Insert event
-            result = supabase.table("event").insert(event_data).execute()
+            # Insert only if the activity belongs to the user (no rows otherwise)
+            result = supabase.rpc(
+                "insert_owned_event",
+                {
+                    "p_user_id": user_id,
+                    "p_activity_id": activity_id,
+                    "p_event": _event_columns(serializer.validated_data),
+                },
+            ).execute()
 
             if not result.data:
                 return Response(
-                    {"error": "Failed to create event"},
-                    status=status.HTTP_400_BAD_REQUEST,
+                    {"error": "Activity not found"}, status=status.HTTP_404_NOT_FOUND
                 )
 
             return Response(
@@ -437,71 +552,25 @@ class EventDetailView(APIView):
             supabase = get_supabase_client(request)
             user_id = get_user_id_from_token(request)
 
-            # Check if activity exists and belongs to user
-            activity_result = (
-                supabase.table("activity")
-                .select("id")
-                .eq("id", activity_id)
-                .eq("user_id", user_id)
-                .execute()
-            )
-
-            if not activity_result.data:
-                return Response(
-                    {"error": "Activity not found"}, status=status.HTTP_404_NOT_FOUND
-                )
-
-            # Check if event exists and belongs to the activity
-            event_result = (
-                supabase.table("event")
-                .select("id")
-                .eq("id", event_id)
-                .eq("activity_id", activity_id)
-                .execute()
-            )
-
-            if not event_result.data:
-                return Response(
-                    {"error": "Event not found"}, status=status.HTTP_404_NOT_FOUND
-                )
-
             # Validate request data
             serializer = EventCreateUpdateSerializer(data=request.data)
             if not serializer.is_valid():
                 return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-            # Prepare update data for Supabase
-            validated_data = serializer.validated_data
-            update_data = {}
-
-            if "event_name" in validated_data:
-                update_data["event_name"] = validated_data["event_name"]
-            if "situation" in validated_data:
-                update_data["situation"] = validated_data["situation"]
-            if "task" in validated_data:
-                update_data["task"] = validated_data["task"]
-            if "action" in validated_data:
-                update_data["action"] = validated_data["action"]
-            if "result" in validated_data:
-                update_data["result"] = validated_data["result"]
-            if "start_date" in validated_data and validated_data["start_date"]:
-                update_data["start_date"] = validated_data["start_date"].isoformat()
-            if "end_date" in validated_data and validated_data["end_date"]:
-                update_data["end_date"] = validated_data["end_date"].isoformat()
-
-            # Update event
-            result = (
-                supabase.table("event")
-                .update(update_data)
-                .eq("id", event_id)
-                .eq("activity_id", activity_id)
-                .execute()
-            )
+            # Update joined to activity ownership; no rows if either check fails
+            result = supabase.rpc(
+                "update_owned_event",
+                {
+                    "p_user_id": user_id,
+                    "p_activity_id": activity_id,
+                    "p_event_id": event_id,
+                    "p_changes": _event_columns(serializer.validated_data),
+                },
+            ).execute()
 
             if not result.data:
                 return Response(
-                    {"error": "Failed to update event"},
-                    status=status.HTTP_400_BAD_REQUEST,
+                    {"error": "Event not found"}, status=status.HTTP_404_NOT_FOUND
                 )
 
             return Response(
@@ -529,54 +598,201 @@ class EventDetailView(APIView):
             supabase = get_supabase_client(request)
             user_id = get_user_id_from_token(request)
 
-            # Check if activity exists and belongs to user
-            activity_result = (
-                supabase.table("activity")
-                .select("id")
-                .eq("id", activity_id)
-                .eq("user_id", user_id)
-                .execute()
-            )
+            # Delete joined to activity ownership; no rows if either check fails
+            result = supabase.rpc(
+                "delete_owned_event",
+                {
+                    "p_user_id": user_id,
+                    "p_activity_id": activity_id,
+                    "p_event_id": event_id,
+                },
+            ).execute()
 
-            if not activity_result.data:
+            if not result.data:
                 return Response(
-                    {"error": "Activity not found"}, status=status.HTTP_404_NOT_FOUND
+                    {"error": "Event not found"}, status=status.HTTP_404_NOT_FOUND
                 )
 
-            # Check if event exists and belongs to the activity
-            event_result = (
-                supabase.table("event")
-                .select("id")
-                .eq("id", event_id)
-                .eq("activity_id", activity_id)
-                .execute()
+            user_embedding_cache.invalidate(user_id)
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        except Exception as e:
+            return Response(
+                {"error": "Failed to delete event", "detail": str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
-            if not event_result.data:
+
+class EventBatchView(APIView):
+    def _validate(self, data):
+        """Returns (creates, updates, delete_ids, errors) for a batch request body"""
+        if not isinstance(data, dict):
+            return None, None, None, {"error": "Expected an object"}
+        create = data.get("create", [])
+        update = data.get("update", [])
+        delete = data.get("delete", [])
+        if not all(isinstance(items, list) for items in (create, update, delete)):
+            return None, None, None, {
+                "error": "create, update and delete must be lists"
+            }
+        if len(create) + len(update) + len(delete) > settings.EVENT_BATCH_MAX_ITEMS:
+            return None, None, None, {
+                "error": f"At most {settings.EVENT_BATCH_MAX_ITEMS} operations per batch"
+            }
+
+        errors = {}
+        update_ids = [
+            item.get("id") if isinstance(item, dict) else None for item in update
+        ]
+        if not all(isinstance(event_id, int) for event_id in update_ids):
+            errors["update"] = "Every update needs an integer id"
+        elif len(set(update_ids)) != len(update_ids):
+            errors["update"] = "Duplicate event ids"
+        if not all(isinstance(event_id, int) for event_id in delete):
+            errors["delete"] = "Expected a list of event ids"
+        elif set(delete) & set(update_ids):
+            errors["delete"] = "An event cannot be both updated and deleted"
+        if errors:
+            return None, None, None, errors
+
+        create_serializer = EventCreateUpdateSerializer(data=create, many=True)
+        update_serializer = EventCreateUpdateSerializer(
+            data=[
+                {key: value for key, value in item.items() if key != "id"}
+                for item in update
+            ],
+            many=True,
+            partial=True,
+        )
+        if not create_serializer.is_valid():
+            errors["create"] = create_serializer.errors
+        if not update_serializer.is_valid():
+            errors["update"] = update_serializer.errors
+        if errors:
+            return None, None, None, errors
+
+        creates = [_event_columns(item) for item in create_serializer.validated_data]
+        updates = [
+            {"id": event_id, **_event_columns(item)}
+            for event_id, item in zip(update_ids, update_serializer.validated_data)
+        ]
+        return creates, updates, list(dict.fromkeys(delete)), None
+
+    @swagger_auto_schema(
+        operation_summary="이벤트 일괄 추가/수정/삭제",
+        operation_description=(
+            "특정 활동의 이벤트를 한 번에 추가, 수정, 삭제합니다. "
+            "모든 작업은 하나의 트랜잭션으로 적용되며 항목별 결과를 반환합니다."
+        ),
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                "create": openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(type=openapi.TYPE_OBJECT),
+                    description="EventCreateUpdateSerializer 형식의 새 이벤트 목록",
+                ),
+                "update": openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(type=openapi.TYPE_OBJECT),
+                    description="id와 변경할 필드만 포함한 이벤트 목록",
+                ),
+                "delete": openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(type=openapi.TYPE_INTEGER),
+                    description="삭제할 이벤트 id 목록",
+                ),
+            },
+        ),
+        responses={
+            200: openapi.Response(
+                "Applied",
+                openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        "create": openapi.Schema(
+                            type=openapi.TYPE_ARRAY,
+                            items=openapi.Schema(type=openapi.TYPE_OBJECT),
+                        ),
+                        "update": openapi.Schema(
+                            type=openapi.TYPE_ARRAY,
+                            items=openapi.Schema(type=openapi.TYPE_OBJECT),
+                        ),
+                        "delete": openapi.Schema(
+                            type=openapi.TYPE_ARRAY,
+                            items=openapi.Schema(type=openapi.TYPE_OBJECT),
+                        ),
+                    },
+                ),
+            ),
+            400: "Bad Request",
+            404: "Activity not found",
+        },
+        tags=["Event"],
+    )
+    def post(self, request, activity_id):
+        try:
+            supabase = get_supabase_client(request)
+            user_id = get_user_id_from_token(request)
+
+            creates, updates, delete_ids, errors = self._validate(request.data)
+            if errors:
+                return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+            # One transaction: ownership check, deletes, updates, inserts
+            result = supabase.rpc(
+                "apply_event_batch",
+                {
+                    "p_user_id": user_id,
+                    "p_activity_id": activity_id,
+                    "p_create": creates,
+                    "p_update": updates,
+                    "p_delete": delete_ids,
+                },
+            ).execute()
+
+            applied = result.data
+            if not applied:
                 return Response(
-                    {"error": "Event not found"}, status=status.HTTP_404_NOT_FOUND
+                    {"error": "Activity not found"}, status=status.HTTP_404_NOT_FOUND
                 )
 
-            # Delete event
-            result = (
-                supabase.table("event")
-                .delete()
-                .eq("id", event_id)
-                .eq("activity_id", activity_id)
-                .execute()
-            )
+            if creates or updates or delete_ids:
+                user_embedding_cache.invalidate(user_id)
 
-            return (
-                Response(status=status.HTTP_204_NO_CONTENT)
-                if result.data
-                else Response(
-                    {"error": "Event not found or deletion failed"},
-                    status=status.HTTP_404_NOT_FOUND,
-                )
+            updated = {row["id"]: row["updated_at"] for row in applied["updated"]}
+            deleted = set(applied["deleted"])
+            return Response(
+                {
+                    "create": [
+                        {"id": str(row["id"]), "updatedAt": row["updated_at"]}
+                        for row in applied["created"]
+                    ],
+                    "update": [
+                        (
+                            {
+                                "id": str(item["id"]),
+                                "status": "updated",
+                                "updatedAt": updated[item["id"]],
+                            }
+                            if item["id"] in updated
+                            else {"id": str(item["id"]), "status": "not_found"}
+                        )
+                        for item in updates
+                    ],
+                    "delete": [
+                        {
+                            "id": str(event_id),
+                            "status": "deleted" if event_id in deleted else "not_found",
+                        }
+                        for event_id in delete_ids
+                    ],
+                },
+                status=status.HTTP_200_OK,
             )
 
         except Exception as e:
             return Response(
-                {"error": "Failed to delete event", "detail": str(e)},
+                {"error": "Failed to apply event batch", "detail": str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
@@ -0,0 +1,121 @@
+"""Write-behind buffer for activity.last_visit
+
+Opening an activity used to write last_visit on every read. Visits are now
+recorded in memory and a background thread writes them out every
+ACTIVITY_VISIT_FLUSH_INTERVAL seconds as one batched UPDATE, so reads stay
+pure SELECTs. Pending visits are flushed at interpreter exit.
+"""
+import atexit
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.utils import timezone
+
+from utils import metrics
+
+
+class VisitBuffer:
+    def __init__(self, interval, max_pending):
+        self.interval = interval
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = {}  # activity_id -> (user_id, visited_at)
+        self._wake = threading.Event()
+        self._thread = None
+        self.recorded = 0
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.failures = 0
+        self.max_depth = 0
+        self.last_flush_ms = 0.0
+
+    def record(self, activity_id, user_id, visited_at=None):
+        visited_at = visited_at or timezone.now()
+        with self._lock:
+            self._pending[int(activity_id)] = (user_id, visited_at)
+            self.recorded += 1
+            depth = len(self._pending)
+            self.max_depth = max(self.max_depth, depth)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="activity-visit-flusher", daemon=True
+                )
+                self._thread.start()
+        if depth >= self.max_pending:
+            self._wake.set()
+
+    def flush(self):
+        """Write pending visits in one UPDATE; returns the number of visits sent"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+
+            start = time.perf_counter()
+            try:
+                self._write(batch)
+            except Exception as e:
+                print(f"Error flushing activity visits: {e}")
+                with self._lock:
+                    self.failures += 1
+                    # Keep them for the next flush unless a newer visit came in
+                    for activity_id, visit in batch.items():
+                        self._pending.setdefault(activity_id, visit)
+                return 0
+
+            with self._lock:
+                self.flushes += 1
+                self.flushed_rows += len(batch)
+                self.last_flush_ms = (time.perf_counter() - start) * 1000
+            return len(batch)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "pending": len(self._pending),
+                "peak_pending": self.max_depth,
+                "recorded": self.recorded,
+                "flushes": self.flushes,
+                "flushed_rows": self.flushed_rows,
+                "failures": self.failures,
+                "last_flush_ms": self.last_flush_ms,
+                "flush_interval": self.interval,
+            }
+
+    def _write(self, batch):
+        values = ", ".join(["(%s::bigint, %s::text, %s::timestamptz)"] * len(batch))
+        params = []
+        for activity_id, (user_id, visited_at) in batch.items():
+            params.extend([activity_id, user_id, visited_at])
+        close_old_connections()
+        with connection.cursor() as cursor:
+            # Never move last_visit backwards (other processes flush too)
+            cursor.execute(
+                f"""
+                UPDATE activity AS a
+                SET last_visit = v.visited_at
+                FROM (VALUES {values}) AS v(id, user_id, visited_at)
+                WHERE a.id = v.id
+                  AND a.user_id = v.user_id
+                  AND (a.last_visit IS NULL OR a.last_visit < v.visited_at)
+                """,
+                params,
+            )
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+
+visit_buffer = VisitBuffer(
+    interval=settings.ACTIVITY_VISIT_FLUSH_INTERVAL,
+    max_pending=settings.ACTIVITY_VISIT_MAX_PENDING,
+)
+metrics.register("activity_visits", visit_buffer.stats)
+atexit.register(visit_buffer.flush)
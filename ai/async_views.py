@@ -0,0 +1,244 @@
+"""Async versions of the hot AI endpoints, for serving under ASGI (drafted/asgi.py)
+
+DRF has no async APIView, so these are plain Django async views guarded by
+`supabase_authenticated`. OpenAI and Supabase calls use the async clients,
+and independent requests are awaited together; ORM work (job queue, question
+cache) goes through sync_to_async.
+"""
+import asyncio
+import json
+import os
+
+import environ
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from openai import AsyncOpenAI
+
+from utils.permissions import supabase_authenticated
+from utils.supabase_utils import get_async_supabase_client, get_user_id_from_token
+from . import question_cache
+from .embeddings import EMBEDDING_MODEL
+from .jobs import enqueue_embedding_job
+from .similarity import amatch_user_events, parse_vector
+from .views import (
+    EMBEDDING_SOURCES_SELECT,
+    GUIDELINE_SCHEMA,
+    QUESTION_EMBEDDING_FIELDS,
+    _fingerprint,
+    _merge_recommendations,
+    _parse_guideline,
+    _stale_event_ids,
+    _suggested_events,
+)
+
+environ.Env.read_env(env_file=os.path.join(settings.BASE_DIR, ".env"))
+env = environ.Env()
+aclient = AsyncOpenAI(api_key=env("OPENAI_KEY"))
+
+
+async def _aconvert_to_paragraph(prompt_path, data):
+    """Async _convert_to_paragraph"""
+    try:
+        with open(prompt_path, "r", encoding="utf-8") as file:
+            prompt = file.read().strip()
+        response = await aclient.responses.create(
+            model="gpt-4.1-mini",
+            input=f"{data}",
+            instructions=f"{prompt}",
+        )
+        return response.output_text
+    except Exception as e:
+        print(f"Error reading prompt file: {e}")
+        return ""
+
+
+async def _aembed(text):
+    response = await aclient.embeddings.create(input=text, model=EMBEDDING_MODEL)
+    return response.data[0].embedding
+
+
+async def _aquestion_embedding(supabase, question):
+    """Async _question_embedding"""
+    question_hash = _fingerprint(question["question"])
+    if (
+        question.get("question_hash") == question_hash
+        and question.get("question_explanation")
+        and question.get("question_embedding")
+    ):
+        return question["question_explanation"], parse_vector(
+            question["question_embedding"]
+        )
+
+    cached = await sync_to_async(question_cache.get_cached)(
+        question["question"], "paragraph", "embedding"
+    )
+    if cached is not None:
+        paragraph, embedding = cached["paragraph"], cached["embedding"]
+    else:
+        paragraph = await _aconvert_to_paragraph(
+            prompt_path="./ai/prompts/question-paragraph.txt",
+            data=question["question"],
+        )
+        if not paragraph:
+            raise Exception("Question paragraph conversion failed")
+        embedding = await _aembed(paragraph)
+        await sync_to_async(question_cache.store)(
+            question["question"], paragraph=paragraph, embedding=embedding
+        )
+
+    await supabase.table("question_list").update(
+        {
+            "question_explanation": paragraph,
+            "question_embedding": embedding,
+            "question_hash": question_hash,
+        }
+    ).eq("id", question["id"]).execute()
+    return paragraph, embedding
+
+
+async def arecommend_events(supabase, user_id, question_id):
+    """RecommendEventsView logic; returns (suggested_events, error_response)"""
+    question = (
+        await supabase.table("question_list")
+        .select(QUESTION_EMBEDDING_FIELDS)
+        .eq("application.user_id", user_id)
+        .eq("id", question_id)
+        .execute()
+    )
+    if not question.data:
+        return None, JsonResponse({"error": "Question not found"}, status=404)
+
+    question_text = question.data[0]["question"]
+    _, query_embedding = await _aquestion_embedding(supabase, question.data[0])
+    candidate_events = await amatch_user_events(
+        supabase, user_id, query_embedding, match_threshold=0.0, match_count=2
+    )
+    if not candidate_events:
+        return None, JsonResponse({"error": "No matching events"}, status=404)
+
+    top = candidate_events[:2]
+    # Event details and the LLM comments only depend on the matches
+    events_detail, llm_output = await asyncio.gather(
+        supabase.table("event")
+        .select(
+            "id, event_name, situation, task, action, result, contribution, "
+            "activity_id, activity(activity_name)"
+        )
+        .in_("id", [ev["event_id"] for ev in top])
+        .execute(),
+        _aconvert_to_paragraph(
+            prompt_path="./ai/prompts/application-recommend-events.txt",
+            data=json.dumps(
+                {"question_text": question_text, "events": top}, ensure_ascii=False
+            ),
+        ),
+    )
+    events_map = {e["id"]: e for e in events_detail.data}
+    activity_map = {
+        e["activity_id"]: (e.get("activity") or {}).get("activity_name", "")
+        for e in events_detail.data
+    }
+    return _merge_recommendations(top, events_map, activity_map, llm_output), None
+
+
+async def _agenerate_guideline(prompt_path, prompt_data, mode=None):
+    """Async _generate_guideline"""
+    mode = mode or settings.GUIDELINE_GENERATION_MODE
+    if mode == "structured":
+        with open(prompt_path, "r", encoding="utf-8") as file:
+            prompt = file.read().strip()
+        resp = await aclient.responses.create(
+            model="gpt-4o-mini",
+            temperature=0.4,
+            max_output_tokens=512,
+            instructions=prompt,
+            input=json.dumps(prompt_data, ensure_ascii=False),
+            text={"format": GUIDELINE_SCHEMA},
+        )
+    else:
+        guideline_prompt = await _aconvert_to_paragraph(
+            prompt_path=prompt_path,
+            data=json.dumps(prompt_data, ensure_ascii=False),
+        )
+        resp = await aclient.responses.create(
+            model="gpt-4o-mini",
+            temperature=0.4,
+            max_output_tokens=512,
+            input=[{"role": "user", "content": guideline_prompt}],
+        )
+    return _parse_guideline(
+        getattr(resp, "output_text", None),
+        prompt_data["question_id"],
+        strict=mode == "structured",
+    )
+
+
+async def aguideline(question, question_id, prompt_path, cache_field, with_events=False):
+    """generate_question_guideline / generate_editor_guideline for async views"""
+    event_data = (
+        await sync_to_async(_suggested_events)(question_id) if with_events else None
+    )
+    cacheable = not event_data
+    cache_status, question_embedding = question_cache.MISS, None
+    if cacheable:
+        cached, cache_status, question_embedding = (
+            await question_cache.afind_guideline(question, cache_field, _aembed)
+        )
+        if cached is not None:
+            return {"question_id": question_id, "content": cached, "cache": cache_status}
+
+    prompt_data = {"question_id": question_id, "question": question.strip()}
+    if event_data:
+        prompt_data["events"] = event_data
+    data, _ = await _agenerate_guideline(prompt_path, prompt_data)
+    content = (data.get("content") or "").strip()
+    if content and cacheable:
+        await sync_to_async(question_cache.store)(
+            question, **{cache_field: content, "question_embedding": question_embedding}
+        )
+    return {
+        "question_id": int(data.get("question_id", question_id)),
+        "content": content,
+        "cache": cache_status,
+    }
+
+
+@csrf_exempt
+@require_POST
+@supabase_authenticated
+async def generate_embeddings(request):
+    """Async GenerateEmbeddingsView.post"""
+    try:
+        supabase = await get_async_supabase_client(request)
+        user_id = get_user_id_from_token(request)
+
+        activities = (
+            await supabase.table("activity")
+            .select(EMBEDDING_SOURCES_SELECT)
+            .eq("user_id", user_id)
+            .execute()
+        ).data
+        need_embedding_ids = _stale_event_ids(activities)
+        event_ids = need_embedding_ids["insert"] + need_embedding_ids["update"]
+
+        if not event_ids:
+            return JsonResponse({"message": "No new embeddings to generate"}, status=200)
+
+        job = await sync_to_async(enqueue_embedding_job)(user_id, event_ids)
+
+        return JsonResponse(
+            {
+                "message": f"Queued {len(event_ids)} embeddings",
+                "job_id": job.id,
+                "count": len(event_ids),
+            },
+            status=202,
+        )
+
+    except Exception as e:
+        return JsonResponse(
+            {"error": "Failed to queue embeddings", "detail": str(e)}, status=500
+        )
@@ -0,0 +1,140 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class RateLimiter:
+    """Spaces out calls so a model never sees more than `per_minute` requests"""
+
+    def __init__(self, per_minute):
+        self.interval = 60.0 / per_minute
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def reserve(self):
+        """Reserve the next free slot and return how long to wait for it"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+            return slot - now
+
+
+class InFlightLimit:
+    """Counting limit shared by threads and event loops
+
+    asyncio.Semaphore belongs to one event loop and threading.Semaphore
+    would block it, so sync callers wait on a Condition and async callers
+    on a future that release() resolves from whichever thread frees a slot.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._waiters = []  # (loop, future) of waiting coroutines
+
+    def acquire(self):
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+
+    async def aacquire(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._cond:
+                if self._in_flight < self.limit:
+                    self._in_flight += 1
+                    return
+                waiter = loop.create_future()
+                self._waiters.append((loop, waiter))
+            try:
+                await waiter
+            finally:
+                with self._cond:
+                    if (loop, waiter) in self._waiters:
+                        self._waiters.remove((loop, waiter))
+
+    def release(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify()
+            # Woken coroutines race the threads for the slot and re-check
+            waiters, self._waiters = self._waiters, []
+        for loop, waiter in waiters:
+            loop.call_soon_threadsafe(_wake, waiter)
+
+
+def _wake(waiter):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class LLMExecutor:
+    """Run blocking LLM calls concurrently with an in-flight cap and per-model rate limits
+
+    `map` is for WSGI views and management commands: it fans out over a
+    shared thread pool. `amap` is the asyncio equivalent for ASGI. Both take
+    their slots from one InFlightLimit, so max_in_flight holds per process
+    across both paths and all concurrent requests. Both return results in
+    input order.
+    """
+
+    def __init__(self, max_in_flight=8, rate_limits=None):
+        self.max_in_flight = max_in_flight
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_in_flight, thread_name_prefix="llm"
+        )
+        self._limiters = {
+            model: RateLimiter(per_minute)
+            for model, per_minute in (rate_limits or {}).items()
+        }
+        self._in_flight = InFlightLimit(max_in_flight)
+
+    def throttle(self, model):
+        limiter = self._limiters.get(model)
+        if limiter:
+            delay = limiter.reserve()
+            if delay > 0:
+                time.sleep(delay)
+
+    async def athrottle(self, model):
+        limiter = self._limiters.get(model)
+        if limiter:
+            delay = limiter.reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+    def map(self, fn, items, model=None):
+        """Call fn on every item from the thread pool, returning ordered results"""
+
+        def call(item):
+            self._in_flight.acquire()
+            try:
+                self.throttle(model)
+                return fn(item)
+            finally:
+                self._in_flight.release()
+
+        return list(self._pool.map(call, items))
+
+    async def amap(self, fn, items, model=None):
+        """Await fn on every item with at most max_in_flight running at once
+
+        fn may be a coroutine function or a blocking function; blocking
+        functions are run in a worker thread.
+        """
+
+        async def call(item):
+            await self._in_flight.aacquire()
+            try:
+                await self.athrottle(model)
+                if asyncio.iscoroutinefunction(fn):
+                    return await fn(item)
+                return await asyncio.to_thread(fn, item)
+            finally:
+                self._in_flight.release()
+
+        return await asyncio.gather(*(call(item) for item in items))
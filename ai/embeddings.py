@@ -0,0 +1,111 @@
+import threading
+from concurrent.futures import Future
+
+import tiktoken
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+# OpenAI caps a single embeddings.create call at 2048 inputs
+MAX_INPUTS_PER_BATCH = 2048
+
+tokenizer = tiktoken.get_encoding("cl100k_base")  # For embedding-3 models
+
+
+def plan_batches(texts, token_budget, max_inputs=MAX_INPUTS_PER_BATCH):
+    """Group text indexes into batches that stay within the token budget"""
+    batches = []
+    current = []
+    current_tokens = 0
+    for index, text in enumerate(texts):
+        tokens = len(tokenizer.encode(text))
+        if current and (
+            current_tokens + tokens > token_budget or len(current) >= max_inputs
+        ):
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.append(index)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+class EmbeddingBatcher:
+    """Coalesce embedding requests into multi-input embeddings.create calls
+
+    Texts submitted within `window` seconds of each other (from the same
+    request or from concurrent requests) are merged, split into batches by
+    token budget and sent together. Each caller gets back only its own
+    vectors, in the order it submitted them.
+    """
+
+    def __init__(self, client, model=EMBEDDING_MODEL, token_budget=100_000, window=0.05):
+        self.client = client
+        self.model = model
+        self.token_budget = token_budget
+        self.window = window
+        self._lock = threading.Lock()
+        self._pending = []
+        self._timer = None
+
+    def embed(self, texts):
+        """Embed texts, returning (vectors, number of API batches used)"""
+        texts = list(texts)
+        if not texts:
+            return [], 0
+
+        future = Future()
+        with self._lock:
+            self._pending.append((texts, future))
+            if self._timer is None:
+                self._timer = threading.Timer(self.window, self._flush)
+                self._timer.daemon = True
+                self._timer.start()
+        return future.result()
+
+    def _flush(self):
+        with self._lock:
+            pending = self._pending
+            self._pending = []
+            self._timer = None
+
+        # Flatten every caller's texts, remembering who owns each one
+        texts = []
+        owners = []
+        for owner, (request_texts, _) in enumerate(pending):
+            texts.extend(request_texts)
+            owners.extend([owner] * len(request_texts))
+
+        try:
+            batches = plan_batches(texts, self.token_budget)
+        except Exception as e:
+            for _, future in pending:
+                future.set_exception(e)
+            return
+
+        vectors = [None] * len(texts)
+        batch_counts = [0] * len(pending)
+        errors = {}
+        for batch in batches:
+            batch_owners = {owners[i] for i in batch}
+            try:
+                response = self.client.embeddings.create(
+                    model=self.model, input=[texts[i] for i in batch]
+                )
+                for item in response.data:
+                    vectors[batch[item.index]] = item.embedding
+            except Exception as e:
+                for owner in batch_owners:
+                    errors.setdefault(owner, e)
+            for owner in batch_owners:
+                batch_counts[owner] += 1
+
+        offset = 0
+        for owner, (request_texts, future) in enumerate(pending):
+            if owner in errors:
+                future.set_exception(errors[owner])
+            else:
+                future.set_result(
+                    (vectors[offset : offset + len(request_texts)], batch_counts[owner])
+                )
+            offset += len(request_texts)
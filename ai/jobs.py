@@ -0,0 +1,98 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import EmbeddingJob, EmbeddingJobEvent
+
+MAX_ATTEMPTS = 3
+
+
+def enqueue_embedding_job(user_id, event_ids):
+    """Queue events for embedding, reusing the user's queued job if there is one"""
+    with transaction.atomic():
+        job = (
+            EmbeddingJob.objects.select_for_update()
+            .filter(user_id=user_id, status=EmbeddingJob.QUEUED)
+            .order_by("created_at")
+            .first()
+        )
+        if job is None:
+            job = EmbeddingJob.objects.create(user_id=user_id)
+        EmbeddingJobEvent.objects.bulk_create(
+            [EmbeddingJobEvent(job=job, event_id=event_id) for event_id in event_ids],
+            ignore_conflicts=True,
+        )
+    return job
+
+
+def claim_next_job():
+    """Claim the oldest queued job with SELECT ... FOR UPDATE SKIP LOCKED"""
+    with transaction.atomic():
+        job = (
+            EmbeddingJob.objects.select_for_update(skip_locked=True)
+            .filter(status=EmbeddingJob.QUEUED)
+            .order_by("created_at")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = EmbeddingJob.RUNNING
+        job.attempts += 1
+        job.started_at = timezone.now()
+        job.save(update_fields=["status", "attempts", "started_at", "updated_at"])
+    return job
+
+
+def requeue_stale_jobs(stale_after):
+    """Put back jobs whose worker died mid-run, failing ones out of attempts"""
+    cutoff = timezone.now() - timedelta(seconds=stale_after)
+    stale = EmbeddingJob.objects.filter(
+        status=EmbeddingJob.RUNNING, started_at__lt=cutoff
+    )
+    stale.filter(attempts__gte=MAX_ATTEMPTS).update(
+        status=EmbeddingJob.FAILED,
+        error="Worker stopped before the job finished",
+        finished_at=timezone.now(),
+    )
+    return stale.update(status=EmbeddingJob.QUEUED)
+
+
+def mark_event(job, event_id, status, error=None):
+    EmbeddingJobEvent.objects.filter(job=job, event_id=event_id).update(
+        status=status, error=error, updated_at=timezone.now()
+    )
+
+
+def finish_job(job, error=None):
+    """Mark a job done, or failed with its remaining events"""
+    now = timezone.now()
+    # Anything still pending was either interrupted or no longer belongs to the user
+    job.events.filter(status=EmbeddingJobEvent.PENDING).update(
+        status=EmbeddingJobEvent.FAILED,
+        error=error if error is not None else "Event not found",
+        updated_at=now,
+    )
+    job.status = EmbeddingJob.FAILED if error is not None else EmbeddingJob.DONE
+    job.error = error
+    job.finished_at = now
+    job.save(update_fields=["status", "error", "finished_at", "updated_at"])
+
+
+def job_progress(job):
+    """Summarize a job and the status of each of its events"""
+    events = list(job.events.order_by("id").values("event_id", "status", "error"))
+    counts = {status: 0 for status, _ in EmbeddingJobEvent.STATUS_CHOICES}
+    for event in events:
+        counts[event["status"]] += 1
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "error": job.error,
+        "total": len(events),
+        **counts,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "events": events,
+    }
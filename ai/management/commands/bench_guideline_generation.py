@@ -0,0 +1,78 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+PROMPTS = {
+    "question": "./ai/prompts/application-question-guideline.txt",
+    "editor": "./ai/prompts/application-editor-guideline.txt",
+}
+DEFAULT_QUESTIONS = [
+    "지원동기와 입사 후 포부를 작성해 주세요.",
+    "본인의 강점이 잘 드러나는 경험을 서술하고, 그것이 직무에 어떻게 도움이 될지 설명하시오.",
+    "팀 프로젝트에서 갈등을 해결했던 경험을 구체적으로 작성해 주세요.",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare chain and structured guideline generation against the OpenAI API "
+        "for latency, token usage and JSON parse failures (makes real API calls)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--kind", choices=list(PROMPTS), default="question")
+        parser.add_argument(
+            "--questions",
+            nargs="+",
+            default=DEFAULT_QUESTIONS,
+            help="Question texts to generate guidelines for",
+        )
+        parser.add_argument(
+            "--runs", type=int, default=3, help="Generations per question per mode"
+        )
+        parser.add_argument(
+            "--modes",
+            nargs="+",
+            choices=["chain", "structured"],
+            default=["chain", "structured"],
+        )
+
+    def handle(self, *args, **options):
+        from ai.views import _generate_guideline
+
+        self.stdout.write(
+            f"{'mode':>10} {'p50':>7} {'max':>7} {'calls':>6} "
+            f"{'in tok':>7} {'out tok':>8} {'parse fail':>11}"
+        )
+        for mode in options["modes"]:
+            latencies, failures, errors = [], 0, 0
+            usage = {}
+            for question_id, question in enumerate(options["questions"], start=1):
+                for _ in range(options["runs"]):
+                    start = time.perf_counter()
+                    try:
+                        data, parsed = _generate_guideline(
+                            PROMPTS[options["kind"]],
+                            {"question_id": question_id, "question": question},
+                            mode=mode,
+                            usage=usage,
+                        )
+                    except Exception as e:
+                        errors += 1
+                        self.stderr.write(f"{mode}: {e}")
+                        continue
+                    latencies.append(time.perf_counter() - start)
+                    if not parsed or not (data.get("content") or "").strip():
+                        failures += 1
+            if not latencies:
+                continue
+            n = len(latencies)
+            self.stdout.write(
+                f"{mode:>10} {statistics.median(latencies):>6.2f}s "
+                f"{max(latencies):>6.2f}s {usage.get('calls', 0) / n:>6.1f} "
+                f"{usage.get('input_tokens', 0) / n:>7.0f} "
+                f"{usage.get('output_tokens', 0) / n:>8.0f} "
+                f"{failures:>5}/{n:<5}"
+                + (f" ({errors} errors)" if errors else "")
+            )
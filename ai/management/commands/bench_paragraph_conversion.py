@@ -0,0 +1,95 @@
+import asyncio
+import random
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ai.concurrency import LLMExecutor
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare serial and concurrent paragraph conversion against a fake LLM "
+        "with injected latency (no OpenAI calls are made)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=int,
+            nargs="+",
+            default=[10, 50, 200],
+            help="Number of events per run",
+        )
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=0.2,
+            help="Mean fake LLM latency in seconds",
+        )
+        parser.add_argument(
+            "--jitter",
+            type=float,
+            default=0.05,
+            help="Uniform +/- jitter added to each call in seconds",
+        )
+        parser.add_argument(
+            "--max-in-flight",
+            type=int,
+            default=settings.LLM_MAX_IN_FLIGHT,
+            help="Concurrency limit for the executor",
+        )
+        parser.add_argument(
+            "--rate-limit",
+            type=int,
+            default=None,
+            help="Requests per minute for the fake model (default: unlimited)",
+        )
+
+    def handle(self, *args, **options):
+        latency = options["latency"]
+        jitter = options["jitter"]
+        rate_limits = {"fake": options["rate_limit"]} if options["rate_limit"] else {}
+        executor = LLMExecutor(
+            max_in_flight=options["max_in_flight"], rate_limits=rate_limits
+        )
+
+        def delay():
+            return max(0.0, latency + random.uniform(-jitter, jitter))
+
+        def fake_convert(event):
+            time.sleep(delay())
+            return f"paragraph for event {event}"
+
+        async def afake_convert(event):
+            await asyncio.sleep(delay())
+            return f"paragraph for event {event}"
+
+        self.stdout.write(
+            f"latency={latency}s jitter={jitter}s max_in_flight={options['max_in_flight']}"
+        )
+        self.stdout.write(
+            f"{'events':>7} {'serial':>9} {'threads':>9} {'asyncio':>9} {'speedup':>8}"
+        )
+        for size in options["sizes"]:
+            events = list(range(size))
+            expected = [f"paragraph for event {event}" for event in events]
+
+            start = time.perf_counter()
+            serial = [fake_convert(event) for event in events]
+            serial_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            threaded = executor.map(fake_convert, events, model="fake")
+            threaded_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            gathered = asyncio.run(executor.amap(afake_convert, events, model="fake"))
+            async_time = time.perf_counter() - start
+
+            assert serial == threaded == gathered == expected, "results out of order"
+            self.stdout.write(
+                f"{size:>7} {serial_time:>8.2f}s {threaded_time:>8.2f}s "
+                f"{async_time:>8.2f}s {serial_time / threaded_time:>7.1f}x"
+            )
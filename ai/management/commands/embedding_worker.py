@@ -0,0 +1,84 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from ai.jobs import claim_next_job, finish_job, mark_event, requeue_stale_jobs
+from ai.models import EmbeddingJobEvent
+from ai.views import _embed_events
+from utils.supabase_utils import get_service_client
+
+
+class Command(BaseCommand):
+    help = (
+        "Process queued embedding jobs (paragraph conversion -> embedding -> save). "
+        "Run as many workers as needed; jobs are claimed with FOR UPDATE SKIP LOCKED."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit when the queue is empty instead of polling",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2.0,
+            help="Seconds to wait between polls of an empty queue",
+        )
+        parser.add_argument(
+            "--stale-after",
+            type=int,
+            default=900,
+            help="Requeue running jobs older than this many seconds",
+        )
+
+    def handle(self, *args, **options):
+        # Workers have no user JWT, so they read with the service role key
+        # (DB_SERVICE_ROLE_KEY); _embed_events scopes every query to job.user_id.
+        # Fails here, before claiming a job, if the key isn't configured.
+        supabase = get_service_client()
+
+        while True:
+            requeued = requeue_stale_jobs(options["stale_after"])
+            if requeued:
+                self.stdout.write(f"Requeued {requeued} stale job(s)")
+
+            job = claim_next_job()
+            if job is None:
+                if options["once"]:
+                    break
+                time.sleep(options["poll_interval"])
+                continue
+
+            self._run_job(supabase, job)
+
+    def _run_job(self, supabase, job):
+        event_ids = list(
+            job.events.filter(status=EmbeddingJobEvent.PENDING).values_list(
+                "event_id", flat=True
+            )
+        )
+        self.stdout.write(f"Job {job.id}: embedding {len(event_ids)} event(s)")
+        try:
+            result = _embed_events(
+                supabase,
+                job.user_id,
+                event_ids,
+                on_progress=lambda event_id, error=None: mark_event(
+                    job,
+                    event_id,
+                    EmbeddingJobEvent.FAILED if error else EmbeddingJobEvent.DONE,
+                    error,
+                ),
+            )
+        except Exception as e:
+            finish_job(job, error=str(e))
+            self.stderr.write(f"Job {job.id} failed: {e}")
+            return
+
+        finish_job(job)
+        self.stdout.write(
+            f"Job {job.id}: converted {result['paragraphs']} paragraph(s), "
+            f"saved {result['count']} embedding(s) in {result['batches']} batch(es)"
+        )
@@ -0,0 +1,106 @@
+import random
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from ai.models import QuestionCache
+from ai.similarity import parse_vector
+
+JUDGE_PROMPT = (
+    "아래 가이드라인은 문항 B를 위해 작성되었습니다. 이 가이드라인을 문항 A에 그대로 "
+    "보여줘도 지원자에게 적절한지 판단하세요. 'yes' 또는 'no'로만 답하세요.\n\n"
+    "문항 A: {question}\n문항 B: {neighbour}\n\n가이드라인:\n{guideline}"
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Report semantic guideline cache hit rate per similarity threshold, using "
+        "each cached question's nearest other question, with sampled pairs to "
+        "check that reused guidelines still fit"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--field",
+            choices=["guideline", "editor_guideline"],
+            default="guideline",
+        )
+        parser.add_argument(
+            "--thresholds",
+            type=float,
+            nargs="+",
+            default=[0.8, 0.85, 0.88, 0.9, 0.92, 0.95],
+        )
+        parser.add_argument(
+            "--sample",
+            type=int,
+            default=5,
+            help="Hit pairs sampled per threshold for quality review",
+        )
+        parser.add_argument(
+            "--judge",
+            action="store_true",
+            help="Ask gpt-4o-mini whether each sampled guideline fits (costs API calls)",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        field = options["field"]
+        rows = list(
+            QuestionCache.objects.filter(
+                expires_at__gt=timezone.now(),
+                question_embedding__isnull=False,
+                **{f"{field}__isnull": False},
+            ).values("question", "question_embedding", field)
+        )
+        if len(rows) < 2:
+            self.stdout.write("Need at least two cached questions with embeddings")
+            return
+
+        matrix = np.asarray(
+            [parse_vector(row["question_embedding"]) for row in rows],
+            dtype=np.float32,
+        )
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+        similarity = matrix @ matrix.T
+        np.fill_diagonal(similarity, -1.0)
+        nearest = similarity.argmax(axis=1)
+        best = similarity[np.arange(len(rows)), nearest]
+
+        rng = random.Random(options["seed"])
+        self.stdout.write(f"{len(rows)} cached questions ({field})")
+        self.stdout.write(f"{'threshold':>9} {'hit rate':>9} {'judged ok':>10}")
+        for threshold in sorted(options["thresholds"]):
+            hits = [i for i in range(len(rows)) if best[i] >= threshold]
+            sample = rng.sample(hits, min(options["sample"], len(hits)))
+            verdicts = [
+                self._judge(rows[i]["question"], rows[nearest[i]], field)
+                for i in sample
+                if options["judge"]
+            ]
+            judged = f"{sum(verdicts)}/{len(verdicts)}" if verdicts else "-"
+            self.stdout.write(
+                f"{threshold:>9.2f} {len(hits) / len(rows):>8.1%} {judged:>10}"
+            )
+            for i in sample:
+                self.stdout.write(
+                    f"    {best[i]:.3f}  {rows[i]['question'][:40]!r} -> "
+                    f"{rows[nearest[i]]['question'][:40]!r}"
+                )
+
+    def _judge(self, question, neighbour, field):
+        from ai.views import client
+
+        response = client.responses.create(
+            model="gpt-4o-mini",
+            temperature=0,
+            max_output_tokens=5,
+            input=JUDGE_PROMPT.format(
+                question=question,
+                neighbour=neighbour["question"],
+                guideline=neighbour[field],
+            ),
+        )
+        return response.output_text.strip().lower().startswith("yes")
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.4 on 2026-10-18 18:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0009_remove_activityembedding_favorite'),
+        ('ai', '0003_eventsuggestion_event'),
+        ('users', '0005_alter_profile_user_id_delete_supabaseuser'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmbeddingJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.TextField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued')),
+                ('attempts', models.IntegerField(default=0)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='users.profile')),
+            ],
+            options={
+                'db_table': 'embedding_job',
+            },
+        ),
+        migrations.CreateModel(
+            name='EmbeddingJobEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.TextField(choices=[('pending', 'Pending'), ('done', 'Done'), ('failed', 'Failed')], default='pending')),
+                ('error', models.TextField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='activities.event')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='ai.embeddingjob')),
+            ],
+            options={
+                'db_table': 'embedding_job_event',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='embeddingjob',
+            index=models.Index(fields=['status', 'created_at'], name='embedding_j_status_23fa98_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='embeddingjobevent',
+            constraint=models.UniqueConstraint(fields=('job', 'event'), name='unique_embedding_job_event'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-18 18:51
+
+import pgvector.django.vector
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai', '0004_embeddingjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('question_hash', models.CharField(max_length=64, unique=True)),
+                ('question', models.TextField()),
+                ('paragraph', models.TextField(blank=True, null=True)),
+                ('embedding', pgvector.django.vector.VectorField(blank=True, dimensions=1536, null=True)),
+                ('guideline', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('expires_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'question_cache',
+                'indexes': [models.Index(fields=['expires_at'], name='question_ca_expires_149c2a_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-18 18:53
+
+import pgvector.django.indexes
+import pgvector.django.vector
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai', '0005_questioncache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='questioncache',
+            name='editor_guideline',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='questioncache',
+            name='question_embedding',
+            field=pgvector.django.vector.VectorField(blank=True, dimensions=1536, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='questioncache',
+            index=pgvector.django.indexes.HnswIndex(ef_construction=64, fields=['question_embedding'], m=16, name='question_cache_hnsw_idx', opclasses=['vector_cosine_ops']),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.4 on 2026-10-18 19:28
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai', '0006_questioncache_semantic'),
+    ]
+
+    operations = [
+        # question_cache is shared by every user and only ever read and written
+        # by the server (ai/question_cache.py, through the Django connection,
+        # which owns the table and is not subject to RLS). Keep PostgREST
+        # clients out entirely, or one user could plant a guideline that is
+        # then served to everyone asking the same question. RLS with no
+        # policies denies all rows; the Supabase roles are skipped where they
+        # don't exist.
+        migrations.RunSQL(
+            sql="""
+                ALTER TABLE question_cache ENABLE ROW LEVEL SECURITY;
+                DO $$
+                BEGIN
+                    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'anon') THEN
+                        REVOKE ALL ON TABLE question_cache FROM anon;
+                    END IF;
+                    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'authenticated') THEN
+                        REVOKE ALL ON TABLE question_cache FROM authenticated;
+                    END IF;
+                END;
+                $$;
+            """,
+            reverse_sql="""
+                ALTER TABLE question_cache DISABLE ROW LEVEL SECURITY;
+            """,
+        ),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 5.2.4 on 2026-10-18 19:28
+
+from django.db import migrations
+
+
+def _replace_fk(table, column, target, target_column, on_delete=""):
+    # Django emulates on_delete=CASCADE in the ORM and creates the constraint
+    # without a database action; swap it for one that has it
+    return f"""
+        DO $$
+        DECLARE
+            fk record;
+        BEGIN
+            FOR fk IN
+                SELECT c.conname
+                FROM pg_constraint c
+                JOIN pg_attribute a
+                  ON a.attrelid = c.conrelid AND a.attnum = ANY(c.conkey)
+                WHERE c.contype = 'f'
+                  AND c.conrelid = '{table}'::regclass
+                  AND c.confrelid = '{target}'::regclass
+                  AND a.attname = '{column}'
+            LOOP
+                EXECUTE format('ALTER TABLE {table} DROP CONSTRAINT %I', fk.conname);
+            END LOOP;
+        END;
+        $$;
+        ALTER TABLE {table}
+            ADD CONSTRAINT {table}_{column}_fk
+            FOREIGN KEY ({column}) REFERENCES {target} ({target_column})
+            {on_delete} DEFERRABLE INITIALLY DEFERRED;
+    """
+
+
+FOREIGN_KEYS = (
+    ("embedding_job", "user_id", "profile", "user_id"),
+    ("embedding_job_event", "job_id", "embedding_job", "id"),
+    ("embedding_job_event", "event_id", "event", "id"),
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai', '0007_questioncache_lockdown'),
+    ]
+
+    operations = [
+        # Events, activities and profiles are deleted through PostgREST, not
+        # the ORM, so the job rows referencing them must cascade in the
+        # database or those deletes fail once an event has been queued.
+        migrations.RunSQL(
+            sql="".join(
+                _replace_fk(*fk, on_delete="ON DELETE CASCADE") for fk in FOREIGN_KEYS
+            ),
+            reverse_sql="".join(_replace_fk(*fk) for fk in FOREIGN_KEYS),
+        ),
+        # The job tables are only used by the server (ai/jobs.py and the
+        # worker, through the Django connection, which owns them and is not
+        # subject to RLS); keep PostgREST clients out like collection_version.
+        migrations.RunSQL(
+            sql="""
+                ALTER TABLE embedding_job ENABLE ROW LEVEL SECURITY;
+                ALTER TABLE embedding_job_event ENABLE ROW LEVEL SECURITY;
+                DO $$
+                BEGIN
+                    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'anon') THEN
+                        REVOKE ALL ON TABLE embedding_job, embedding_job_event FROM anon;
+                    END IF;
+                    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'authenticated') THEN
+                        REVOKE ALL ON TABLE embedding_job, embedding_job_event FROM authenticated;
+                    END IF;
+                END;
+                $$;
+            """,
+            reverse_sql="""
+                ALTER TABLE embedding_job DISABLE ROW LEVEL SECURITY;
+                ALTER TABLE embedding_job_event DISABLE ROW LEVEL SECURITY;
+            """,
+        ),
+    ]
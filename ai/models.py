@@ -1,4 +1,6 @@
 from django.db import models
+from pgvector.django import VectorField, HnswIndex
+from users.models import Profile
 from applications.models import QuestionList
 from activities.models import Event
 
@@ -12,3 +14,85 @@ class EventSuggestion(models.Model):
 
     class Meta:
         db_table = "event_suggestion"
+
+
+class EmbeddingJob(models.Model):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    user = models.ForeignKey(Profile, on_delete=models.CASCADE)
+    status = models.TextField(choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.IntegerField(default=0)
+    error = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "embedding_job"
+        indexes = [models.Index(fields=["status", "created_at"])]
+
+
+class EmbeddingJobEvent(models.Model):
+    PENDING = "pending"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    job = models.ForeignKey(
+        EmbeddingJob, on_delete=models.CASCADE, related_name="events"
+    )
+    event = models.ForeignKey(Event, on_delete=models.CASCADE)
+    status = models.TextField(choices=STATUS_CHOICES, default=PENDING)
+    error = models.TextField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "embedding_job_event"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["job", "event"], name="unique_embedding_job_event"
+            )
+        ]
+
+
+class QuestionCache(models.Model):
+    """User-independent AI results for a question text, keyed by its normalized hash"""
+
+    question_hash = models.CharField(max_length=64, unique=True)
+    question = models.TextField()
+    # embedding of the question text itself, used for the semantic lookup
+    question_embedding = VectorField(dimensions=1536, null=True, blank=True)
+    paragraph = models.TextField(null=True, blank=True)
+    embedding = VectorField(dimensions=1536, null=True, blank=True)
+    guideline = models.TextField(null=True, blank=True)
+    editor_guideline = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "question_cache"
+        indexes = [
+            models.Index(fields=["expires_at"]),
+            HnswIndex(
+                name="question_cache_hnsw_idx",
+                fields=["question_embedding"],
+                m=16,
+                ef_construction=64,
+                opclasses=["vector_cosine_ops"],
+            ),
+        ]
@@ -0,0 +1,227 @@
+import hashlib
+import re
+import threading
+import unicodedata
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+from utils.cache import LRUCache
+from utils import metrics
+from pgvector.django import CosineDistance
+
+from .models import QuestionCache
+from .similarity import parse_vector
+
+CACHED_FIELDS = (
+    "question_embedding",
+    "paragraph",
+    "embedding",
+    "guideline",
+    "editor_guideline",
+)
+EXACT = "exact"
+SEMANTIC = "semantic"
+MISS = "miss"
+
+_memory = LRUCache(
+    max_entries=settings.QUESTION_CACHE_MEMORY_ENTRIES,
+    ttl=settings.QUESTION_CACHE_MEMORY_TTL,
+)
+_lock = threading.Lock()
+_counters = {
+    "memory_hits": 0,
+    "db_hits": 0,
+    "misses": 0,
+    "semantic_hits": 0,
+    "semantic_misses": 0,
+    "writes": 0,
+}
+
+
+def normalize_question(text):
+    """Fold width/compatibility forms and whitespace so copies of a posting match"""
+    text = unicodedata.normalize("NFKC", text or "")
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def question_hash(text):
+    return hashlib.sha256(normalize_question(text).encode("utf-8")).hexdigest()
+
+
+def get_cached(question, *fields):
+    """Return {field: value} for this question text if every field is cached, else None"""
+    cached, outcome = _lookup(question, fields)
+    _count(outcome)
+    return cached
+
+
+def _lookup(question, fields):
+    """get_cached without the hit/miss counters; returns (cached, counter name)"""
+    key = question_hash(question)
+    entry = _memory.get(key)
+    if entry is not None and all(entry.get(field) is not None for field in fields):
+        return {field: entry[field] for field in fields}, "memory_hits"
+
+    row = (
+        QuestionCache.objects.filter(question_hash=key, expires_at__gt=timezone.now())
+        .values(*CACHED_FIELDS)
+        .first()
+    )
+    if row is None or any(row[field] is None for field in fields):
+        return None, "misses"
+    for field in ("question_embedding", "embedding"):
+        if row[field] is not None:
+            row[field] = [float(x) for x in parse_vector(row[field])]
+    _memory.set(key, row)
+    return {field: row[field] for field in fields}, "db_hits"
+
+
+def find_nearest(question_embedding, field):
+    """Return (value, similarity) of the closest cached question above the threshold"""
+    row = (
+        QuestionCache.objects.filter(
+            expires_at__gt=timezone.now(), **{f"{field}__isnull": False}
+        )
+        .exclude(question_embedding__isnull=True)
+        .annotate(distance=CosineDistance("question_embedding", question_embedding))
+        .order_by("distance")
+        .values(field, "distance")
+        .first()
+    )
+    if row is None or 1 - row["distance"] < settings.SEMANTIC_CACHE_THRESHOLD:
+        _count("semantic_misses")
+        return None
+    _count("semantic_hits")
+    return row[field], 1 - row["distance"]
+
+
+def find_guideline(question, field, embed):
+    """Look up a guideline by exact text, then by a similar question
+
+    `embed(text)` returns the question-text embedding and is only called
+    when the exact entry does not already hold one. Returns
+    (content or None, EXACT/SEMANTIC/MISS, question_embedding). A failed
+    lookup (embedding API or database) counts as a MISS so the caller
+    generates the guideline instead.
+    """
+    try:
+        cached, outcome = _lookup(question, (field,))
+        # One hit or miss per lookup; the embedding read below isn't counted
+        _count(outcome)
+        if cached is not None:
+            return cached[field], EXACT, None
+
+        cached, _ = _lookup(question, ("question_embedding",))
+        question_embedding = (
+            cached["question_embedding"]
+            if cached is not None
+            else embed(normalize_question(question))
+        )
+        nearest = find_nearest(question_embedding, field)
+        if nearest is not None:
+            if cached is None:
+                # Keep the embedding so the next lookup for this text skips the API call
+                store(question, question_embedding=question_embedding)
+            return nearest[0], SEMANTIC, question_embedding
+        return None, MISS, question_embedding
+    except Exception as e:
+        print(f"Error looking up question cache: {e}")
+        return None, MISS, None
+
+
+async def afind_guideline(question, field, aembed):
+    """find_guideline for async views; `aembed(text)` is a coroutine"""
+    try:
+        cached, outcome = await sync_to_async(_lookup)(question, (field,))
+        _count(outcome)
+        if cached is not None:
+            return cached[field], EXACT, None
+
+        cached, _ = await sync_to_async(_lookup)(question, ("question_embedding",))
+        question_embedding = (
+            cached["question_embedding"]
+            if cached is not None
+            else await aembed(normalize_question(question))
+        )
+        nearest = await sync_to_async(find_nearest)(question_embedding, field)
+        if nearest is not None:
+            if cached is None:
+                await sync_to_async(store)(
+                    question, question_embedding=question_embedding
+                )
+            return nearest[0], SEMANTIC, question_embedding
+        return None, MISS, question_embedding
+    except Exception as e:
+        print(f"Error looking up question cache: {e}")
+        return None, MISS, None
+
+
+def store(question, **fields):
+    """Save paragraph/embedding/guideline for this question text
+
+    None values are skipped rather than written, so e.g. a guideline stored
+    after a failed embedding lookup keeps the row's question_embedding.
+    """
+    fields = {field: value for field, value in fields.items() if value is not None}
+    key = question_hash(question)
+    now = timezone.now()
+    row, created = QuestionCache.objects.update_or_create(
+        question_hash=key,
+        defaults={
+            "question": normalize_question(question),
+            "expires_at": now + timedelta(seconds=settings.QUESTION_CACHE_TTL),
+            **fields,
+        },
+    )
+    _memory.set(
+        key,
+        {
+            field: (
+                [float(x) for x in getattr(row, field)]
+                if field in ("question_embedding", "embedding")
+                and getattr(row, field) is not None
+                else getattr(row, field)
+            )
+            for field in CACHED_FIELDS
+        },
+    )
+    _count("writes")
+    if created:
+        _prune(now)
+
+
+def stats():
+    with _lock:
+        counters = dict(_counters)
+    lookups = counters["memory_hits"] + counters["db_hits"] + counters["misses"]
+    hits = counters["memory_hits"] + counters["db_hits"]
+    semantic_lookups = counters["semantic_hits"] + counters["semantic_misses"]
+    return {
+        **counters,
+        "hit_rate": hits / lookups if lookups else 0.0,
+        "semantic_hit_rate": (
+            counters["semantic_hits"] / semantic_lookups if semantic_lookups else 0.0
+        ),
+        "memory": _memory.stats(),
+    }
+
+
+def _prune(now):
+    QuestionCache.objects.filter(expires_at__lte=now).delete()
+    overflow = QuestionCache.objects.count() - settings.QUESTION_CACHE_MAX_ROWS
+    if overflow > 0:
+        oldest = QuestionCache.objects.order_by("expires_at").values_list(
+            "id", flat=True
+        )[:overflow]
+        QuestionCache.objects.filter(id__in=list(oldest)).delete()
+
+
+def _count(name):
+    with _lock:
+        _counters[name] += 1
+
+
+metrics.register("question_cache", stats)
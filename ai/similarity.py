@@ -0,0 +1,146 @@
+import json
+
+import numpy as np
+from django.conf import settings
+
+from utils.cache import LRUCache
+from utils import metrics
+
+# activity_embedding.embedding dimensions
+EMBEDDING_DIMENSIONS = 1536
+
+
+def parse_vector(value):
+    """Parse a pgvector column, which PostgREST returns as text like "[0.1,0.2]"."""
+    return json.loads(value) if isinstance(value, str) else value
+
+
+class UserEmbeddingMatrix:
+    """A user's event embeddings as one normalized float32 matrix"""
+
+    def __init__(self, event_ids, vectors):
+        self.event_ids = np.asarray(event_ids, dtype=np.int64)
+        if not len(event_ids):
+            # reshape(0, -1) can't infer the width of an empty matrix
+            matrix = np.empty((0, EMBEDDING_DIMENSIONS), dtype=np.float32)
+        else:
+            matrix = np.asarray(vectors, dtype=np.float32).reshape(len(event_ids), -1)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self.matrix = matrix / norms
+
+    @property
+    def nbytes(self):
+        return self.matrix.nbytes + self.event_ids.nbytes
+
+    def top_k(self, query_embedding, k, threshold=0.0):
+        """Return the k most cosine-similar events above threshold, best first"""
+        if not len(self.event_ids) or k <= 0:
+            return []
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query /= np.linalg.norm(query) or 1.0
+        scores = self.matrix @ query
+        if k < len(scores):
+            candidates = np.argpartition(-scores, k - 1)[:k]
+        else:
+            candidates = np.arange(len(scores))
+        ranked = candidates[np.argsort(-scores[candidates])]
+        return [
+            {"event_id": int(self.event_ids[i]), "similarity": float(scores[i])}
+            for i in ranked
+            if scores[i] > threshold
+        ]
+
+
+class UserEmbeddingCache:
+    """LRU of per-user embedding matrices with a memory ceiling
+
+    Entries are dropped when the user's embeddings are rewritten in this
+    process and otherwise expire after `ttl` seconds, which bounds how
+    stale a matrix can get when another process (the embedding worker)
+    rewrote the rows.
+    """
+
+    def __init__(self, max_bytes, ttl):
+        self._cache = LRUCache(
+            max_bytes=max_bytes, ttl=ttl, sizeof=lambda entry: entry.nbytes
+        )
+
+    def get(self, supabase, user_id):
+        entry = self._cache.get(user_id)
+        if entry is None:
+            entry = self._load(supabase, user_id)
+            self._cache.set(user_id, entry)
+        return entry
+
+    async def aget(self, supabase, user_id):
+        """Same as get() with an async Supabase client"""
+        entry = self._cache.get(user_id)
+        if entry is None:
+            result = await self._query(supabase, user_id).execute()
+            entry = self._to_matrix(result.data or [])
+            self._cache.set(user_id, entry)
+        return entry
+
+    def invalidate(self, user_id):
+        self._cache.invalidate(user_id)
+
+    def stats(self):
+        return self._cache.stats()
+
+    def _load(self, supabase, user_id):
+        return self._to_matrix(self._query(supabase, user_id).execute().data or [])
+
+    def _query(self, supabase, user_id):
+        return (
+            supabase.table("activity_embedding")
+            .select("event_id, embedding")
+            .eq("user_id", user_id)
+        )
+
+    def _to_matrix(self, rows):
+        vectors = [parse_vector(row["embedding"]) for row in rows]
+        return UserEmbeddingMatrix([row["event_id"] for row in rows], vectors)
+
+
+user_embedding_cache = UserEmbeddingCache(
+    max_bytes=settings.EMBEDDING_CACHE_MAX_BYTES,
+    ttl=settings.EMBEDDING_CACHE_TTL,
+)
+metrics.register("user_embedding_cache", user_embedding_cache.stats)
+
+
+def match_user_events(supabase, user_id, query_embedding, match_threshold, match_count):
+    """Top matching events for a user, scored in-process or by the database"""
+    if settings.EMBEDDING_SCORING == "memory":
+        return user_embedding_cache.get(supabase, user_id).top_k(
+            query_embedding, match_count, match_threshold
+        )
+    response = supabase.rpc(
+        "match_user_documents",
+        _match_params(user_id, query_embedding, match_threshold, match_count),
+    ).execute()
+    return response.data or []
+
+
+async def amatch_user_events(
+    supabase, user_id, query_embedding, match_threshold, match_count
+):
+    """match_user_events with an async Supabase client"""
+    if settings.EMBEDDING_SCORING == "memory":
+        entry = await user_embedding_cache.aget(supabase, user_id)
+        return entry.top_k(query_embedding, match_count, match_threshold)
+    response = await supabase.rpc(
+        "match_user_documents",
+        _match_params(user_id, query_embedding, match_threshold, match_count),
+    ).execute()
+    return response.data or []
+
+
+def _match_params(user_id, query_embedding, match_threshold, match_count):
+    return {
+        "query_embedding": query_embedding,  # 1536-dimensional vector
+        "match_user_id": user_id,  # Only search this user's events
+        "match_threshold": match_threshold,  # Minimum similarity score
+        "match_count": match_count,  # Maximum results to return
+    }
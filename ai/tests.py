@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase, override_settings
+
+from .similarity import UserEmbeddingMatrix, match_user_events, user_embedding_cache
+
+
+class _Query:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def select(self, *args, **kwargs):
+        return self
+
+    def eq(self, *args):
+        return self
+
+    def execute(self):
+        return SimpleNamespace(data=self.rows, count=None)
+
+
+class _Supabase:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def table(self, name):
+        return _Query(self.rows)
+
+
+@override_settings(EMBEDDING_SCORING="memory")
+class MemoryScoringTests(SimpleTestCase):
+    def tearDown(self):
+        user_embedding_cache.invalidate("user")
+
+    def test_user_without_embeddings_has_no_matches(self):
+        matches = match_user_events(_Supabase([]), "user", [0.1, 0.2], 0.0, 5)
+        self.assertEqual(matches, [])
+
+    def test_empty_matrix(self):
+        entry = UserEmbeddingMatrix([], [])
+        self.assertEqual(entry.matrix.shape[0], 0)
+        self.assertEqual(entry.top_k([1.0, 0.0], 5), [])
+
+    def test_top_k_best_first(self):
+        rows = [
+            {"event_id": 1, "embedding": "[1.0, 0.0]"},
+            {"event_id": 2, "embedding": "[0.6, 0.8]"},
+            {"event_id": 3, "embedding": "[0.0, 1.0]"},
+        ]
+        matches = match_user_events(_Supabase(rows), "user", [0.0, 1.0], 0.1, 2)
+        self.assertEqual([match["event_id"] for match in matches], [3, 2])
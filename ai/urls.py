@@ -1,7 +1,9 @@
 from django.urls import path
 from . import views
+from . import async_views
 from .views import (
     GenerateEmbeddingsView,
+    EmbeddingJobStatusView,
     AnalyzeQuestionView,
     EventSuggestionView,
     ChatSessionView,
@@ -18,6 +20,17 @@ urlpatterns = [
         GenerateEmbeddingsView.as_view(),
         name="generate-embeddings",
     ),
+    path(
+        "embeddings/jobs/<int:job_id>/",
+        EmbeddingJobStatusView.as_view(),
+        name="embedding-job-status",
+    ),
+    # Async (ASGI) variants of the hot endpoints
+    path(
+        "async/embeddings/",
+        async_views.generate_embeddings,
+        name="generate-embeddings-async",
+    ),
     # 2. Question Analysis & Matching
     path(
         "questions/",
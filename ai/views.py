@@ -2,7 +2,10 @@ from django.shortcuts import render
 from django.views.decorators.csrf import csrf_exempt
 from django.http import JsonResponse
 import json
-from .models import EventSuggestion
+import hashlib
+import re
+from datetime import datetime, timezone
+from .models import EventSuggestion, EmbeddingJob
 from applications.models import QuestionList
 from activities.models import Activity, Event
 from openai import OpenAI
@@ -17,14 +20,58 @@ from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from django.conf import settings
 from utils.supabase_utils import get_supabase_client, get_user_id_from_token
+from utils.sse import sse_event
+from .embeddings import EmbeddingBatcher
+from .concurrency import LLMExecutor
+from .jobs import enqueue_embedding_job, job_progress
+from . import question_cache
+from .similarity import match_user_events, parse_vector, user_embedding_cache
 
 tokenizer = tiktoken.get_encoding("cl100k_base")  # For embedding-3 models
 environ.Env.read_env(env_file=os.path.join(settings.BASE_DIR, ".env"))
 env = environ.Env()
 client = OpenAI(api_key=env("OPENAI_KEY"))
-
-
-def _convert_to_paragraph(prompt_path, data):
+embedding_batcher = EmbeddingBatcher(
+    client,
+    token_budget=settings.EMBEDDING_BATCH_TOKEN_BUDGET,
+    window=settings.EMBEDDING_BATCH_WINDOW_MS / 1000,
+)
+llm_executor = LLMExecutor(
+    max_in_flight=settings.LLM_MAX_IN_FLIGHT,
+    rate_limits=settings.LLM_RATE_LIMITS,
+)
+# Strict structured-output format for single-call guideline generation
+GUIDELINE_SCHEMA = {
+    "type": "json_schema",
+    "name": "guideline",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "question_id": {"type": "integer"},
+            "content": {"type": "string"},
+        },
+        "required": ["question_id", "content"],
+        "additionalProperties": False,
+    },
+}
+# question_list columns needed to reuse a stored question embedding
+QUESTION_EMBEDDING_FIELDS = (
+    "application!inner(user_id), id, question, question_explanation, "
+    "question_hash, question_embedding"
+)
+# activities with their events and current embedding metadata
+EMBEDDING_SOURCES_SELECT = (
+    "id, favorite, activity_name, category, position, file_list, description, "
+    "keywords, start_date, end_date, "
+    "event!activity_id(id, event_name, situation, task, action, result, contribution, "
+    "start_date, end_date, updated_at, activity_embedding(metadata, updated_at))"
+)
+# rows per activity_embedding upsert request (~30KB of JSON per vector)
+EMBEDDING_UPSERT_CHUNK_SIZE = 100
+
+
+def _convert_to_paragraph(prompt_path, data, usage=None):
     """Convert text to paragraph format for embedding based on prompt requirements"""
     try:
         prompt = ""
@@ -35,49 +82,302 @@ def _convert_to_paragraph(prompt_path, data):
             input=f"{data}",
             instructions=f"{prompt}",
         )
+        if usage is not None:
+            _add_usage(usage, response)
         return response.output_text
     except Exception as e:
         print(f"Error reading prompt file: {e}")
         return ""
 
 
-def _check_embedding_status(supabase, user_id):
-    # Get all user events with their embedding status in one query
-    events_with_embeddings = (
-        supabase.table("event")
-        .select(
-            """
-            id, updated_at,
-            activity!inner(user_id),
-            activity_embedding(event_id, updated_at)
-        """
-        )
-        .eq("activity.user_id", user_id)
-        .execute()
+def _fingerprint(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _input_hash(activity, event):
+    """Hash of the canonical JSON that is sent to the paragraph LLM"""
+    canonical = json.dumps(
+        json.loads(_convert_to_json(activity, event)),
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":"),
     )
-    print(f"Total events found: {(events_with_embeddings.data)}")
+    return _fingerprint(canonical)
+
+
+def _fetch_embedding_sources(supabase, user_id):
+    """Get all user activities with their events and current embedding metadata"""
+    return (
+        supabase.table("activity")
+        .select(EMBEDDING_SOURCES_SELECT)
+        .eq("user_id", user_id)
+        .execute()
+    ).data
+
+
+def _current_embedding(event):
+    """Latest activity_embedding row of an event, or None"""
+    embeddings = event.get("activity_embedding") or []
+    if not embeddings:
+        return None
+    return max(embeddings, key=lambda embedding: embedding["updated_at"])
+
+
+def _check_embedding_status(supabase, user_id):
+    return _stale_event_ids(_fetch_embedding_sources(supabase, user_id))
+
+
+def _stale_event_ids(activities):
+    # Compare the fingerprint of each event's LLM input (which includes its
+    # parent activity) with the one stored when it was last embedded
     insert_event_ids = []
     update_event_ids = []
-    for event in events_with_embeddings.data:
-        embedding = event.get("activity_embedding")
-        if not embedding:
-            # No embedding exists
-            insert_event_ids.append(event["id"])
-        elif event["updated_at"] > embedding[0]["updated_at"]:
-            # Event updated since last embedding
-            update_event_ids.append(event["id"])
+    for activity in activities:
+        for event in activity.get("event", []):
+            embedding = _current_embedding(event)
+            if embedding is None:
+                # No embedding exists
+                insert_event_ids.append(event["id"])
+            elif (embedding.get("metadata") or {}).get("input_hash") != _input_hash(
+                activity, event
+            ):
+                # Event or its activity changed since last embedding
+                update_event_ids.append(event["id"])
     print(f"Events needing insert: {insert_event_ids}")
     print(f"Events needing update: {update_event_ids}")
     return {"insert": insert_event_ids, "update": update_event_ids}
 
 
+def _convert_to_json(activity, event=None):
+    """Convert activity and event data to structured JSON format"""
+    # Build activity JSON structure
+    activity_json = {
+        "favorite": activity.get("favorite", False),
+        "activity_name": activity.get("activity_name", ""),
+        "category": activity.get("category", ""),
+        "position": activity.get("position", ""),
+        "file_list": activity.get("file_list", []),
+        "start_date": activity.get("start_date", ""),
+        "end_date": activity.get("end_date", ""),
+        "description": activity.get("description", ""),
+        "keywords": activity.get("keywords", []),
+        "events": [],
+    }
+
+    # If event is provided, add it to events array
+    if event:
+        event_json = {
+            "event_name": event.get("event_name", ""),
+            "start_date": event.get("start_date", ""),
+            "end_date": event.get("end_date", ""),
+            "result": event.get("result", ""),
+            "situation": event.get("situation", ""),
+            "task": event.get("task", ""),
+            "action": event.get("action", ""),
+            "contribution": event.get("contribution", ""),
+        }
+        activity_json["events"].append(event_json)
+    else:
+        # If processing activity without specific event, get all events for this activity
+        events = activity.get("event", [])
+        for evt in events:
+            event_json = {
+                "event_name": evt.get("event_name", ""),
+                "start_date": evt.get("start_date", ""),
+                "end_date": evt.get("end_date", ""),
+                "result": evt.get("result", ""),
+                "situation": evt.get("situation", ""),
+                "task": evt.get("task", ""),
+                "action": evt.get("action", ""),
+                "contribution": evt.get("contribution", ""),
+            }
+            activity_json["events"].append(event_json)
+    return json.dumps(activity_json, ensure_ascii=False, indent=2)
+
+
+def _generate_embeddings(texts):
+    """Generate embeddings in token-budgeted batches using OpenAI API"""
+    return embedding_batcher.embed(texts)
+
+
+def _save_embeddings(supabase, rows):
+    """Bulk upsert embedding rows, replacing any existing vector for the same event"""
+    now = datetime.now(timezone.utc).isoformat()
+    for start in range(0, len(rows), EMBEDDING_UPSERT_CHUNK_SIZE):
+        chunk = [
+            {**row, "updated_at": now}
+            for row in rows[start : start + EMBEDDING_UPSERT_CHUNK_SIZE]
+        ]
+        result = (
+            supabase.table("activity_embedding")
+            .upsert(chunk, on_conflict="user_id,event_id")
+            .execute()
+        )
+        if len(result.data or []) != len(chunk):
+            raise Exception(
+                f"Failed to save embeddings for events {[row['event_id'] for row in chunk]}"
+            )
+    for user_id in {row["user_id"] for row in rows}:
+        user_embedding_cache.invalidate(user_id)
+
+
+def _save_embedding_metadata(supabase, user_id, event, metadata):
+    """Record new fingerprints for an event whose embedding is still valid"""
+    supabase.table("activity_embedding").update({"metadata": metadata}).eq(
+        "event_id", event["id"]
+    ).eq("user_id", user_id).execute()
+
+
+def _embed_question_text(text):
+    """Embedding of the raw question text, used to find similarly worded questions"""
+    embeddings, _ = _generate_embeddings([text])
+    return embeddings[0]
+
+
+def _question_embedding(supabase, question):
+    """Return (paragraph, embedding) for a question_list row
+
+    The paragraph is cached in question_explanation and the vector in
+    question_embedding; both are regenerated only when the question text
+    no longer matches question_hash.
+    """
+    question_hash = _fingerprint(question["question"])
+    if (
+        question.get("question_hash") == question_hash
+        and question.get("question_explanation")
+        and question.get("question_embedding")
+    ):
+        return question["question_explanation"], parse_vector(
+            question["question_embedding"]
+        )
+
+    # Another applicant may already have analyzed the same question text
+    cached = question_cache.get_cached(question["question"], "paragraph", "embedding")
+    if cached is not None:
+        paragraph, embedding = cached["paragraph"], cached["embedding"]
+    else:
+        paragraph = _convert_to_paragraph(
+            prompt_path="./ai/prompts/question-paragraph.txt",
+            data=question["question"],
+        )
+        if not paragraph:
+            raise Exception("Question paragraph conversion failed")
+        embeddings, _ = _generate_embeddings([paragraph])
+        embedding = embeddings[0]
+        question_cache.store(
+            question["question"], paragraph=paragraph, embedding=embedding
+        )
+
+    supabase.table("question_list").update(
+        {
+            "question_explanation": paragraph,
+            "question_embedding": embedding,
+            "question_hash": question_hash,
+        }
+    ).eq("id", question["id"]).execute()
+    return paragraph, embedding
+
+
+def _embed_events(supabase, user_id, event_ids, on_progress=None):
+    """Run paragraph conversion -> embedding -> save for the given events
+
+    The paragraph LLM only runs for events whose input fingerprint changed,
+    and the embedding call only for paragraphs whose fingerprint changed.
+    `on_progress(event_id, error=None)` is called once each event is up to
+    date or has failed.
+    """
+    activities = _fetch_embedding_sources(supabase, user_id)
+
+    # Keep only the events whose LLM input actually changed
+    pending_ids = set(event_ids)
+    pending = []
+    for activity in activities:
+        for event in activity.get("event", []):
+            if event["id"] not in pending_ids:
+                continue
+            current = _current_embedding(event)
+            metadata = (current or {}).get("metadata") or {}
+            input_hash = _input_hash(activity, event)
+            if current is not None and metadata.get("input_hash") == input_hash:
+                if on_progress:
+                    on_progress(event["id"])
+                continue
+            pending.append((activity, event, current, metadata, input_hash))
+
+    # Convert every activity+event pair to a paragraph first (concurrently)
+    # so the embeddings can be requested in as few batches as possible
+    paragraphs = llm_executor.map(
+        lambda item: _convert_to_paragraph(
+            prompt_path="./ai/prompts/activity-paragraph.txt",
+            data=_convert_to_json(item[0], item[1]),
+        ),
+        pending,
+        model="gpt-4.1-mini",
+    )
+
+    to_embed = []
+    for (activity, event, current, metadata, input_hash), paragraph in zip(
+        pending, paragraphs
+    ):
+        if not paragraph:
+            # Leave the event stale so the next run retries it
+            if on_progress:
+                on_progress(event["id"], error="Paragraph conversion failed")
+            continue
+        new_metadata = {
+            "input_hash": input_hash,
+            "paragraph_hash": _fingerprint(paragraph),
+        }
+        if (
+            current is not None
+            and metadata.get("paragraph_hash") == new_metadata["paragraph_hash"]
+        ):
+            # Same paragraph as before, so the stored vector is still right
+            _save_embedding_metadata(supabase, user_id, event, new_metadata)
+            if on_progress:
+                on_progress(event["id"])
+            continue
+        to_embed.append((event, current, new_metadata, paragraph))
+
+    embeddings, batch_count = _generate_embeddings(
+        [paragraph for _, _, _, paragraph in to_embed]
+    )
+
+    _save_embeddings(
+        supabase,
+        [
+            {
+                "user_id": user_id,
+                "event_id": event["id"],
+                "metadata": metadata,
+                "embedding": embedding,
+            }
+            for (event, _, metadata, _), embedding in zip(to_embed, embeddings)
+        ],
+    )
+    if on_progress:
+        for event, _, _, _ in to_embed:
+            on_progress(event["id"])
+
+    return {
+        "count": len(to_embed),
+        "paragraphs": len(pending),
+        "batches": batch_count,
+    }
+
+
 class GenerateEmbeddingsView(APIView):
-    """Generate embeddings for user's activity+event chunks"""
+    """Queue embedding generation for user's activity+event chunks"""
 
     @swagger_auto_schema(
         operation_summary="Generate Activity Embeddings",
-        operation_description="Generate embeddings for all user activities and events",
-        responses={200: "Embeddings generated successfully", 400: "Bad Request"},
+        operation_description="Queue embedding generation for all stale user activities and events. "
+        "The work is done by `manage.py embedding_worker`; poll the returned job for progress.",
+        responses={
+            202: "Embedding job queued",
+            200: "No new embeddings to generate",
+            400: "Bad Request",
+        },
         tags=["AI Embeddings"],
     )
     def post(self, request):
@@ -85,160 +385,51 @@ class GenerateEmbeddingsView(APIView):
             supabase = get_supabase_client(request)
             user_id = get_user_id_from_token(request)
 
-            # Get all activities with their events
-            activities_result = (
-                supabase.table("activity")
-                .select(
-                    "id, activity_name, category, position, description, start_date, end_date, "
-                    "event!activity_id(id, event_name, situation, task, action, result, contribution, start_date, end_date)"
-                )
-                .eq("user_id", user_id)
-                .execute()
-            )
-
-            if not activities_result.data:
-                return Response(
-                    {"message": "No activities found for user"},
-                    status=status.HTTP_404_NOT_FOUND,
-                )
-
             # Compute event ids that need embedding
             need_embedding_ids = _check_embedding_status(supabase, user_id)
+            event_ids = need_embedding_ids["insert"] + need_embedding_ids["update"]
 
-            # ids that needs insert
-            need_insert_ids = need_embedding_ids["insert"]
-            # ids that needs update
-            need_update_ids = need_embedding_ids["update"]
-
-            if not need_insert_ids and not need_update_ids:
+            if not event_ids:
                 return Response(
                     {"message": "No new embeddings to generate"},
                     status=status.HTTP_200_OK,
                 )
 
-            # Remove already embedded events from activities
-            activities_result.data = [
-                activity
-                for activity in activities_result.data
-                if any(
-                    event["id"] in need_insert_ids + need_update_ids
-                    for event in activity.get("event", [])
-                )
-            ]
-            print(activities_result.data)
-            generated_count = 0
-
-            # Process each activity
-            for activity in activities_result.data:
-                events = activity.get("event", [])
-
-                # Create embedding for each activity+event pair
-                for event in events:
-                    json_data = self._convert_to_json(activity, event)
-                    paragraph = _convert_to_paragraph(
-                        prompt_path="./ai/prompts/activity-paragraph.txt",
-                        data=json_data,
-                    )
-                    print(json_data)
-                    print(paragraph)
-                    embedding = self._generate_embedding(paragraph)
-                    self._save_embedding(
-                        supabase, user_id, event, embedding, cmd="insert"
-                    )
-                    generated_count += 1
+            job = enqueue_embedding_job(user_id, event_ids)
 
             return Response(
                 {
-                    "message": f"Successfully generated {generated_count} embeddings",
-                    "count": generated_count,
+                    "message": f"Queued {len(event_ids)} embeddings",
+                    "job_id": job.id,
+                    "count": len(event_ids),
                 },
-                status=status.HTTP_200_OK,
+                status=status.HTTP_202_ACCEPTED,
             )
 
         except Exception as e:
             return Response(
-                {"error": "Failed to generate embeddings", "detail": str(e)},
+                {"error": "Failed to queue embeddings", "detail": str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
-    def _convert_to_json(self, activity, event=None):
-        """Convert activity and event data to structured JSON format"""
-        # Build activity JSON structure
-        activity_json = {
-            "favorite": activity.get("favorite", False),
-            "activity_name": activity.get("activity_name", ""),
-            "category": activity.get("category", ""),
-            "position": activity.get("position", ""),
-            "file_list": activity.get("file_list", []),
-            "start_date": activity.get("start_date", ""),
-            "end_date": activity.get("end_date", ""),
-            "description": activity.get("description", ""),
-            "keywords": activity.get("keywords", []),
-            "events": [],
-        }
 
-        # If event is provided, add it to events array
-        if event:
-            event_json = {
-                "event_name": event.get("event_name", ""),
-                "start_date": event.get("start_date", ""),
-                "end_date": event.get("end_date", ""),
-                "result": event.get("result", ""),
-                "situation": event.get("situation", ""),
-                "task": event.get("task", ""),
-                "action": event.get("action", ""),
-                "contribution": event.get("contribution", ""),
-            }
-            activity_json["events"].append(event_json)
-        else:
-            # If processing activity without specific event, get all events for this activity
-            events = activity.get("event", [])
-            for evt in events:
-                event_json = {
-                    "event_name": evt.get("event_name", ""),
-                    "start_date": evt.get("start_date", ""),
-                    "end_date": evt.get("end_date", ""),
-                    "result": evt.get("result", ""),
-                    "situation": evt.get("situation", ""),
-                    "task": evt.get("task", ""),
-                    "action": evt.get("action", ""),
-                    "contribution": evt.get("contribution", ""),
-                }
-                activity_json["events"].append(event_json)
-        return json.dumps(activity_json, ensure_ascii=False, indent=2)
-
-    def _generate_embedding(self, text):
-        """Generate embedding using OpenAI API"""
-        response = client.embeddings.create(model="text-embedding-3-small", input=text)
-
-        return response.data[0].embedding
-
-    def _save_embedding(self, supabase, user_id, event, embedding, cmd="insert"):
-        """Save embedding to database"""
-        embedding_data = {
-            "user_id": user_id,
-            "event_id": event["id"] if event else None,
-            "metadata": {},
-            "embedding": embedding,
-        }
-        if cmd == "update":
-            # Update existing embedding
-            embedding_data["updated_at"] = event["updated_at"]
-            result = (
-                supabase.table("activity_embedding")
-                .update(embedding_data)
-                .eq("event_id", event["id"])
-                .eq("user_id", user_id)
-                .execute()
-            )
-        else:
-            # Save to activity_embedding table
-            result = (
-                supabase.table("activity_embedding").insert(embedding_data).execute()
-            )
+class EmbeddingJobStatusView(APIView):
+    """Report progress of a queued embedding job"""
 
-        if not result.data:
-            raise Exception(f"Failed to save embedding for event {event['id']}")
+    @swagger_auto_schema(
+        operation_summary="Embedding Job Status",
+        operation_description="Get the status of an embedding job and of each event in it",
+        responses={200: "Job status", 404: "Job not found"},
+        tags=["AI Embeddings"],
+    )
+    def get(self, request, job_id):
+        user_id = get_user_id_from_token(request)
+        job = EmbeddingJob.objects.filter(id=job_id, user_id=user_id).first()
+        if job is None:
+            return Response(
+                {"error": "Embedding job not found"}, status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(job_progress(job), status=status.HTTP_200_OK)
 
 
 class AnalyzeQuestionView(APIView):
@@ -273,40 +464,25 @@ class AnalyzeQuestionView(APIView):
             # Get question from application table
             question = (
                 supabase.table("question_list")
-                .select("application!inner(user_id), question")
+                .select(QUESTION_EMBEDDING_FIELDS)
                 .eq("application.user_id", user_id)
                 .eq("id", request.data.get("question_id"))
                 .execute()
             )
             print(question.data)
 
-            question_paragraph = _convert_to_paragraph(
-                prompt_path="./ai/prompts/question-paragraph.txt",
-                data=question.data[0]["question"],
+            # Reuses the stored paragraph/embedding unless the question changed
+            question_paragraph, query_embedding = _question_embedding(
+                supabase, question.data[0]
             )
             print(question_paragraph)
-            embedding_response = client.embeddings.create(
-                input=question_paragraph,
-                model="text-embedding-3-small",
-            )
-            # save emebedding to question_list table question_explanation
-            question_list = (
-                supabase.table("question_list")
-                .update({"question_explanation": question_paragraph})
-                .eq("id", request.data.get("question_id"))
-                .execute()
+            matches = match_user_events(
+                supabase,
+                user_id,
+                query_embedding,
+                match_threshold=0.3,  # Minimum similarity score
+                match_count=3,  # Maximum results to return
             )
-            query_embedding = embedding_response.data[0].embedding
-            response = supabase.rpc(
-                "match_documents",
-                {
-                    "query_embedding": query_embedding,  # 1536-dimensional vector
-                    "match_threshold": 0.3,  # Minimum similarity score
-                    "match_count": 3,  # Maximum results to return
-                },
-            ).execute()
-            print(response)
-            print(response.data)
             return Response(
                 {
                     "message": "Question analyzed successfully",
@@ -364,43 +540,112 @@ class ChatMessageView(APIView):
 #for applications 2-1 
 
 
+def _add_usage(usage, response):
+    usage["calls"] = usage.get("calls", 0) + 1
+    if response.usage is not None:
+        usage["input_tokens"] = usage.get("input_tokens", 0) + response.usage.input_tokens
+        usage["output_tokens"] = (
+            usage.get("output_tokens", 0) + response.usage.output_tokens
+        )
+
+
+def _generate_guideline(prompt_path, prompt_data, mode=None, usage=None):
+    """Generate {question_id, content} for a guideline prompt
+
+    "chain" expands the prompt with gpt-4.1-mini and sends the result to
+    gpt-4o-mini, parsing its text as JSON when it can. "structured" sends the
+    prompt as instructions in a single gpt-4o-mini call constrained to
+    GUIDELINE_SCHEMA. Returns (data, parsed) where parsed is False when the
+    output was not valid JSON and the raw text was used as the content.
+    """
+    mode = mode or settings.GUIDELINE_GENERATION_MODE
+    question_id = prompt_data["question_id"]
+    if mode == "structured":
+        with open(prompt_path, "r", encoding="utf-8") as file:
+            prompt = file.read().strip()
+        resp = client.responses.create(
+            model="gpt-4o-mini",
+            temperature=0.4,
+            max_output_tokens=512,
+            instructions=prompt,
+            input=json.dumps(prompt_data, ensure_ascii=False),
+            text={"format": GUIDELINE_SCHEMA},
+        )
+    else:
+        guideline_prompt = _convert_to_paragraph(
+            prompt_path=prompt_path,
+            data=json.dumps(prompt_data, ensure_ascii=False),
+            usage=usage,
+        )
+        resp = client.responses.create(
+            model="gpt-4o-mini",
+
+            temperature=0.4,
+            max_output_tokens=512,
+            input=[{"role": "user", "content": guideline_prompt}], 
+        )
+    if usage is not None:
+        _add_usage(usage, resp)
+    return _parse_guideline(
+        getattr(resp, "output_text", None), question_id, strict=mode == "structured"
+    )
+
+
+def _parse_guideline(output_text, question_id, strict=False):
+    """(data, parsed) for a guideline reply
+
+    With `strict` (structured mode) the reply must match GUIDELINE_SCHEMA, so
+    text that doesn't parse is a truncated fragment, not a guideline: the
+    content is left empty so it is neither shown nor cached.
+    """
+    if output_text is None:
+        return {"question_id": question_id, "content": ""}, False
+    try:
+        return json.loads(output_text), True
+    except json.JSONDecodeError:
+        if strict:
+            return {"question_id": question_id, "content": ""}, False
+        # JSON이 아니면 fallback
+        return {"question_id": question_id, "content": output_text.strip()}, False
+
+
 def generate_question_guideline( question,question_id: int) -> dict:
     """
     지원서 문항 가이드라인 생성
     요청(JSON):     GET /ai/application/<question_id>/guideline/?question=문항내용
     응답(JSON): { "question_id": number, "content": string }
-    - 프롬프트는 `_convert_to_paragraph(prompt_path, data=...)` 한 번으로 구성
-    - 모델 응답은 Strict JSON 스키마로 강제
+    - GUIDELINE_GENERATION_MODE=chain: `_convert_to_paragraph`로 프롬프트 구성 후 생성
+    - GUIDELINE_GENERATION_MODE=structured: Strict JSON 스키마로 한 번에 생성
     """
     if not question:
         return JsonResponse({"error": "question query param is required"}, status=400)
 
-    guideline_prompt = _convert_to_paragraph(
-        prompt_path="./ai/prompts/application-question-guideline.txt",
-        data=json.dumps({"question_id": question_id, "question": question.strip()}, ensure_ascii=False),
+    # The guideline only depends on the question text, so it is shared across
+    # users and reused for closely worded questions
+    cached, cache_status, question_embedding = question_cache.find_guideline(
+        question, "guideline", _embed_question_text
     )
-    try:
-        resp = client.responses.create(
-            model="gpt-4o-mini",
+    if cached is not None:
+        return JsonResponse(
+            {"question_id": question_id, "content": cached, "cache": cache_status},
+            status=200,
+        )
 
-            temperature=0.4,
-            max_output_tokens=512,
-            input=[{"role": "user", "content": guideline_prompt}], 
-        )    
-        output_text = getattr(resp, "output_text", None)
-        print("resp:", resp)
-        try:
-            data = json.loads(output_text)
-        except json.JSONDecodeError:
-            # JSON이 아니면 fallback
-            data = {
-                "question_id": question_id,
-                "content": output_text.strip()
-            }
+    try:
+        data, _ = _generate_guideline(
+            prompt_path="./ai/prompts/application-question-guideline.txt",
+            prompt_data={"question_id": question_id, "question": question.strip()},
+        )
+        content = (data.get("content") or "").strip()
+        if content:
+            question_cache.store(
+                question, guideline=content, question_embedding=question_embedding
+            )
         return JsonResponse(
             {
                 "question_id": int(data.get("question_id", question_id)),
-                "content": (data.get("content") or "").strip(),
+                "content": content,
+                "cache": cache_status,
             },
             status=200,
         )
@@ -410,6 +655,36 @@ def generate_question_guideline( question,question_id: int) -> dict:
             {"error": "AI generation failed", "detail": str(e)},
             status=502,
         )
+def _merge_recommendations(top, events_map, activity_map, llm_output):
+    """Combine matched events, their details and the LLM comments"""
+    if isinstance(llm_output, str):
+        try:
+            llm_output = json.loads(llm_output)
+        except json.JSONDecodeError:
+            llm_output = {}   # JSON 파싱 실패 시 안전한 기본값
+    elif not isinstance(llm_output, dict):
+        llm_output = {}
+    print("🔍 [DEBUG] llm_prompt:",  llm_output)
+
+    suggested_events = []
+    for ev, com in zip(top, llm_output.get("suggested_events", [])):
+        detail = events_map.get(ev["event_id"], {})
+        activity_name = activity_map.get(detail.get("activity_id"), "")
+        suggested_events.append({
+            "activity_name": activity_name,
+            "event_id": ev["event_id"],
+            "event_name": detail.get("event_name", ""),
+            "situation": detail.get("situation", ""),
+            "task": detail.get("task", ""),
+            "action": detail.get("action", ""),
+            "result": detail.get("result", ""),
+            "contribution": detail.get("contribution", ""),
+            "similarity": ev.get("similarity", 0.0),
+            "comment": com.get("comment", "추천된 이벤트입니다."),
+        })
+    return suggested_events
+
+
 #for 2-2 . get: 문항별 AI 추천 활동 5개
 class RecommendEventsView(APIView):
     """문항 임베딩 기반 활동/이벤트 추천"""
@@ -429,7 +704,7 @@ class RecommendEventsView(APIView):
             # 질문 가져오기
             question = (
                 supabase.table("question_list")
-                .select("application!inner(user_id), question")
+                .select(QUESTION_EMBEDDING_FIELDS)
                 .eq("application.user_id", user_id)
                 .eq("id", question_id) 
                 .execute()
@@ -442,30 +717,20 @@ class RecommendEventsView(APIView):
 
             question_text = question.data[0]["question"]
             print("🔍 [DEBUG] question_text:", question_text)
-            # 질문 임베딩
-            question_paragraph = _convert_to_paragraph(
-                prompt_path="./ai/prompts/question-paragraph.txt",
-                data=question_text,
+            # 질문 임베딩 (저장된 값이 있으면 재사용)
+            question_paragraph, query_embedding = _question_embedding(
+                supabase, question.data[0]
             )
             print("🔍 [DEBUG] question_paragraph:", question_paragraph)
-            embedding_response = client.embeddings.create(
-                input=question_paragraph,
-                model="text-embedding-3-small",
-            )
-            query_embedding = embedding_response.data[0].embedding
             print("🔍 [DEBUG] embedding length:", len(query_embedding))
             # 추천
-            response = supabase.rpc(
-                "match_documents",
-                {
-                    "query_embedding": query_embedding,
-                    "match_threshold": 0.0,
-                    "match_count": 2,
-                },
-            ).execute()
-            print("🔍 [DEBUG] supabase.rpc response:", response)
-            print("🔍 [DEBUG] supabase.rpc data:", getattr(response, "data", None))
-            candidate_events = response.data or []
+            candidate_events = match_user_events(
+                supabase,
+                user_id,
+                query_embedding,
+                match_threshold=0.0,
+                match_count=2,
+            )
             if not candidate_events:
                 return Response({"error": "No matching events"}, status=404)
 
@@ -498,33 +763,10 @@ class RecommendEventsView(APIView):
             )
             print("🔍 [DEBUG] llm_prompt:",  type(llm_prompt))
 
-            if isinstance(llm_prompt, str):
-                try:
-                    llm_prompt = json.loads(llm_prompt)
-                except json.JSONDecodeError:
-                    llm_prompt = {}   # JSON 파싱 실패 시 안전한 기본값
-            elif not isinstance(llm_prompt, dict):
-                llm_prompt = {}
-            print("🔍 [DEBUG] llm_prompt:",  type(llm_prompt))
-            print("🔍 [DEBUG] llm_prompt:",  llm_prompt)
-
             # 5. 최종 결과 합치기
-            suggested_events = []
-            for ev, com in zip(top5, llm_prompt.get("suggested_events", [])):
-                detail = events_map.get(ev["event_id"], {})
-                activity_name = activity_map.get(detail.get("activity_id"), "")
-                suggested_events.append({
-                    "activity_name": activity_name,
-                    "event_id": ev["event_id"],
-                    "event_name": detail.get("event_name", ""),
-                    "situation": detail.get("situation", ""),
-                    "task": detail.get("task", ""),
-                    "action": detail.get("action", ""),
-                    "result": detail.get("result", ""),
-                    "contribution": detail.get("contribution", ""),
-                    "similarity": ev.get("similarity", 0.0),
-                    "comment": com.get("comment", "추천된 이벤트입니다."),
-                })
+            suggested_events = _merge_recommendations(
+                top5, events_map, activity_map, llm_prompt
+            )
 
             result = {
                 "suggested_events": suggested_events,
@@ -548,24 +790,72 @@ def generate_editor_guideline( question,question_id: int,event_id: int = None) -
     if not question:
         return JsonResponse({"error": "question query param is required"}, status=400)
 
+    event_data = _suggested_events(question_id)
+
+    # Without suggested events the guideline only depends on the question text
+    cacheable = not event_data
+    cache_status, question_embedding = question_cache.MISS, None
+    if cacheable:
+        cached, cache_status, question_embedding = question_cache.find_guideline(
+            question, "editor_guideline", _embed_question_text
+        )
+        if cached is not None:
+            return JsonResponse(
+                {"question_id": question_id, "content": cached, "cache": cache_status},
+                status=200,
+            )
+
+    prompt_data = {
+        "question_id": question_id,
+        "question": question.strip(),
+    }
+    if event_data:
+        prompt_data["events"] = event_data
+
     try:
-        from .models import EventSuggestion
+        data, _ = _generate_guideline(
+            prompt_path="./ai/prompts/application-editor-guideline.txt",
+            prompt_data=prompt_data,
+        )
+        content = (data.get("content") or "").strip()
+        if content and cacheable:
+            question_cache.store(
+                question,
+                editor_guideline=content,
+                question_embedding=question_embedding,
+            )
+        return JsonResponse(
+            {
+                "question_id": int(data.get("question_id", question_id)),
+                "content": content,
+                "cache": cache_status,
+            },
+            status=200,
+        )
+
+    except Exception as e:
+        return JsonResponse(
+            {"error": "AI generation failed", "detail": str(e)},
+            status=502,
+        )
 
+def _suggested_events(question_id):
+    """Events saved as suggestions for the question, or None if there are none"""
+    event_data = None
+    try:
         suggestions = (
             EventSuggestion.objects
             .filter(question_id=question_id)
             .select_related("event")
         )
-        if not suggestions.exists():
-            event_data = None
-        else:
+        if suggestions.exists():
             event_data = []
             for suggestion in suggestions:
                 ev = suggestion.event
                 if ev:
                     event_data.append({
                         "id": ev.id,
-                        "name": ev.name,
+                        "name": ev.event_name,
                         "situation": ev.situation,
                         "task": ev.task,
                         "action": ev.action,
@@ -575,49 +865,164 @@ def generate_editor_guideline( question,question_id: int,event_id: int = None) -
 
     except Exception as e:
         print("Event fetch error:", e)
-            
-    prompt_data = {
-        "question_id": question_id,
-        "question": question.strip(),
-    }
-    if event_data:
-        prompt_data["events"] = event_data
+    return event_data
+
+
+class _ContentStreamDecoder:
+    """Incrementally decode the "content" string out of streamed JSON output"""
+
+    _START = re.compile(r'"content"\s*:\s*"')
+
+    def __init__(self):
+        self.raw = ""
+        self.pos = None  # index of the next undecoded content character
+        self.done = False
+
+    def feed(self, delta):
+        self.raw += delta
+        if self.pos is None:
+            match = self._START.search(self.raw)
+            if not match:
+                return ""
+            self.pos = match.end()
+        decoded = []
+        while not self.done and self.pos < len(self.raw):
+            char = self.raw[self.pos]
+            if char == '"':
+                self.done = True
+            elif char == "\\":
+                end = self._escape_end(self.pos)
+                if end is None:
+                    break
+                decoded.append(json.loads(f'"{self.raw[self.pos:end]}"'))
+                self.pos = end
+                continue
+            else:
+                decoded.append(char)
+            self.pos += 1
+        return "".join(decoded)
+
+    def _escape_end(self, pos):
+        """End index of the escape at pos, or None until it has fully arrived"""
+        if self.raw[pos + 1 : pos + 2] != "u":
+            end = pos + 2
+        else:
+            code = self.raw[pos + 2 : pos + 6]
+            if len(code) < 4:
+                return None
+            # A high surrogate only decodes together with its low half
+            end = pos + 12 if 0xD800 <= int(code, 16) <= 0xDBFF else pos + 6
+        return end if end <= len(self.raw) else None
+
+
+def _stream_guideline(question, question_id, prompt_path, cache_field, event_data=None):
+    """Yield a guideline as Server-Sent Events
+
+    Emits `delta` events with content text as it is generated and one final
+    `done` event shaped like QuestionGuideSerializer (plus `cache`). Streaming
+    always uses the single structured call, whose JSON "content" string is
+    decoded on the fly; the finished text is written to the question cache.
+    A response that doesn't complete ends with an `error` event instead.
+    """
+    # Flush headers right away; cache lookups may need an embedding call
+    yield ": stream open\n\n"
+    if not question:
+        yield sse_event("error", {"error": "question is required"})
+        return
 
-    guideline_prompt = _convert_to_paragraph(
-        prompt_path="./ai/prompts/application-editor-guideline.txt",
-        data=json.dumps(prompt_data, ensure_ascii=False),
-    )
+    cacheable = not event_data
+    cache_status, question_embedding = question_cache.MISS, None
     try:
-        resp = client.responses.create(
-            model="gpt-4o-mini",
+        if cacheable:
+            cached, cache_status, question_embedding = question_cache.find_guideline(
+                question, cache_field, _embed_question_text
+            )
+            if cached is not None:
+                yield sse_event("delta", {"content": cached})
+                yield sse_event(
+                    "done",
+                    {"question_id": question_id, "content": cached, "cache": cache_status},
+                )
+                return
 
+        prompt_data = {"question_id": question_id, "question": question.strip()}
+        if event_data:
+            prompt_data["events"] = event_data
+        with open(prompt_path, "r", encoding="utf-8") as file:
+            prompt = file.read().strip()
+        stream = client.responses.create(
+            model="gpt-4o-mini",
             temperature=0.4,
             max_output_tokens=512,
-            input=[{"role": "user", "content": guideline_prompt}], 
-        )    
-        output_text = getattr(resp, "output_text", None)
-        print("resp:", resp)
-        try:
-            data = json.loads(output_text)
-        except json.JSONDecodeError:
-            # JSON이 아니면 fallback
-            data = {
-                "question_id": question_id,
-                "content": output_text.strip()
-            }
-        return JsonResponse(
-            {
-                "question_id": int(data.get("question_id", question_id)),
-                "content": (data.get("content") or "").strip(),
-            },
-            status=200,
+            instructions=prompt,
+            input=json.dumps(prompt_data, ensure_ascii=False),
+            text={"format": GUIDELINE_SCHEMA},
+            stream=True,
         )
+    except Exception as e:
+        yield sse_event("error", {"error": "AI generation failed", "detail": str(e)})
+        return
 
+    decoder = _ContentStreamDecoder()
+    parts = []
+    completed = False
+    try:
+        for event in stream:
+            if event.type == "response.output_text.delta":
+                text = decoder.feed(event.delta)
+                if text:
+                    parts.append(text)
+                    yield sse_event("delta", {"content": text})
+            elif event.type == "response.completed":
+                completed = True
+            elif event.type in ("response.failed", "response.incomplete", "error"):
+                yield sse_event("error", {"error": "AI generation failed"})
+                return
     except Exception as e:
-        return JsonResponse(
-            {"error": "AI generation failed", "detail": str(e)},
-            status=502,
+        yield sse_event("error", {"error": "AI generation failed", "detail": str(e)})
+        return
+    finally:
+        # Also runs on GeneratorExit when the client disconnects
+        stream.close()
+
+    if not (completed and decoder.done):
+        # Cut off (e.g. at max_output_tokens) or the stream ended early: the
+        # text is incomplete, so it is neither cached nor reported as done
+        yield sse_event(
+            "error", {"error": "AI generation failed", "detail": "Incomplete response"}
+        )
+        return
+
+    content = "".join(parts).strip()
+    if content and cacheable:
+        question_cache.store(
+            question, **{cache_field: content, "question_embedding": question_embedding}
         )
+    yield sse_event(
+        "done", {"question_id": question_id, "content": content, "cache": cache_status}
+    )
+
+
+def stream_question_guideline(question, question_id: int):
+    """SSE variant of generate_question_guideline"""
+    return _stream_guideline(
+        question,
+        question_id,
+        prompt_path="./ai/prompts/application-question-guideline.txt",
+        cache_field="guideline",
+    )
+
+
+def stream_editor_guideline(question, question_id: int):
+    """SSE variant of generate_editor_guideline"""
+    return _stream_guideline(
+        question,
+        question_id,
+        prompt_path="./ai/prompts/application-editor-guideline.txt",
+        cache_field="editor_guideline",
+        event_data=_suggested_events(question_id),
+    )
+
 
 ###############################################################
 class EventSuggestionView(APIView):
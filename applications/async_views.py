@@ -0,0 +1,89 @@
+"""Async versions of the question guideline/recommend endpoints (see ai/async_views.py)"""
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+
+from ai.async_views import aguideline, arecommend_events
+from utils.permissions import supabase_authenticated
+from utils.supabase_utils import get_async_supabase_client, get_user_id_from_token
+from .models import QuestionList
+from .serializers import EventRecommendSerializer, QuestionGuideSerializer
+
+
+async def _get_question(question_id):
+    try:
+        return await QuestionList.objects.aget(id=question_id)
+    except QuestionList.DoesNotExist:
+        return None
+
+
+async def _guideline_response(question_id, prompt_path, cache_field, with_events=False):
+    question = await _get_question(question_id)
+    if question is None:
+        return JsonResponse({"detail": "No QuestionList matches the given query."}, status=404)
+    try:
+        ai_data = await aguideline(
+            question.question, question.id, prompt_path, cache_field, with_events
+        )
+    except Exception as e:
+        return JsonResponse({"error": "AI generation failed", "detail": str(e)}, status=502)
+    serializer = QuestionGuideSerializer(data=ai_data)
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=400)
+    return JsonResponse(serializer.validated_data, status=200)
+
+
+#2-1. get: 문항별 활동 가이드라인 (async)
+@require_GET
+@supabase_authenticated
+async def question_guideline(request, question_id: int):
+    return await _guideline_response(
+        question_id, "./ai/prompts/application-question-guideline.txt", "guideline"
+    )
+
+
+#3-1. get: 문항별 작성 가이드라인 (async)
+@require_GET
+@supabase_authenticated
+async def question_editor_guideline(request, question_id: int):
+    return await _guideline_response(
+        question_id,
+        "./ai/prompts/application-editor-guideline.txt",
+        "editor_guideline",
+        with_events=True,
+    )
+
+
+#2-2. get: 문항별 AI 추천 활동 (async)
+@require_GET
+@supabase_authenticated
+async def question_event_recommend(request, question_id: int):
+    question = await _get_question(question_id)
+    if question is None:
+        return JsonResponse({"detail": "No QuestionList matches the given query."}, status=404)
+    try:
+        supabase = await get_async_supabase_client(request)
+        user_id = get_user_id_from_token(request)
+        suggested_events, error = await arecommend_events(supabase, user_id, question.id)
+        if error is not None:
+            return JsonResponse({"error": "AI 응답 오류"}, status=502)
+    except Exception as e:
+        return JsonResponse({"error": "AI 응답 오류", "detail": str(e)}, status=502)
+
+    serializer = EventRecommendSerializer(
+        data={
+            "question_id": question.id,
+            "eventlist": [
+                {
+                    "id": e["event_id"],
+                    "title": e["event_name"],
+                    "activity": e["activity_name"],
+                    "comment": e["comment"],
+                    "is_recommended": (e.get("similarity", 0) >= 0.35),
+                }
+                for e in suggested_events[:5]
+            ],
+        }
+    )
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=400)
+    return JsonResponse(serializer.data, status=200)
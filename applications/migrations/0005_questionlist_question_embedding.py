@@ -0,0 +1,24 @@
+# Generated by Django 5.2.4 on 2026-10-18 18:51
+
+import pgvector.django.vector
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0004_alter_questionlist_question_explanation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='questionlist',
+            name='question_embedding',
+            field=pgvector.django.vector.VectorField(blank=True, dimensions=1536, null=True),
+        ),
+        migrations.AddField(
+            model_name='questionlist',
+            name='question_hash',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+    ]
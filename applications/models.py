@@ -1,4 +1,5 @@
 from django.db import models
+from pgvector.django import VectorField
 from users.models import Profile
 from activities.models import Activity
 
@@ -22,6 +23,9 @@ class QuestionList(models.Model):
     question = models.TextField()
     max_length = models.IntegerField()
     question_explanation = models.TextField(null=True, blank=True)
+    # question_explanation + its embedding are valid while this matches the question text
+    question_hash = models.CharField(max_length=64, null=True, blank=True)
+    question_embedding = VectorField(dimensions=1536, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -56,6 +56,9 @@ class EventSerializer(serializers.Serializer):
 class QuestionGuideSerializer(serializers.Serializer):
     question_id = serializers.IntegerField(help_text="문항 번호(FK)")
     content = serializers.CharField(help_text="문항별 작성 가이드라인 (AI 생성)")
+    cache = serializers.CharField(
+        required=False, help_text="가이드라인 캐시 결과 (exact, semantic, miss)"
+    )
 
 class EventRecommendSerializer(serializers.Serializer):
     question_id = serializers.IntegerField(help_text="문항 번호(FK)")
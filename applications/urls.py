@@ -1,5 +1,6 @@
 from django.urls import path
 from . import views
+from . import async_views
 from .views import (
     ApplicationCreateView,
     ApplicationListView,
@@ -8,6 +9,8 @@ from .views import (
     QuestionGuidelineView,
     QuestionEventRecommendView,
     QuestionEditorGuidelineView,
+    QuestionGuidelineStreamView,
+    QuestionEditorGuidelineStreamView,
 )
 
 urlpatterns = [
@@ -18,7 +21,13 @@ urlpatterns = [
     path("<int:application_id>/delete/", ApplicationDeleteView.as_view(), name="application-delete"), #DELETE: 지원서 삭제
     #2.문항별 AI 가이드라인 & 추천 활동
     path("questions/<int:question_id>/guideline/", QuestionGuidelineView.as_view(), name="question-guideline"),
+    path("questions/<int:question_id>/guideline/stream/", QuestionGuidelineStreamView.as_view(), name="question-guideline-stream"),  # GET: SSE
     path("questions/<int:question_id>/recommend/", QuestionEventRecommendView.as_view(), name="question-event-recommend"), 
     # 3.Editor - 문항별 작성 가이드라인
     path("questions/<int:question_id>/editor-guideline/", QuestionEditorGuidelineView.as_view(), name="question-editor-guideline"),
+    path("questions/<int:question_id>/editor-guideline/stream/", QuestionEditorGuidelineStreamView.as_view(), name="question-editor-guideline-stream"),  # GET: SSE
+    # 4. Async (ASGI) 버전 - 응답 형식은 위 엔드포인트와 동일
+    path("async/questions/<int:question_id>/guideline/", async_views.question_guideline, name="question-guideline-async"),
+    path("async/questions/<int:question_id>/recommend/", async_views.question_event_recommend, name="question-event-recommend-async"),
+    path("async/questions/<int:question_id>/editor-guideline/", async_views.question_editor_guideline, name="question-editor-guideline-async"),
 ]
@@ -15,7 +15,10 @@ import requests
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from utils.supabase_utils import get_supabase_client, get_user_id_from_token
-from ai.views import generate_question_guideline,generate_editor_guideline
+from utils.sse import EventStreamRenderer, event_stream_response
+from utils.conditional import collection_validators, not_modified_response, with_validators
+from rest_framework.renderers import JSONRenderer
+from ai.views import generate_question_guideline,generate_editor_guideline,stream_question_guideline,stream_editor_guideline
 
 import json
 from django.http import JsonResponse
@@ -61,7 +64,7 @@ class ApplicationListView(APIView):
   @swagger_auto_schema(
       operation_summary="지원서 목록 조회",
       operation_description="로그인한 사용자의 모든 지원서를 조회합니다.(최신순말고 마감순으로 하면 좋을듯)",
-      responses={200: openapi.Response(description="지원서 목록", schema=ApplicationListSerializer(many=True))},
+      responses={200: openapi.Response(description="지원서 목록", schema=ApplicationListSerializer(many=True)), 304: "Not Modified (If-None-Match)"},
   )
   def get(self, request):
     #for supabase jwt
@@ -69,27 +72,38 @@ class ApplicationListView(APIView):
     user_id = get_user_id_from_token(request)
     profile = get_object_or_404(Profile, user_id=user_id)
 
+    etag, last_modified = collection_validators(request, user_id, "applications")
+    not_modified = not_modified_response(request, etag, last_modified)
+    if not_modified is not None:
+      return not_modified
+
     applications = Application.objects.filter(user=profile) #.order_by("-created_at")
     serializer = ApplicationListSerializer(applications, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    return with_validators(Response(serializer.data, status=status.HTTP_200_OK), etag, last_modified)
 
 #1-3. get : 특정 지원서 detail 내용 조회
 class ApplicationDetailView(APIView):
     @swagger_auto_schema(
         operation_summary="지원서 상세 조회",
         operation_description="특정 지원서의 모든 문항과 작성 내용을 조회합니다.",
-        responses={200: ApplicationDetailQuestionSerializer(many=True)},
+        responses={200: ApplicationDetailQuestionSerializer(many=True), 304: "Not Modified (If-None-Match)", 404: "Application not found"},
     )
     def get(self, request, application_id):
       #for supabase jwt
       supabase = get_supabase_client(request)
       user_id = get_user_id_from_token(request)
-      profile = get_object_or_404(Profile, user_id=user_id)
 
-      app = get_object_or_404(Application, id=application_id, user=profile)
+      # 404 before any 304: never revalidate another user's or a missing application
+      app = get_object_or_404(Application, id=application_id, user__user_id=user_id)
+
+      etag, last_modified = collection_validators(request, user_id, "applications")
+      not_modified = not_modified_response(request, etag, last_modified)
+      if not_modified is not None:
+        return not_modified
+
       questions = QuestionList.objects.filter(application=app).order_by("id")
       serializer = ApplicationDetailQuestionSerializer(questions, many=True)
-      return Response(serializer.data, status=status.HTTP_200_OK)
+      return with_validators(Response(serializer.data, status=status.HTTP_200_OK), etag, last_modified)
 
 #1-4. delete: 지원서 삭제
 class ApplicationDeleteView(APIView):
@@ -268,3 +282,33 @@ class QuestionEditorGuidelineView(APIView):
             return Response(serializer.validated_data, status=200)
         except requests.exceptions.RequestException as e:
             return Response({"error": f"AI 서버 요청 실패: {str(e)}"}, status=status.HTTP_502_BAD_GATEWAY)
+
+
+#2-1, 3-1. 가이드라인 스트리밍 (SSE)
+class QuestionGuidelineStreamView(APIView):
+    renderer_classes = [JSONRenderer, EventStreamRenderer]
+
+    @swagger_auto_schema(
+        operation_summary="문항별 활동 가이드라인 (스트리밍)",
+        operation_description="가이드라인을 생성되는 대로 Server-Sent Events로 전송합니다. "
+                              "`delta` 이벤트로 본문 조각을, 마지막 `done` 이벤트로 "
+                              "QuestionGuideSerializer 형태의 전체 결과를 보냅니다.",
+        responses={200: "text/event-stream"},
+    )
+    def get(self, request, question_id:int):
+        question = get_object_or_404(QuestionList, id=question_id)
+        return event_stream_response(stream_question_guideline(question.question, question.id))
+
+
+class QuestionEditorGuidelineStreamView(APIView):
+    renderer_classes = [JSONRenderer, EventStreamRenderer]
+
+    @swagger_auto_schema(
+        operation_summary="문항별 작성 가이드라인 (스트리밍)",
+        operation_description="작성 가이드라인을 Server-Sent Events로 전송합니다. "
+                              "이벤트 형식은 가이드라인 스트리밍과 같습니다.",
+        responses={200: "text/event-stream"},
+    )
+    def get(self, request, question_id:int):
+        question = get_object_or_404(QuestionList, id=question_id)
+        return event_stream_response(stream_editor_guideline(question.question, question.id))
@@ -0,0 +1,151 @@
+"""Async version of ChatMessageView.post, for serving under ASGI (drafted/asgi.py)"""
+import json
+import os
+
+import environ
+from django.conf import settings
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from openai import AsyncOpenAI
+
+from utils.permissions import supabase_authenticated
+from utils.supabase_utils import (
+    get_async_supabase_client,
+    get_supabase_client,
+    get_user_id_from_token,
+)
+from . import context as chat_context
+from .views import (
+    AI_RESPONSE_FALLBACK,
+    SESSION_SELECT,
+    _format_chat_messages,
+    _unsaved_message,
+    client,
+)
+
+environ.Env.read_env(env_file=os.path.join(settings.BASE_DIR, ".env"))
+env = environ.Env()
+aclient = AsyncOpenAI(api_key=env("OPENAI_KEY"))
+
+
+async def _commit_turn(supabase, session_id, messages):
+    """Async chat.views._commit_turn"""
+    result = await supabase.rpc(
+        "commit_chat_turn",
+        {
+            "p_session_id": session_id,
+            "p_messages": [
+                {"role": role, "content": content} for role, content in messages
+            ],
+        },
+    ).execute()
+    if len(result.data or []) != len(messages):
+        raise Exception("Failed to save message")
+    return result.data
+
+
+async def _agenerate_ai_response(
+    supabase,
+    sync_supabase,
+    session_id,
+    user_message,
+    question_id,
+    personal_statement="",
+    session=None,
+):
+    """Async _generate_ai_response; user_message as in _build_chat_messages
+
+    `sync_supabase` is handed to the background summary update, which runs
+    on a thread rather than this event loop.
+    """
+    try:
+        turn = await chat_context.aload_turn_context(
+            supabase, session_id, question_id, session
+        )
+        messages, dropped = _format_chat_messages(
+            turn, user_message, personal_statement
+        )
+        chat_context.schedule_summary(
+            sync_supabase, client, session_id, turn, dropped
+        )
+        response = await aclient.chat.completions.create(
+            model=chat_context.CHAT_MODEL,
+            messages=messages,
+            max_tokens=1000,
+            temperature=0.7,
+        )
+        return response.choices[0].message.content
+
+    except Exception as e:
+        print(f"Error generating AI response: {e}")
+        return AI_RESPONSE_FALLBACK
+
+
+@csrf_exempt
+@require_POST
+@supabase_authenticated
+async def chat_message(request, session_id):
+    """Send message, get AI response"""
+    try:
+        supabase = await get_async_supabase_client(request)
+        user_id = get_user_id_from_token(request)
+
+        data = json.loads(request.body or b"{}")
+        message_content = data.get("message")
+        if not message_content:
+            return JsonResponse({"error": "Message content is required"}, status=400)
+
+        personal_statement = data.get("personal_statement", "")
+
+        # Verify session belongs to user and get question_id
+        session_result = (
+            await supabase.table("chat_session")
+            .select(SESSION_SELECT)
+            .eq("id", session_id)
+            .eq("user_id", user_id)
+            .execute()
+        )
+
+        if not session_result.data:
+            return JsonResponse({"error": "Chat session not found"}, status=404)
+
+        question_id = session_result.data[0].get("question_id")
+
+        ai_response_content = await _agenerate_ai_response(
+            supabase,
+            get_supabase_client(request),
+            session_id,
+            _unsaved_message(message_content),
+            question_id,
+            personal_statement,
+            session_result.data[0],
+        )
+
+        # Save both messages and bump the session together
+        user_message, ai_message = await _commit_turn(
+            supabase,
+            session_id,
+            [("user", message_content), ("assistant", ai_response_content)],
+        )
+
+        return JsonResponse(
+            {
+                "user_message": {
+                    "id": user_message["id"],
+                    "content": user_message["content"],
+                    "created_at": user_message["created_at"],
+                },
+                "ai_response": {
+                    "id": ai_message["id"],
+                    "content": ai_message["content"],
+                    "created_at": ai_message["created_at"],
+                },
+            },
+            status=200,
+        )
+
+    except Exception as e:
+        return JsonResponse(
+            {"error": "Failed to send message", "detail": str(e)}, status=500
+        )
@@ -0,0 +1,346 @@
+"""Token-budgeted chat context with a rolling summary of older turns
+
+The completion input for a turn is the system prompt, the session's summary
+(if any), as many of the newest messages as fit CHAT_CONTEXT_TOKEN_BUDGET,
+and the new user message. Messages that no longer fit are folded into
+chat_session.summary in the background, so input stays bounded however long
+the session gets. The rows a turn needs are loaded concurrently by
+load_turn_context / aload_turn_context.
+"""
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import tiktoken
+from django.conf import settings
+
+from utils import metrics
+
+CHAT_MODEL = "gpt-4-turbo-preview"
+SUMMARY_MODEL = "gpt-4o-mini"
+SUMMARY_PROMPT_PATH = "./ai/prompts/chat-summary.txt"
+# Fixed per-message cost of the chat format (role and separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Runs a turn's context queries side by side (see load_turn_context)
+_load_executor = ThreadPoolExecutor(
+    max_workers=settings.CHAT_CONTEXT_LOAD_WORKERS, thread_name_prefix="chat-context"
+)
+_summary_executor = ThreadPoolExecutor(
+    max_workers=settings.CHAT_SUMMARY_WORKERS, thread_name_prefix="chat-summary"
+)
+_summarizing = set()  # session ids with a summary update in flight
+_lock = threading.Lock()
+_counters = {
+    "turns": 0,
+    "input_tokens": 0,
+    "max_input_tokens": 0,
+    "history_messages": 0,
+    "truncated_turns": 0,
+    "summaries_written": 0,
+    "summary_failures": 0,
+}
+_load_ms = {}  # step -> [total ms, loads]
+
+
+@functools.lru_cache(maxsize=None)
+def _encoding():
+    return tiktoken.encoding_for_model(CHAT_MODEL)
+
+
+def count_tokens(text):
+    return len(_encoding().encode(text or ""))
+
+
+def message_tokens(message):
+    return count_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+
+def history_query(supabase, session_id):
+    """Newest messages first; the budget decides how many are actually sent"""
+    return (
+        supabase.table("chat_message")
+        .select("id, role, content")
+        .eq("session_id", session_id)
+        .order("id", desc=True)
+        .limit(settings.CHAT_HISTORY_FETCH_LIMIT)
+    )
+
+
+def summary_query(supabase, session_id):
+    return (
+        supabase.table("chat_session")
+        .select("summary, summary_message_id")
+        .eq("id", session_id)
+    )
+
+
+@dataclass
+class ChatTurnContext:
+    """Everything a chat turn needs from the database"""
+
+    history: list  # newest first
+    question: list
+    suggestions: list | None  # None if the lookup failed
+    session: dict  # summary, summary_message_id
+    timings: dict = field(default_factory=dict)  # step -> ms
+
+
+def turn_queries(supabase, session_id, question_id, session=None):
+    """Unexecuted queries for a turn, by step name
+
+    The builders work with both the sync and async clients. The session
+    summary is skipped when the caller already loaded the session row.
+    """
+    queries = {
+        "history": history_query(supabase, session_id),
+        "question": (
+            supabase.table("question_list")
+            .select("id, question")
+            .eq("id", question_id)
+        ),
+        "suggestions": (
+            supabase.table("event_suggestion")
+            .select(
+                "id, activity, created_at, event(id, event_name, contribution, situation, task, action, result)"
+            )
+            .eq("question_id", question_id)
+            .limit(5)
+        ),
+    }
+    if session is None:
+        queries["session"] = summary_query(supabase, session_id)
+    return queries
+
+
+def load_turn_context(supabase, session_id, question_id, session=None):
+    """Run the turn's queries concurrently; one round-trip of latency, not four"""
+    queries = turn_queries(supabase, session_id, question_id, session)
+    futures = {
+        step: _load_executor.submit(_timed, query.execute)
+        for step, query in queries.items()
+    }
+    results = {}
+    timings = {}
+    for step, future in futures.items():
+        results[step], timings[step] = _result(step, future.result())
+    return _turn_context(results, session, timings)
+
+
+async def aload_turn_context(supabase, session_id, question_id, session=None):
+    """load_turn_context for the async client"""
+    queries = turn_queries(supabase, session_id, question_id, session)
+    outcomes = await asyncio.gather(
+        *(_atimed(query.execute) for query in queries.values())
+    )
+    results = {}
+    timings = {}
+    for step, outcome in zip(queries, outcomes):
+        results[step], timings[step] = _result(step, outcome)
+    return _turn_context(results, session, timings)
+
+
+def _timed(execute):
+    start = time.perf_counter()
+    try:
+        return execute().data, None, (time.perf_counter() - start) * 1000
+    except Exception as e:
+        return None, e, (time.perf_counter() - start) * 1000
+
+
+async def _atimed(execute):
+    start = time.perf_counter()
+    try:
+        return (await execute()).data, None, (time.perf_counter() - start) * 1000
+    except Exception as e:
+        return None, e, (time.perf_counter() - start) * 1000
+
+
+def _result(step, outcome):
+    data, error, elapsed = outcome
+    if error is not None:
+        if step != "suggestions":
+            raise error
+        # Handle the case where there might be no event suggestions
+        print(f"Error fetching event suggestions: {error}")
+    return data, elapsed
+
+
+def _turn_context(results, session, timings):
+    if session is None:
+        session = (results["session"] or [{}])[0]
+    _record_load(timings)
+    return ChatTurnContext(
+        history=results["history"] or [],
+        question=results["question"] or [],
+        suggestions=results["suggestions"],
+        session=session,
+        timings=timings,
+    )
+
+
+def fit_messages(system_messages, history, user_message, budget=None):
+    """Fill the token budget from the newest history message backwards
+
+    `history` is newest first and must not contain `user_message`. Returns
+    the completion messages and the history rows that did not fit (newest
+    first).
+    """
+    budget = settings.CHAT_CONTEXT_TOKEN_BUDGET if budget is None else budget
+    new_message = {"role": "user", "content": user_message}
+    used = sum(message_tokens(msg) for msg in system_messages)
+    used += message_tokens(new_message)
+
+    kept = []
+    for index, msg in enumerate(history):
+        cost = message_tokens(msg)
+        if used + cost > budget:
+            dropped = history[index:]
+            break
+        used += cost
+        kept.append({"role": msg["role"], "content": msg["content"]})
+    else:
+        dropped = []
+
+    _record_turn(used, len(kept), bool(dropped))
+    # Add conversation history (reverse to get chronological order)
+    return [*system_messages, *reversed(kept), new_message], dropped
+
+
+def summary_message(summary):
+    return {
+        "role": "system",
+        "content": f"--- 이전 대화 요약 ---\n{summary}",
+    }
+
+
+def schedule_summary(supabase, client, session_id, turn, dropped):
+    """Fold messages that fell out of the budget into the session summary
+
+    That includes messages older than the fetched history window: when the
+    window is full and the summary stops short of it, everything below the
+    window is summarized too, even if the whole window fit the budget.
+    Runs on a small background pool; at most one update per session is in
+    flight in this process, and the conditional update in _update_summary
+    keeps two processes from overwriting each other. Each update covers at
+    most CHAT_SUMMARY_BATCH_SIZE messages; later turns pick up the rest.
+    """
+    session = turn.session
+    summarized_through = session.get("summary_message_id") or 0
+    through_id = max(msg["id"] for msg in dropped) if dropped else 0
+    if len(turn.history) >= settings.CHAT_HISTORY_FETCH_LIMIT:
+        # history is newest first, so its last row is the oldest fetched
+        through_id = max(through_id, turn.history[-1]["id"] - 1)
+    if through_id <= summarized_through:
+        return
+    with _lock:
+        if session_id in _summarizing:
+            return
+        _summarizing.add(session_id)
+    _summary_executor.submit(
+        _update_summary, supabase, client, session_id, session, through_id
+    )
+
+
+def _update_summary(supabase, client, session_id, session, through_id):
+    try:
+        previous_id = session.get("summary_message_id")
+        messages = (
+            supabase.table("chat_message")
+            .select("id, role, content")
+            .eq("session_id", session_id)
+            .gt("id", previous_id or 0)
+            .lte("id", through_id)
+            .order("id")
+            .limit(settings.CHAT_SUMMARY_BATCH_SIZE)
+            .execute()
+            .data
+        )
+        if not messages:
+            return
+
+        with open(SUMMARY_PROMPT_PATH, "r", encoding="utf-8") as file:
+            prompt = file.read().strip()
+        transcript = "\n".join(f"{msg['role']}: {msg['content']}" for msg in messages)
+        response = client.chat.completions.create(
+            model=SUMMARY_MODEL,
+            messages=[
+                {"role": "system", "content": prompt},
+                {
+                    "role": "user",
+                    "content": f"[기존 요약]\n{session.get('summary') or '(없음)'}\n\n[새 대화]\n{transcript}",
+                },
+            ],
+            max_tokens=settings.CHAT_SUMMARY_MAX_TOKENS,
+            temperature=0.3,
+        )
+
+        query = supabase.table("chat_session").update(
+            {
+                "summary": response.choices[0].message.content,
+                "summary_message_id": messages[-1]["id"],
+            }
+        )
+        query = query.eq("id", session_id)
+        # Only if nobody else advanced the summary meanwhile
+        if previous_id is None:
+            query = query.is_("summary_message_id", "null")
+        else:
+            query = query.eq("summary_message_id", previous_id)
+        query.execute()
+        _count("summaries_written")
+
+    except Exception as e:
+        print(f"Error updating chat summary: {e}")
+        _count("summary_failures")
+    finally:
+        with _lock:
+            _summarizing.discard(session_id)
+
+
+def _record_turn(input_tokens, history_messages, truncated):
+    with _lock:
+        _counters["turns"] += 1
+        _counters["input_tokens"] += input_tokens
+        _counters["max_input_tokens"] = max(_counters["max_input_tokens"], input_tokens)
+        _counters["history_messages"] += history_messages
+        _counters["truncated_turns"] += truncated
+
+
+def _record_load(timings):
+    with _lock:
+        for step, elapsed in timings.items():
+            total = _load_ms.setdefault(step, [0.0, 0])
+            total[0] += elapsed
+            total[1] += 1
+
+
+def _count(name):
+    with _lock:
+        _counters[name] += 1
+
+
+def stats():
+    with _lock:
+        counters = dict(_counters)
+        in_flight = len(_summarizing)
+        load_ms = {step: total / loads for step, (total, loads) in _load_ms.items()}
+    turns = counters["turns"]
+    budget = settings.CHAT_CONTEXT_TOKEN_BUDGET
+    return {
+        **counters,
+        "budget": budget,
+        "avg_input_tokens": counters["input_tokens"] / turns if turns else 0.0,
+        "avg_budget_used": (
+            counters["input_tokens"] / (turns * budget) if turns else 0.0
+        ),
+        "avg_history_messages": counters["history_messages"] / turns if turns else 0.0,
+        "summaries_in_flight": in_flight,
+        "avg_load_ms": load_ms,
+    }
+
+
+metrics.register("chat_context", stats)
@@ -0,0 +1,98 @@
+import asyncio
+import statistics
+import time
+
+import httpx
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Hold N chat requests in flight against one or more deployments and report "
+        "completions, latency and peak concurrency, e.g. "
+        "--target wsgi=http://127.0.0.1:8000/chat/sessions/1/messages/ "
+        "--target asgi=http://127.0.0.1:8001/chat/async/sessions/1/messages/ "
+        "(each request is a real chat turn and calls OpenAI)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--target",
+            action="append",
+            required=True,
+            help="name=url of a chat messages endpoint; repeat to compare deployments",
+        )
+        parser.add_argument("--token", required=True, help="Supabase access token")
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            nargs="+",
+            default=[1, 8, 32, 64],
+            help="Concurrent clients per run",
+        )
+        parser.add_argument(
+            "--duration", type=float, default=30.0, help="Seconds per run"
+        )
+        parser.add_argument(
+            "--timeout", type=float, default=60.0, help="Per-request timeout in seconds"
+        )
+        parser.add_argument("--message", default="이 문항에서 어떤 경험을 쓰면 좋을까요?")
+
+    def handle(self, *args, **options):
+        targets = []
+        for target in options["target"]:
+            name, sep, url = target.partition("=")
+            if not sep:
+                raise CommandError(f"--target must be name=url, got {target!r}")
+            targets.append((name, url))
+
+        self.stdout.write(
+            f"{'target':>8} {'clients':>7} {'done':>6} {'errors':>6} {'peak':>5} "
+            f"{'p50':>7} {'p95':>7} {'req/s':>6}"
+        )
+        for name, url in targets:
+            for concurrency in options["concurrency"]:
+                stats = asyncio.run(self._run(url, concurrency, options))
+                latencies = stats["latencies"]
+                p50 = statistics.median(latencies) if latencies else 0.0
+                p95 = (
+                    statistics.quantiles(latencies, n=20)[-1]
+                    if len(latencies) >= 2
+                    else p50
+                )
+                self.stdout.write(
+                    f"{name:>8} {concurrency:>7} {len(latencies):>6} "
+                    f"{stats['errors']:>6} {stats['peak']:>5} {p50:>6.2f}s "
+                    f"{p95:>6.2f}s {len(latencies) / options['duration']:>6.2f}"
+                )
+
+    async def _run(self, url, concurrency, options):
+        stats = {"latencies": [], "errors": 0, "in_flight": 0, "peak": 0}
+        deadline = time.monotonic() + options["duration"]
+        headers = {"Authorization": f"Bearer {options['token']}"}
+        limits = httpx.Limits(max_connections=concurrency)
+
+        async with httpx.AsyncClient(
+            headers=headers, timeout=options["timeout"], limits=limits
+        ) as client:
+
+            async def worker():
+                while time.monotonic() < deadline:
+                    stats["in_flight"] += 1
+                    stats["peak"] = max(stats["peak"], stats["in_flight"])
+                    start = time.perf_counter()
+                    try:
+                        response = await client.post(
+                            url, json={"message": options["message"]}
+                        )
+                        if response.status_code == 200:
+                            stats["latencies"].append(time.perf_counter() - start)
+                        else:
+                            stats["errors"] += 1
+                    except httpx.HTTPError:
+                        stats["errors"] += 1
+                    finally:
+                        stats["in_flight"] -= 1
+
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return stats
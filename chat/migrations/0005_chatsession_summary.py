@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-18 19:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0004_chatsession_application_chatsession_question'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatsession',
+            name='summary',
+            field=models.TextField(blank=True, db_default=''),
+        ),
+        migrations.AddField(
+            model_name='chatsession',
+            name='summary_message_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.4 on 2026-10-18 19:06
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0005_chatsession_summary'),
+    ]
+
+    operations = [
+        # Saves a chat turn (its messages, in order) and bumps the session's
+        # updated_at in one transaction and one round-trip. SECURITY INVOKER,
+        # so RLS still decides whose session can be written; a session the
+        # caller can't see raises instead of leaving orphan messages.
+        migrations.RunSQL(
+            sql="""
+                CREATE OR REPLACE FUNCTION commit_chat_turn(
+                    p_session_id bigint,
+                    p_messages jsonb
+                )
+                RETURNS SETOF chat_message
+                LANGUAGE plpgsql
+                SECURITY INVOKER
+                AS $$
+                BEGIN
+                    UPDATE chat_session SET updated_at = now()
+                    WHERE id = p_session_id;
+                    IF NOT FOUND THEN
+                        RAISE EXCEPTION 'Chat session % not found', p_session_id
+                            USING ERRCODE = 'P0002';
+                    END IF;
+
+                    -- now() is fixed for the transaction; offset each message
+                    -- so created_at keeps the turn's order
+                    RETURN QUERY
+                    WITH inserted AS (
+                        INSERT INTO chat_message (session_id, role, content, created_at)
+                        SELECT p_session_id,
+                               m.message->>'role',
+                               m.message->>'content',
+                               now() + (m.position - 1) * interval '1 microsecond'
+                        FROM jsonb_array_elements(p_messages)
+                             WITH ORDINALITY AS m(message, position)
+                        ORDER BY m.position
+                        RETURNING *
+                    )
+                    SELECT * FROM inserted ORDER BY id;
+                END;
+                $$;
+            """,
+            reverse_sql="""
+                DROP FUNCTION IF EXISTS commit_chat_turn(bigint, jsonb);
+            """,
+        ),
+    ]
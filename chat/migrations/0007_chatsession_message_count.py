@@ -0,0 +1,104 @@
+# Generated by Django 5.2.4 on 2026-10-18 19:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0005_questionlist_question_embedding'),
+        ('chat', '0006_commit_chat_turn'),
+        ('users', '0005_alter_profile_user_id_delete_supabaseuser'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatsession',
+            name='last_message_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='chatsession',
+            name='message_count',
+            field=models.IntegerField(db_default=0),
+        ),
+        migrations.AddIndex(
+            model_name='chatsession',
+            index=models.Index(fields=['user', '-updated_at', '-id'], name='chat_session_user_updated_idx'),
+        ),
+        # Statement-level triggers keep message_count / last_message_at in
+        # step with chat_message (one UPDATE per session touched, so a
+        # commit_chat_turn insert of two messages costs one update), then
+        # backfill existing sessions.
+        migrations.RunSQL(
+            sql="""
+                CREATE OR REPLACE FUNCTION chat_message_count_insert()
+                RETURNS trigger
+                LANGUAGE plpgsql
+                AS $$
+                BEGIN
+                    UPDATE chat_session s
+                    SET message_count = s.message_count + n.added,
+                        last_message_at = GREATEST(s.last_message_at, n.latest)
+                    FROM (
+                        SELECT session_id, count(*) AS added, max(created_at) AS latest
+                        FROM new_rows
+                        GROUP BY session_id
+                    ) n
+                    WHERE s.id = n.session_id;
+                    RETURN NULL;
+                END;
+                $$;
+
+                CREATE OR REPLACE FUNCTION chat_message_count_delete()
+                RETURNS trigger
+                LANGUAGE plpgsql
+                AS $$
+                BEGIN
+                    UPDATE chat_session s
+                    SET message_count = GREATEST(s.message_count - o.removed, 0),
+                        last_message_at = (
+                            SELECT max(m.created_at)
+                            FROM chat_message m
+                            WHERE m.session_id = s.id
+                        )
+                    FROM (
+                        SELECT session_id, count(*) AS removed
+                        FROM old_rows
+                        GROUP BY session_id
+                    ) o
+                    WHERE s.id = o.session_id;
+                    RETURN NULL;
+                END;
+                $$;
+
+                CREATE TRIGGER chat_message_count_insert
+                AFTER INSERT ON chat_message
+                REFERENCING NEW TABLE AS new_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION chat_message_count_insert();
+
+                CREATE TRIGGER chat_message_count_delete
+                AFTER DELETE ON chat_message
+                REFERENCING OLD TABLE AS old_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION chat_message_count_delete();
+
+                UPDATE chat_session s
+                SET message_count = m.message_count,
+                    last_message_at = m.last_message_at
+                FROM (
+                    SELECT session_id,
+                           count(*) AS message_count,
+                           max(created_at) AS last_message_at
+                    FROM chat_message
+                    GROUP BY session_id
+                ) m
+                WHERE s.id = m.session_id;
+            """,
+            reverse_sql="""
+                DROP TRIGGER IF EXISTS chat_message_count_insert ON chat_message;
+                DROP TRIGGER IF EXISTS chat_message_count_delete ON chat_message;
+                DROP FUNCTION IF EXISTS chat_message_count_insert();
+                DROP FUNCTION IF EXISTS chat_message_count_delete();
+            """,
+        ),
+    ]
@@ -12,11 +12,24 @@ class ChatSession(models.Model):
         QuestionList, on_delete=models.CASCADE, null=True, blank=True
     )
     title = models.TextField()
+    # Rolling summary of the messages up to summary_message_id (see chat/context.py)
+    summary = models.TextField(blank=True, db_default="")
+    summary_message_id = models.BigIntegerField(null=True, blank=True)
+    # Kept current by the chat_message triggers (chat migration 0007)
+    message_count = models.IntegerField(db_default=0)
+    last_message_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = "chat_session"
+        indexes = [
+            # Keyset pagination of a user's sessions (ChatSessionView.get)
+            models.Index(
+                fields=["user", "-updated_at", "-id"],
+                name="chat_session_user_updated_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Chat Session: {self.title} (User: {self.user_id})"
@@ -1,3 +1,138 @@
-from django.test import TestCase
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.db.models import NOT_PROVIDED
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APIRequestFactory
+
+from .models import ChatSession
+from .views import ChatSessionView
+
+
+class _Query:
+    """Records PostgREST builder calls; execute() counts one round-trip"""
+
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.filters = []
+        self.limit_value = None
+        self.payload = None
+
+    def select(self, *args, **kwargs):
+        return self
+
+    def eq(self, *args):
+        return self
+
+    def order(self, *args, **kwargs):
+        return self
+
+    def insert(self, payload):
+        self.payload = payload
+        return self
+
+    def or_(self, filters):
+        self.filters.append(filters)
+        return self
+
+    def limit(self, value):
+        self.limit_value = value
+        return self
+
+    def execute(self):
+        self.client.queries.append(self)
+        if self.payload is not None:
+            return SimpleNamespace(data=[{"id": 1, **self.payload}], count=None)
+        rows = self.client.rows[: self.limit_value]
+        return SimpleNamespace(data=rows, count=None)
+
+
+class _Supabase:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    def table(self, name):
+        return _Query(self, name)
+
+
+def _sessions(count):
+    return [
+        {
+            "id": count - i,
+            "title": f"Chat Session {count - i}",
+            "created_at": "2025-01-01T00:00:00+00:00",
+            "updated_at": f"2025-01-01T00:{(count - i) % 60:02d}:00+00:00",
+            "message_count": 2,
+            "last_message_at": "2025-01-01T00:00:00+00:00",
+        }
+        for i in range(count)
+    ]
+
+
+@override_settings(CHAT_SESSIONS_PAGE_SIZE=50, CHAT_SESSIONS_MAX_PAGE_SIZE=100)
+class ChatSessionListQueryCountTests(SimpleTestCase):
+    def _get(self, supabase, params=None):
+        request = APIRequestFactory().get(
+            "/chat/sessions/", params or {}, HTTP_AUTHORIZATION="Bearer token"
+        )
+        with mock.patch(
+            "chat.views.get_supabase_client", return_value=supabase
+        ), mock.patch("chat.views.get_user_id_from_token", return_value="user"):
+            return ChatSessionView.as_view()(request)
+
+    def test_query_count_does_not_grow_with_sessions(self):
+        for count in (1, 3, 80):
+            supabase = _Supabase(_sessions(count))
+            response = self._get(supabase)
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(supabase.queries), 1)
+            self.assertEqual(len(response.data["sessions"]), min(count, 50))
+
+    def test_next_cursor_continues_after_last_row(self):
+        supabase = _Supabase(_sessions(5))
+        response = self._get(supabase, {"limit": 2})
+        self.assertEqual([s["id"] for s in response.data["sessions"]], [5, 4])
+        self.assertIsNotNone(response.data["next_cursor"])
+
+        supabase = _Supabase(_sessions(5))
+        self._get(supabase, {"limit": 2, "cursor": response.data["next_cursor"]})
+        (filters,) = supabase.queries[0].filters
+        self.assertEqual(
+            filters,
+            'updated_at.lt."2025-01-01T00:04:00+00:00",'
+            'and(updated_at.eq."2025-01-01T00:04:00+00:00",id.lt.4)',
+        )
+
+    def test_invalid_cursor(self):
+        response = self._get(_Supabase([]), {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 400)
+
+
+class ChatSessionCreateTests(SimpleTestCase):
+    def test_insert_relies_on_database_defaults(self):
+        supabase = _Supabase([])
+        request = APIRequestFactory().post(
+            "/chat/sessions/",
+            {"application_id": 1, "question_id": 2, "title": "Draft"},
+            format="json",
+            HTTP_AUTHORIZATION="Bearer token",
+        )
+        with mock.patch(
+            "chat.views.get_supabase_client", return_value=supabase
+        ), mock.patch("chat.views.get_user_id_from_token", return_value="user"):
+            response = ChatSessionView.as_view()(request)
+
+        self.assertEqual(response.status_code, 201)
+        (insert,) = supabase.queries
+        self.assertEqual(
+            set(insert.payload), {"user_id", "application_id", "question_id", "title"}
+        )
+        # The PostgREST insert leaves these to the column defaults / NULL
+        for name in ("summary", "message_count"):
+            field = ChatSession._meta.get_field(name)
+            self.assertIsNot(field.db_default, NOT_PROVIDED, name)
+        for name in ("summary_message_id", "last_message_at"):
+            self.assertTrue(ChatSession._meta.get_field(name).null, name)
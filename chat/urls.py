@@ -1,5 +1,6 @@
 from django.urls import path
 from . import views
+from . import async_views
 
 urlpatterns = [
     # Chat URLs
@@ -14,4 +15,15 @@ urlpatterns = [
         views.ChatMessageView.as_view(),
         name="chat_messages",
     ),
+    path(
+        "sessions/<int:session_id>/messages/stream/",
+        views.ChatMessageStreamView.as_view(),
+        name="chat_messages_stream",
+    ),
+    # Async (ASGI) variant of POST sessions/<id>/messages/
+    path(
+        "async/sessions/<int:session_id>/messages/",
+        async_views.chat_message,
+        name="chat_messages_async",
+    ),
 ]
@@ -5,79 +5,76 @@ from rest_framework import status
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from utils.supabase_utils import get_supabase_client, get_user_id_from_token
+from utils.sse import EventStreamRenderer, event_stream_response, sse_event
+from utils.pagination import InvalidPage, keyset_after, page_limit, paginate
+from rest_framework.renderers import JSONRenderer
 from openai import OpenAI
+import functools
 import os
 import environ
 from django.conf import settings
 
+from . import context as chat_context
+
 
 environ.Env.read_env(env_file=os.path.join(settings.BASE_DIR, ".env"))
 env = environ.Env()
 client = OpenAI(api_key=env("OPENAI_KEY"))
+AI_RESPONSE_FALLBACK = "죄송합니다 현재 답변을 드리기 어려운 상황입니다. 조금 후에 다시 시도해주시기 바랍니다."
 
 
-def _generate_ai_response(
+# Sessions list sort key; also the cursor's contents
+SESSION_PAGE_ORDER = ("updated_at", "id")
+# Session columns the chat views select, so the turn doesn't refetch the summary
+SESSION_SELECT = "id, title, question_id, summary, summary_message_id"
+
+
+@functools.lru_cache(maxsize=None)
+def _chat_prompt_template(prompt_path="./ai/prompts/chat.txt"):
+    with open(prompt_path, "r", encoding="utf-8") as file:
+        return file.read().strip()
+
+
+def _build_chat_messages(
     supabase,
     session_id,
     user_message,
-    user_id,
     question_id,
     personal_statement="",
+    session=None,
 ):
-    """Generate AI response using OpenAI"""
-    prompt_path = "./ai/prompts/chat.txt"
-    try:
-        # Get conversation history (last 10 messages for context)
-        history_result = (
-            supabase.table("chat_message")
-            .select("role, content")
-            .eq("session_id", session_id)
-            .order("created_at", desc=True)
-            .limit(10)
-            .execute()
-        )
-
-        # Get the specific question data
-        question_result = (
-            supabase.table("question_list")
-            .select("id, question")
-            .eq("id", question_id)
-            .execute()
-        )
-
-        current_question = ""
-        if question_result.data:
-            question_data = question_result.data[0]
-            current_question = f"""
+    """Build the completion messages: system prompt with context, history, new message
+
+    `user_message` is the chat_message row (unsaved until the turn is
+    committed, see _commit_turn) and `session` the chat_session row if the
+    caller already has it. Older turns that don't fit the token budget are
+    queued for the session summary.
+    """
+    turn = chat_context.load_turn_context(supabase, session_id, question_id, session)
+    messages, dropped = _format_chat_messages(turn, user_message, personal_statement)
+    chat_context.schedule_summary(supabase, client, session_id, turn, dropped)
+    return messages
+
+
+def _format_chat_messages(turn, user_message, personal_statement=""):
+    """Returns the completion messages and the history rows left out of them"""
+    question = turn.question
+    suggestions = turn.suggestions
+    current_question = ""
+    if question:
+        question_data = question[0]
+        current_question = f"""
                 Current Application Question: {question_data.get('question', 'N/A')}
                 """
 
-        # Get event suggestions for this specific question
-        # Handle the case where there might be no event suggestions
-        event_suggestions_result = None
-        event_suggestions_context = ""
+    # Format event suggestions for context
+    event_suggestions_context = ""
+    if suggestions:
+        event_suggestions_context = "\n\n--- 유저의 관련 활동 및 이벤트 ---\n"
+        for suggestion in suggestions:
+            event = suggestion.get("event", {})
 
-        try:
-            event_suggestions_result = (
-                supabase.table("event_suggestion")
-                .select(
-                    "id, activity, created_at, event(id, event_name, contribution, situation, task, action, result)"
-                )
-                .eq("question_id", question_id)
-                .limit(5)
-                .execute()
-            )
-        except Exception as e:
-            print(f"Error fetching event suggestions: {e}")
-            event_suggestions_result = None
-
-        # Format event suggestions for context
-        if event_suggestions_result and event_suggestions_result.data:
-            event_suggestions_context = "\n\n--- 유저의 관련 활동 및 이벤트 ---\n"
-            for suggestion in event_suggestions_result.data:
-                event = suggestion.get("event", {})
-
-                event_suggestions_context += f"""
+            event_suggestions_context += f"""
                     Activity: {suggestion.get('activity', 'N/A')}
                     Event Name: {event.get('event_name', 'N/A')}
                     Contribution: {event.get('contribution', 'N/A')}
@@ -87,42 +84,64 @@ def _generate_ai_response(
                     Result: {event.get('result', 'N/A')}
                     ---
                     """
-        else:
-            event_suggestions_context = (
-                "\n\n--- No relevant activities found for this question yet ---\n"
-            )
-
-        with open(prompt_path, "r", encoding="utf-8") as file:
-            prompt_template = file.read().strip()
-
-        # Format the prompt with actual data
-        formatted_prompt = prompt_template.format(
-            personal_statement=personal_statement,
-            current_question=current_question,
-            relevant_activities=event_suggestions_context,
+    else:
+        event_suggestions_context = (
+            "\n\n--- No relevant activities found for this question yet ---\n"
         )
 
-        # Build system message with question and activity context
-        system_content = f"{formatted_prompt}"
+    prompt_template = _chat_prompt_template()
 
-        # Build conversation context
-        messages = [
-            {
-                "role": "system",
-                "content": system_content,
-            }
-        ]
+    # Format the prompt with actual data
+    formatted_prompt = prompt_template.format(
+        personal_statement=personal_statement,
+        current_question=current_question,
+        relevant_activities=event_suggestions_context,
+    )
 
-        # Add conversation history (reverse to get chronological order)
-        for msg in reversed(history_result.data):
-            messages.append({"role": msg["role"], "content": msg["content"]})
+    # Build system message with question and activity context
+    system_content = f"{formatted_prompt}"
+    system_messages = [
+        {
+            "role": "system",
+            "content": system_content,
+        }
+    ]
+
+    session = turn.session
+    if session.get("summary"):
+        system_messages.append(chat_context.summary_message(session["summary"]))
+
+    # Turns already folded into the summary, and the new message itself
+    # (added last by fit_messages), are left out of the history
+    summarized_through = session.get("summary_message_id") or 0
+    history = [
+        msg
+        for msg in turn.history
+        if msg["id"] > summarized_through and msg["id"] != user_message["id"]
+    ]
+    return chat_context.fit_messages(
+        system_messages, history, user_message["content"]
+    )
 
-        # Add current user message
-        messages.append({"role": "user", "content": user_message})
+
+def _generate_ai_response(
+    supabase,
+    session_id,
+    user_message,
+    user_id,
+    question_id,
+    personal_statement="",
+    session=None,
+):
+    """Generate AI response using OpenAI"""
+    try:
+        messages = _build_chat_messages(
+            supabase, session_id, user_message, question_id, personal_statement, session
+        )
 
         # Generate response using OpenAI
         response = client.chat.completions.create(
-            model="gpt-4-turbo-preview",
+            model=chat_context.CHAT_MODEL,
             messages=messages,
             max_tokens=1000,
             temperature=0.7,
@@ -132,7 +151,118 @@ def _generate_ai_response(
 
     except Exception as e:
         print(f"Error generating AI response: {e}")
-        return "죄송합니다 현재 답변을 드리기 어려운 상황입니다. 조금 후에 다시 시도해주시기 바랍니다."
+        return AI_RESPONSE_FALLBACK
+
+
+def _stream_chat_turn(
+    supabase,
+    session_id,
+    user_message,
+    question_id,
+    personal_statement="",
+    session=None,
+):
+    """Yield one chat turn as Server-Sent Events
+
+    Sends the already saved user message, then `delta` events with assistant
+    tokens, then `done` with the saved assistant message. If the client
+    disconnects the upstream completion is closed (so generation stops) and
+    whatever was generated so far is saved.
+    """
+    yield sse_event("user_message", _message_payload(user_message))
+
+    parts = []
+    stream = None
+    error = None
+    saved = False
+    try:
+        try:
+            messages = _build_chat_messages(
+                supabase, session_id, user_message, question_id, personal_statement, session
+            )
+            stream = client.chat.completions.create(
+                model=chat_context.CHAT_MODEL,
+                messages=messages,
+                max_tokens=1000,
+                temperature=0.7,
+                stream=True,
+            )
+            for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    parts.append(delta)
+                    yield sse_event("delta", {"content": delta})
+        except Exception as e:
+            print(f"Error generating AI response: {e}")
+            parts = [AI_RESPONSE_FALLBACK]
+            error = e
+        finally:
+            if stream is not None:
+                # Closing the HTTP response cancels the completion upstream
+                stream.close()
+
+        ai_message = _save_assistant_message(supabase, session_id, "".join(parts))
+        saved = True
+        if error is not None:
+            yield sse_event(
+                "error", {"error": "Failed to generate response", "detail": str(error)}
+            )
+        yield sse_event("done", {"ai_response": _message_payload(ai_message)})
+    finally:
+        if not saved and parts:
+            # Client went away before the reply was saved; keep what it was shown
+            try:
+                _save_assistant_message(supabase, session_id, "".join(parts))
+            except Exception as e:
+                print(f"Error saving partial AI response: {e}")
+
+
+def _insert_message(supabase, session_id, role, content):
+    """Add a message to the chat session"""
+    result = (
+        supabase.table("chat_message")
+        .insert({"session_id": session_id, "role": role, "content": content})
+        .execute()
+    )
+    if not result.data:
+        raise Exception("Failed to save message")
+    return result.data[0]
+
+
+def _commit_turn(supabase, session_id, messages):
+    """Save (role, content) messages and bump the session in one transaction
+
+    Returns the saved chat_message rows in order.
+    """
+    result = supabase.rpc(
+        "commit_chat_turn",
+        {
+            "p_session_id": session_id,
+            "p_messages": [
+                {"role": role, "content": content} for role, content in messages
+            ],
+        },
+    ).execute()
+    if len(result.data or []) != len(messages):
+        raise Exception("Failed to save message")
+    return result.data
+
+
+def _unsaved_message(content):
+    # Stands in for the chat_message row until the turn is committed
+    return {"id": None, "content": content}
+
+
+def _save_assistant_message(supabase, session_id, content):
+    return _commit_turn(supabase, session_id, [("assistant", content)])[0]
+
+
+def _message_payload(message):
+    return {
+        "id": message["id"],
+        "content": message["content"],
+        "created_at": message["created_at"],
+    }
 
 
 class ChatSessionView(APIView):
@@ -140,7 +270,24 @@ class ChatSessionView(APIView):
 
     @swagger_auto_schema(
         operation_summary="Get User Chat Sessions",
-        operation_description="Retrieve all chat sessions for the authenticated user",
+        operation_description=(
+            "Retrieve the authenticated user's chat sessions, most recently "
+            "updated first. Pass `next_cursor` back as `cursor` for the next page."
+        ),
+        manual_parameters=[
+            openapi.Parameter(
+                "limit",
+                openapi.IN_QUERY,
+                description="Sessions per page",
+                type=openapi.TYPE_INTEGER,
+            ),
+            openapi.Parameter(
+                "cursor",
+                openapi.IN_QUERY,
+                description="next_cursor from the previous page",
+                type=openapi.TYPE_STRING,
+            ),
+        ],
         responses={
             200: openapi.Response(
                 description="Chat sessions retrieved successfully",
@@ -163,9 +310,16 @@ class ChatSessionView(APIView):
                                     "message_count": openapi.Schema(
                                         type=openapi.TYPE_INTEGER
                                     ),
+                                    "last_message_at": openapi.Schema(
+                                        type=openapi.TYPE_STRING
+                                    ),
                                 },
                             ),
-                        )
+                        ),
+                        "next_cursor": openapi.Schema(
+                            type=openapi.TYPE_STRING,
+                            description="Cursor for the next page, null on the last page",
+                        ),
                     },
                 ),
             )
@@ -178,30 +332,40 @@ class ChatSessionView(APIView):
             supabase = get_supabase_client(request)
             user_id = get_user_id_from_token(request)
 
-            # Get chat sessions with message count
+            try:
+                limit = page_limit(
+                    request.query_params.get("limit"),
+                    settings.CHAT_SESSIONS_PAGE_SIZE,
+                    settings.CHAT_SESSIONS_MAX_PAGE_SIZE,
+                )
+                # Get chat sessions with message count (one query per page)
+                sessions_query = keyset_after(
+                    supabase.table("chat_session")
+                    .select(
+                        "id, title, created_at, updated_at, message_count, last_message_at"
+                    )
+                    .eq("user_id", user_id),
+                    request.query_params.get("cursor"),
+                    SESSION_PAGE_ORDER,
+                )
+            except InvalidPage as e:
+                return Response(
+                    {"error": "Invalid pagination parameters", "detail": str(e)},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
             sessions_result = (
-                supabase.table("chat_session")
-                .select("id, title, created_at, updated_at")
-                .eq("user_id", user_id)
-                .order("updated_at", desc=True)
+                sessions_query.order("updated_at", desc=True)
+                .order("id", desc=True)
+                .limit(limit + 1)
                 .execute()
             )
-
-            sessions = []
-            for session in sessions_result.data:
-                # Get message count for each session
-                message_count_result = (
-                    supabase.table("chat_message")
-                    .select("id", count="exact")
-                    .eq("session_id", session["id"])
-                    .execute()
-                )
-
-                session["message_count"] = message_count_result.count or 0
-                sessions.append(session)
+            sessions, next_cursor = paginate(
+                sessions_result.data, limit, SESSION_PAGE_ORDER
+            )
 
             return Response(
-                {"sessions": sessions},
+                {"sessions": sessions, "next_cursor": next_cursor},
                 status=status.HTTP_200_OK,
             )
 
@@ -266,9 +430,8 @@ class ChatSessionView(APIView):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-            title = request.data.get(
-                "title",
-                f"Chat Session {self._get_session_count(supabase, user_id) + 1}",
+            title = request.data.get("title") or (
+                f"Chat Session {self._get_session_count(supabase, user_id) + 1}"
             )
             initial_message = request.data.get("initial_message")
 
@@ -291,16 +454,20 @@ class ChatSessionView(APIView):
 
             # If initial message provided, add it and get AI response
             if initial_message:
-                self._add_message(supabase, session_id, "user", initial_message)
                 ai_response = _generate_ai_response(
                     supabase,
                     session_id,
-                    initial_message,
+                    _unsaved_message(initial_message),
                     user_id,
                     question_id,
                     personal_statement="",
+                    session=session_result.data[0],
+                )
+                _commit_turn(
+                    supabase,
+                    session_id,
+                    [("user", initial_message), ("assistant", ai_response)],
                 )
-                self._add_message(supabase, session_id, "assistant", ai_response)
 
             return Response(
                 {
@@ -327,21 +494,6 @@ class ChatSessionView(APIView):
         )
         return result.count or 0
 
-    def _add_message(self, supabase, session_id, role, content):
-        """Add a message to the chat session"""
-        message_data = {
-            "session_id": session_id,
-            "role": role,
-            "content": content,
-        }
-
-        result = supabase.table("chat_message").insert(message_data).execute()
-
-        if not result.data:
-            raise Exception("Failed to save message")
-
-        return result.data[0]
-
 
 class ChatMessageView(APIView):
     """Send messages in chat session"""
@@ -483,7 +635,7 @@ class ChatMessageView(APIView):
             # Verify session belongs to user and get question_id
             session_result = (
                 supabase.table("chat_session")
-                .select("id, title, question_id")
+                .select(SESSION_SELECT)
                 .eq("id", session_id)
                 .eq("user_id", user_id)
                 .execute()
@@ -497,31 +649,24 @@ class ChatMessageView(APIView):
 
             question_id = session_result.data[0].get("question_id")
 
-            # Save user message
-            user_message = self._add_message(
-                supabase, session_id, "user", message_content
-            )
-
             # Generate AI response
             ai_response_content = _generate_ai_response(
                 supabase,
                 session_id,
-                message_content,
+                _unsaved_message(message_content),
                 user_id,
                 question_id,
                 personal_statement,
+                session_result.data[0],
             )
 
-            # Save AI response
-            ai_message = self._add_message(
-                supabase, session_id, "assistant", ai_response_content
+            # Save both messages and update session updated_at together
+            user_message, ai_message = _commit_turn(
+                supabase,
+                session_id,
+                [("user", message_content), ("assistant", ai_response_content)],
             )
 
-            # Update session updated_at
-            supabase.table("chat_session").update({"updated_at": "now()"}).eq(
-                "id", session_id
-            ).execute()
-
             return Response(
                 {
                     "user_message": {
@@ -544,20 +689,84 @@ class ChatMessageView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
-    def _add_message(self, supabase, session_id, role, content):
-        """Add a message to the chat session"""
-        message_data = {
-            "session_id": session_id,
-            "role": role,
-            "content": content,
-        }
 
-        result = supabase.table("chat_message").insert(message_data).execute()
+class ChatMessageStreamView(APIView):
+    """Send a message and stream the AI response"""
 
-        if not result.data:
-            raise Exception("Failed to save message")
+    renderer_classes = [JSONRenderer, EventStreamRenderer]
 
-        return result.data[0]
+    @swagger_auto_schema(
+        operation_summary="Send Chat Message (streaming)",
+        operation_description=(
+            "Send a message and stream the AI response as Server-Sent Events: "
+            "`user_message` (saved user message), `delta` (assistant tokens), "
+            "`done` (saved assistant message) or `error`"
+        ),
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                "message": openapi.Schema(
+                    type=openapi.TYPE_STRING,
+                    description="User message content",
+                ),
+                "personal_statement": openapi.Schema(
+                    type=openapi.TYPE_STRING,
+                    description="User's personal statement",
+                ),
+            },
+            required=["message"],
+        ),
+        responses={200: "text/event-stream"},
+        tags=["AI Chat"],
+    )
+    def post(self, request, session_id):
+        """Save message, stream AI response"""
+        try:
+            supabase = get_supabase_client(request)
+            user_id = get_user_id_from_token(request)
+
+            message_content = request.data.get("message")
+            if not message_content:
+                return Response(
+                    {"error": "Message content is required"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            # Verify session belongs to user and get question_id
+            session_result = (
+                supabase.table("chat_session")
+                .select(SESSION_SELECT)
+                .eq("id", session_id)
+                .eq("user_id", user_id)
+                .execute()
+            )
+
+            if not session_result.data:
+                return Response(
+                    {"error": "Chat session not found"},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+
+            user_message = _insert_message(
+                supabase, session_id, "user", message_content
+            )
+
+            return event_stream_response(
+                _stream_chat_turn(
+                    supabase,
+                    session_id,
+                    user_message,
+                    session_result.data[0].get("question_id"),
+                    request.data.get("personal_statement", ""),
+                    session_result.data[0],
+                )
+            )
+
+        except Exception as e:
+            return Response(
+                {"error": "Failed to send message", "detail": str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
 
 
 class ChatSessionDetailView(APIView):
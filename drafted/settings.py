@@ -65,6 +65,7 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
+    "utils.middleware.SupabaseAuthMiddleware",
 ]
 
 ROOT_URLCONF = "drafted.urls"
@@ -113,6 +114,107 @@ DATABASES = {
 DB_PASSWORD = os.environ.get("DB_PASSWORD")
 SUPABASE_URL = os.environ.get("DB_URL")
 SUPABASE_KEY = os.environ.get("DB_KEY")
+# Service role key for background jobs with no user JWT (embedding_worker);
+# it bypasses RLS, so never send it with user requests
+SUPABASE_SERVICE_ROLE_KEY = os.environ.get("DB_SERVICE_ROLE_KEY")
+# Process-wide PostgREST connection pool (see utils/supabase_utils.py)
+SUPABASE_HTTP2 = os.environ.get("SUPABASE_HTTP2", "true").lower() == "true"
+SUPABASE_POOL_MAX_CONNECTIONS = int(
+    os.environ.get("SUPABASE_POOL_MAX_CONNECTIONS", "20")
+)
+# seconds an idle connection is kept open for reuse
+SUPABASE_POOL_KEEPALIVE_EXPIRY = float(
+    os.environ.get("SUPABASE_POOL_KEEPALIVE_EXPIRY", "60")
+)
+SUPABASE_TIMEOUT = float(os.environ.get("SUPABASE_TIMEOUT", "120"))
+# Decoded JWTs kept in memory (per process) until they expire
+AUTH_TOKEN_CACHE_ENTRIES = int(os.environ.get("AUTH_TOKEN_CACHE_ENTRIES", "10000"))
+
+# Embedding settings
+# token budget per embeddings.create call (OpenAI caps a request at 300k tokens)
+EMBEDDING_BATCH_TOKEN_BUDGET = int(
+    os.environ.get("EMBEDDING_BATCH_TOKEN_BUDGET", "100000")
+)
+# how long the batcher waits to coalesce texts from concurrent requests
+EMBEDDING_BATCH_WINDOW_MS = int(os.environ.get("EMBEDDING_BATCH_WINDOW_MS", "50"))
+
+# LLM call concurrency
+# max LLM requests in flight per process (sync and async calls share the limit)
+LLM_MAX_IN_FLIGHT = int(os.environ.get("LLM_MAX_IN_FLIGHT", "8"))
+# requests per minute per model, e.g. "gpt-4.1-mini=500,gpt-4o-mini=500"
+LLM_RATE_LIMITS = {
+    model.strip(): int(limit)
+    for model, limit in (
+        item.split("=")
+        for item in os.environ.get(
+            "LLM_RATE_LIMITS", "gpt-4.1-mini=500,gpt-4o-mini=500"
+        ).split(",")
+        if item.strip()
+    )
+}
+
+# Guideline generation
+# "chain" expands the prompt with one LLM call and generates with a second;
+# "structured" does both in a single call with a strict JSON schema
+GUIDELINE_GENERATION_MODE = os.environ.get("GUIDELINE_GENERATION_MODE", "chain")
+
+# Similarity scoring for recommendations
+# "database" scores with the match_user_documents RPC, "memory" with an
+# in-process per-user matrix cache
+EMBEDDING_SCORING = os.environ.get("EMBEDDING_SCORING", "database")
+# memory ceiling for the per-user matrix cache (1536 float32 dims ~ 6KB per event)
+EMBEDDING_CACHE_MAX_BYTES = int(
+    os.environ.get("EMBEDDING_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+)
+# seconds before a cached matrix is reloaded, bounding staleness after the
+# embedding worker (a different process) rewrites a user's rows
+EMBEDDING_CACHE_TTL = int(os.environ.get("EMBEDDING_CACHE_TTL", "300"))
+
+# Shared (cross-user) cache of question paragraphs, embeddings and guidelines
+QUESTION_CACHE_TTL = int(os.environ.get("QUESTION_CACHE_TTL", str(30 * 24 * 3600)))
+# rows kept in question_cache; the entries closest to expiry are pruned first
+QUESTION_CACHE_MAX_ROWS = int(os.environ.get("QUESTION_CACHE_MAX_ROWS", "10000"))
+# in-process LRU in front of the table
+QUESTION_CACHE_MEMORY_ENTRIES = int(
+    os.environ.get("QUESTION_CACHE_MEMORY_ENTRIES", "1000")
+)
+QUESTION_CACHE_MEMORY_TTL = int(os.environ.get("QUESTION_CACHE_MEMORY_TTL", "300"))
+# cosine similarity above which a differently worded question reuses a
+# cached guideline (see `manage.py tune_semantic_cache`); 1.01 disables it
+SEMANTIC_CACHE_THRESHOLD = float(os.environ.get("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+
+# Chat context: input tokens per turn (system prompt, summary, history and the
+# new message); turns that don't fit are folded into chat_session.summary
+CHAT_CONTEXT_TOKEN_BUDGET = int(os.environ.get("CHAT_CONTEXT_TOKEN_BUDGET", "6000"))
+# threads running a turn's history/question/suggestion/summary queries in parallel
+CHAT_CONTEXT_LOAD_WORKERS = int(os.environ.get("CHAT_CONTEXT_LOAD_WORKERS", "16"))
+# newest messages fetched per turn before trimming to the budget
+CHAT_HISTORY_FETCH_LIMIT = int(os.environ.get("CHAT_HISTORY_FETCH_LIMIT", "50"))
+# background summary updates: worker threads, messages folded per update and
+# summary length
+CHAT_SUMMARY_WORKERS = int(os.environ.get("CHAT_SUMMARY_WORKERS", "2"))
+CHAT_SUMMARY_BATCH_SIZE = int(os.environ.get("CHAT_SUMMARY_BATCH_SIZE", "40"))
+CHAT_SUMMARY_MAX_TOKENS = int(os.environ.get("CHAT_SUMMARY_MAX_TOKENS", "500"))
+
+# GET /chat/sessions/ page size (?limit= is capped at the maximum)
+CHAT_SESSIONS_PAGE_SIZE = int(os.environ.get("CHAT_SESSIONS_PAGE_SIZE", "50"))
+CHAT_SESSIONS_MAX_PAGE_SIZE = int(os.environ.get("CHAT_SESSIONS_MAX_PAGE_SIZE", "100"))
+
+# GET /activities/ page size (?limit= is capped at the maximum) and the event
+# summaries embedded per activity card
+ACTIVITY_PAGE_SIZE = int(os.environ.get("ACTIVITY_PAGE_SIZE", "50"))
+ACTIVITY_MAX_PAGE_SIZE = int(os.environ.get("ACTIVITY_MAX_PAGE_SIZE", "200"))
+ACTIVITY_RECENT_EVENTS = int(os.environ.get("ACTIVITY_RECENT_EVENTS", "3"))
+
+# activity.last_visit write-behind: seconds between batched flushes, and the
+# buffered visits that trigger an early flush
+ACTIVITY_VISIT_FLUSH_INTERVAL = float(
+    os.environ.get("ACTIVITY_VISIT_FLUSH_INTERVAL", "10")
+)
+ACTIVITY_VISIT_MAX_PENDING = int(os.environ.get("ACTIVITY_VISIT_MAX_PENDING", "5000"))
+
+# Most create + update + delete operations accepted by one events/batch/ request
+EVENT_BATCH_MAX_ITEMS = int(os.environ.get("EVENT_BATCH_MAX_ITEMS", "200"))
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
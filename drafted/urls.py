@@ -20,6 +20,7 @@ from django.urls import path, include, re_path
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 from rest_framework.permissions import AllowAny
+from utils.views import MetricsView
 
 schema_view = get_schema_view(
     openapi.Info(
@@ -40,6 +41,7 @@ urlpatterns = [
     path("activities/", include("activities.urls")),
     path("applications/", include("applications.urls")),
     path("chat/", include("chat.urls")),
+    path("metrics/", MetricsView.as_view(), name="metrics"),
     re_path(
         r"^swagger(?P<format>\.json|\.yaml)$",
         schema_view.without_ui(cache_timeout=0),
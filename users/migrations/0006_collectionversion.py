@@ -0,0 +1,107 @@
+# Generated by Django 5.2.4 on 2026-10-18 19:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_alter_profile_user_id_delete_supabaseuser'),
+        ('activities', '0012_activity_user_last_visit_idx'),
+        ('applications', '0005_questionlist_question_embedding'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CollectionVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('collection', models.TextField(choices=[('activities', 'Activities and events'), ('applications', 'Applications and questions')])),
+                ('version', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='users.profile')),
+            ],
+            options={
+                'db_table': 'collection_version',
+                'constraints': [models.UniqueConstraint(fields=('user', 'collection'), name='unique_collection_version')],
+            },
+        ),
+        # Bump the owner's collection version on every write, whichever
+        # path made it (PostgREST, the ORM, the embedding worker). SECURITY
+        # DEFINER so writes made under a user's RLS can still upsert the
+        # counter; events and questions are attributed through their parent.
+        migrations.RunSQL(
+            sql="""
+                CREATE OR REPLACE FUNCTION bump_collection_version(
+                    p_user_id text,
+                    p_collection text
+                )
+                RETURNS void
+                LANGUAGE sql
+                SECURITY DEFINER
+                SET search_path = public
+                AS $$
+                    INSERT INTO collection_version (user_id, collection, version, updated_at)
+                    SELECT p_user_id, p_collection, 1, now()
+                    WHERE EXISTS (SELECT 1 FROM profile WHERE user_id = p_user_id)
+                    ON CONFLICT (user_id, collection) DO UPDATE
+                    SET version = collection_version.version + 1,
+                        updated_at = now();
+                $$;
+
+                CREATE OR REPLACE FUNCTION collection_version_owner_changed()
+                RETURNS trigger
+                LANGUAGE plpgsql
+                SECURITY DEFINER
+                SET search_path = public
+                AS $$
+                DECLARE
+                    changed jsonb;
+                    owner text;
+                BEGIN
+                    changed := to_jsonb(CASE WHEN TG_OP = 'DELETE' THEN OLD ELSE NEW END);
+                    IF TG_TABLE_NAME IN ('activity', 'application') THEN
+                        owner := changed->>'user_id';
+                    ELSIF TG_TABLE_NAME = 'event' THEN
+                        SELECT user_id INTO owner FROM activity
+                        WHERE id = (changed->>'activity_id')::bigint;
+                    ELSE
+                        SELECT user_id INTO owner FROM application
+                        WHERE id = (changed->>'application_id')::bigint;
+                    END IF;
+
+                    -- A parent deleted in the same statement already bumped it
+                    IF owner IS NOT NULL THEN
+                        PERFORM bump_collection_version(owner, TG_ARGV[0]);
+                    END IF;
+                    RETURN NULL;
+                END;
+                $$;
+
+                CREATE TRIGGER activity_collection_version
+                AFTER INSERT OR UPDATE OR DELETE ON activity
+                FOR EACH ROW EXECUTE FUNCTION collection_version_owner_changed('activities');
+
+                CREATE TRIGGER event_collection_version
+                AFTER INSERT OR UPDATE OR DELETE ON event
+                FOR EACH ROW EXECUTE FUNCTION collection_version_owner_changed('activities');
+
+                CREATE TRIGGER application_collection_version
+                AFTER INSERT OR UPDATE OR DELETE ON application
+                FOR EACH ROW EXECUTE FUNCTION collection_version_owner_changed('applications');
+
+                CREATE TRIGGER question_list_collection_version
+                AFTER INSERT OR UPDATE OR DELETE ON question_list
+                FOR EACH ROW EXECUTE FUNCTION collection_version_owner_changed('applications');
+            """,
+            reverse_sql="""
+                DROP TRIGGER IF EXISTS activity_collection_version ON activity;
+                DROP TRIGGER IF EXISTS event_collection_version ON event;
+                DROP TRIGGER IF EXISTS application_collection_version ON application;
+                DROP TRIGGER IF EXISTS question_list_collection_version ON question_list;
+                DROP FUNCTION IF EXISTS collection_version_owner_changed();
+                DROP FUNCTION IF EXISTS bump_collection_version(text, text);
+            """,
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.4 on 2026-10-18 19:21
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_collectionversion'),
+    ]
+
+    operations = [
+        # The version functions are SECURITY DEFINER and only meant to run
+        # from the triggers (which execute them as their owner), so nobody
+        # may call them directly, e.g. through PostgREST /rpc. collection_version
+        # itself is readable only by its owner; the Django connection that
+        # serves the ETags owns the table and is not subject to RLS. The
+        # Supabase roles and auth schema are skipped where they don't exist.
+        migrations.RunSQL(
+            sql="""
+                REVOKE EXECUTE ON FUNCTION bump_collection_version(text, text) FROM PUBLIC;
+                REVOKE EXECUTE ON FUNCTION collection_version_owner_changed() FROM PUBLIC;
+                DO $$
+                BEGIN
+                    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'anon') THEN
+                        REVOKE EXECUTE ON FUNCTION bump_collection_version(text, text) FROM anon;
+                        REVOKE EXECUTE ON FUNCTION collection_version_owner_changed() FROM anon;
+                    END IF;
+                    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'authenticated') THEN
+                        REVOKE EXECUTE ON FUNCTION bump_collection_version(text, text) FROM authenticated;
+                        REVOKE EXECUTE ON FUNCTION collection_version_owner_changed() FROM authenticated;
+                    END IF;
+                END;
+                $$;
+
+                ALTER TABLE collection_version ENABLE ROW LEVEL SECURITY;
+                DO $$
+                BEGIN
+                    IF EXISTS (
+                        SELECT 1 FROM pg_proc p
+                        JOIN pg_namespace n ON n.oid = p.pronamespace
+                        WHERE n.nspname = 'auth' AND p.proname = 'uid'
+                    ) THEN
+                        CREATE POLICY collection_version_owner_select
+                        ON collection_version
+                        FOR SELECT
+                        USING (user_id = (SELECT auth.uid())::text);
+                    END IF;
+                END;
+                $$;
+            """,
+            reverse_sql="""
+                DROP POLICY IF EXISTS collection_version_owner_select ON collection_version;
+                ALTER TABLE collection_version DISABLE ROW LEVEL SECURITY;
+                GRANT EXECUTE ON FUNCTION bump_collection_version(text, text) TO PUBLIC;
+                GRANT EXECUTE ON FUNCTION collection_version_owner_changed() TO PUBLIC;
+            """,
+        ),
+    ]
@@ -13,3 +13,30 @@ class Profile(models.Model):
 
     class Meta:
         db_table = "profile"  # name of the table
+
+
+class CollectionVersion(models.Model):
+    """Per-user change counter for a collection of rows
+
+    Bumped by database triggers on every write to the collection's tables
+    (users migration 0006), so conditional GETs (utils/conditional.py) can
+    tell whether anything changed with one primary-key lookup.
+    """
+
+    COLLECTION_CHOICES = [
+        ("activities", "Activities and events"),
+        ("applications", "Applications and questions"),
+    ]
+
+    user = models.ForeignKey(Profile, on_delete=models.CASCADE)
+    collection = models.TextField(choices=COLLECTION_CHOICES)
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "collection_version"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "collection"], name="unique_collection_version"
+            )
+        ]
@@ -0,0 +1,89 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Thread-safe in-process LRU cache
+
+    Entries can expire after `ttl` seconds (or a per-entry ttl), and the
+    cache is bounded by entry count and/or by total size as measured by
+    `sizeof(value)`. Hits, misses, evictions and expirations are counted
+    for `stats()`.
+    """
+
+    def __init__(self, max_entries=None, max_bytes=None, ttl=None, sizeof=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof or (lambda value: 0)
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (value, size, expires_at)
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, _, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        size = self.sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            # Never fits; don't flush everything else trying to make room
+            self.invalidate(key)
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            expires_at = time.monotonic() + ttl if ttl is not None else None
+            self._entries[key] = (value, size, expires_at)
+            self._bytes += size
+            while (
+                self.max_entries is not None and len(self._entries) > self.max_entries
+            ) or (self.max_bytes is not None and self._bytes > self.max_bytes):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
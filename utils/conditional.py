@@ -0,0 +1,45 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+from users.models import CollectionVersion
+
+
+def collection_validators(request, user_id, collection):
+    """Weak ETag and Last-Modified for a read of one of the user's collections
+
+    The ETag combines the collection version (bumped by triggers on every
+    write) with the request path and query, since pages, projections and
+    detail views of the same collection have different bodies.
+    """
+    current = (
+        CollectionVersion.objects.filter(user_id=user_id, collection=collection)
+        .values_list("version", "updated_at")
+        .first()
+    )
+    version, updated_at = current or (0, None)
+    variant = hashlib.sha256(request.get_full_path().encode("utf-8")).hexdigest()
+    etag = f'W/"{collection}-{version}-{variant[:16]}"'
+    last_modified = int(updated_at.timestamp()) if updated_at else None
+    return etag, last_modified
+
+
+def not_modified_response(request, etag, last_modified):
+    """304 if the client's If-None-Match / If-Modified-Since still matches, else None"""
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is not None:
+        with_validators(response, etag, last_modified)
+    return response
+
+
+def with_validators(response, etag, last_modified):
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    # Per-user data: browsers may keep it but must revalidate every time
+    response["Cache-Control"] = "private, no-cache"
+    patch_vary_headers(response, ("Authorization",))
+    return response
@@ -0,0 +1,10 @@
+_providers = {}
+
+
+def register(name, provider):
+    """Expose `provider()` (a dict of counters) under `name` on /metrics/"""
+    _providers[name] = provider
+
+
+def snapshot():
+    return {name: provider() for name, provider in _providers.items()}
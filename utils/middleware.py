@@ -0,0 +1,30 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from utils.supabase_utils import AuthContext, _get_token
+
+
+class SupabaseAuthMiddleware:
+    """Parse the Authorization header once and attach request.auth_ctx
+
+    Works under both WSGI and ASGI; the permission class and the
+    utils.supabase_utils helpers read the context instead of re-decoding.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        request.auth_ctx = AuthContext(_get_token(request))
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        request.auth_ctx = AuthContext(_get_token(request))
+        return await self.get_response(request)
@@ -0,0 +1,66 @@
+import base64
+import json
+
+
+class InvalidPage(ValueError):
+    pass
+
+
+def encode_cursor(*values):
+    """Opaque cursor for the last row of a page (its sort key values)"""
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, size):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError) as e:
+        raise InvalidPage(str(e))
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidPage("Malformed cursor")
+    return values
+
+
+def page_limit(value, default, maximum):
+    """`?limit=` clamped to 1..maximum"""
+    if value in (None, ""):
+        return default
+    try:
+        return max(1, min(int(value), maximum))
+    except ValueError:
+        raise InvalidPage("limit must be an integer")
+
+
+def keyset_after(query, cursor, columns):
+    """Rows strictly after `cursor` for a query ordered by `columns` descending
+
+    For ("updated_at", "id") this adds
+    updated_at < v1 OR (updated_at = v1 AND id < v2) as one PostgREST or=
+    filter, so the page is read straight off the matching index.
+    """
+    if not cursor:
+        return query
+    values = decode_cursor(cursor, len(columns))
+    conditions = []
+    for index, column in enumerate(columns):
+        equal = [f"{col}.eq.{_quote(val)}" for col, val in zip(columns, values[:index])]
+        less = f"{column}.lt.{_quote(values[index])}"
+        conditions.append(f"and({','.join([*equal, less])})" if equal else less)
+    return query.or_(",".join(conditions))
+
+
+def paginate(rows, limit, columns):
+    """Trim a limit + 1 fetch to the page and build the next cursor"""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(*(rows[-1][column] for column in columns))
+
+
+def _quote(value):
+    # Timestamps contain ':' and '+', which must be quoted inside or=()
+    if value is None:
+        return "null"
+    return f'"{value}"' if isinstance(value, str) else str(value)
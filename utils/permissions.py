@@ -1,13 +1,26 @@
+from functools import wraps
+
+from django.http import JsonResponse
 from rest_framework.permissions import BasePermission
-from rest_framework.authentication import get_authorization_header
+
+from utils.supabase_utils import get_auth_context
 
 
 class IsSupabaseAuthenticated(BasePermission):
     def has_permission(self, request, view):
-        auth_header = get_authorization_header(request).decode("utf-8")
-        token = (
-            auth_header.replace("Bearer ", "")
-            if auth_header.startswith("Bearer ")
-            else None
-        )
-        return token is not None
+        return get_auth_context(request).token is not None
+
+
+def supabase_authenticated(view):
+    """IsSupabaseAuthenticated for plain async Django views (DRF has no async APIView)"""
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if not IsSupabaseAuthenticated().has_permission(request, None):
+            return JsonResponse(
+                {"detail": "Authentication credentials were not provided."},
+                status=403,
+            )
+        return await view(request, *args, **kwargs)
+
+    return wrapper
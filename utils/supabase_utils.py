@@ -1,34 +1,279 @@
-from supabase import create_client
+import asyncio
+import hashlib
+import threading
+import time
+import weakref
+
+import httpx
+from postgrest import AsyncPostgrestClient, SyncPostgrestClient
 from rest_framework.authentication import get_authorization_header
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 import jwt
 
+from utils import metrics
+from utils.cache import LRUCache
 
-def get_supabase_client(request):
-    """Create authenticated Supabase client"""
+
+def _get_token(request):
     auth_header = get_authorization_header(request).decode("utf-8")
-    token = (
+    return (
         auth_header.replace("Bearer ", "")
         if auth_header.startswith("Bearer ")
         else None
     )
 
-    supabase = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
-    if token:
-        supabase.postgrest.auth(token)
-    return supabase
 
+class _PoolStats:
+    """Counts requests against new TCP connections/TLS handshakes via httpcore traces"""
 
-def get_user_id_from_token(request):
-    auth_header = get_authorization_header(request).decode("utf-8")
-    token = (
-        auth_header.replace("Bearer ", "")
-        if auth_header.startswith("Bearer ")
-        else None
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+        self.tls_handshakes = 0
+        self.http2_responses = 0
+
+    def trace(self, name, info):
+        if name == "connection.connect_tcp.complete":
+            self._add("new_connections")
+        elif name == "connection.start_tls.complete":
+            self._add("tls_handshakes")
+
+    async def atrace(self, name, info):
+        self.trace(name, info)
+
+    def record(self, response):
+        self._add("requests")
+        if response.extensions.get("http_version") == b"HTTP/2":
+            self._add("http2_responses")
+
+    def stats(self):
+        with self._lock:
+            reused = max(self.requests - self.new_connections, 0)
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "tls_handshakes": self.tls_handshakes,
+                "reused": reused,
+                "reuse_rate": reused / self.requests if self.requests else 0.0,
+                "http2_responses": self.http2_responses,
+            }
+
+    def _add(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+
+_pool_stats = _PoolStats()
+metrics.register("supabase_pool", _pool_stats.stats)
+
+
+def _pool_limits():
+    return httpx.Limits(
+        max_connections=settings.SUPABASE_POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.SUPABASE_POOL_MAX_CONNECTIONS,
+        keepalive_expiry=settings.SUPABASE_POOL_KEEPALIVE_EXPIRY,
     )
 
-    if token:
+
+class _SharedTransport(httpx.BaseTransport):
+    """Process-wide keep-alive pool shared by every request's client
+
+    close() is a no-op so a per-request httpx.Client can't shut the pool down.
+    """
+
+    def __init__(self):
+        self._transport = httpx.HTTPTransport(
+            http2=settings.SUPABASE_HTTP2, limits=_pool_limits()
+        )
+
+    def handle_request(self, request):
+        request.extensions["trace"] = _pool_stats.trace
+        response = self._transport.handle_request(request)
+        _pool_stats.record(response)
+        return response
+
+    def close(self):
+        pass
+
+
+class _AsyncSharedTransport(httpx.AsyncBaseTransport):
+    """Async counterpart of _SharedTransport (one per event loop)"""
+
+    def __init__(self):
+        self._transport = httpx.AsyncHTTPTransport(
+            http2=settings.SUPABASE_HTTP2, limits=_pool_limits()
+        )
+
+    async def handle_async_request(self, request):
+        request.extensions["trace"] = _pool_stats.atrace
+        response = await self._transport.handle_async_request(request)
+        _pool_stats.record(response)
+        return response
+
+    async def aclose(self):
+        pass
+
+
+_transport = None
+_transport_lock = threading.Lock()
+# Async connections belong to the loop that opened them
+_async_transports = weakref.WeakKeyDictionary()
+
+
+def _shared_transport():
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = _SharedTransport()
+    return _transport
+
+
+def _async_shared_transport():
+    loop = asyncio.get_running_loop()
+    transport = _async_transports.get(loop)
+    if transport is None:
+        transport = _async_transports[loop] = _AsyncSharedTransport()
+    return transport
+
+
+def _headers(token, key=None):
+    # Same headers supabase-py sends; the user's JWT makes RLS apply to them
+    key = key or settings.SUPABASE_KEY
+    return {
+        "apiKey": key,
+        "Authorization": f"Bearer {token or key}",
+    }
+
+
+class SupabaseClient:
+    """Per-request PostgREST handle (table/rpc) over the shared connection pool
+
+    Only the headers are per request; the TCP/TLS/HTTP2 connections are
+    reused across requests instead of being set up by a new create_client().
+    """
+
+    def __init__(self, token=None, key=None):
+        self.postgrest = SyncPostgrestClient(
+            f"{settings.SUPABASE_URL}/rest/v1",
+            headers=_headers(token, key),
+            http_client=httpx.Client(
+                transport=_shared_transport(),
+                timeout=settings.SUPABASE_TIMEOUT,
+                follow_redirects=True,
+            ),
+        )
+
+    def table(self, table_name):
+        return self.postgrest.from_(table_name)
+
+    from_ = table
+
+    def rpc(self, fn, params=None, count=None, head=False, get=False):
+        return self.postgrest.rpc(fn, params or {}, count, head, get)
+
+
+class AsyncSupabaseClient(SupabaseClient):
+    """Async SupabaseClient; queries are awaited"""
+
+    def __init__(self, token=None, key=None):
+        self.postgrest = AsyncPostgrestClient(
+            f"{settings.SUPABASE_URL}/rest/v1",
+            headers=_headers(token, key),
+            http_client=httpx.AsyncClient(
+                transport=_async_shared_transport(),
+                timeout=settings.SUPABASE_TIMEOUT,
+                follow_redirects=True,
+            ),
+        )
+
+
+# Decoded tokens keyed by sha256(token); entries expire with the token
+_token_cache = LRUCache(max_entries=settings.AUTH_TOKEN_CACHE_ENTRIES)
+metrics.register("auth_token_cache", _token_cache.stats)
+
+
+def _decode_token(token):
+    """(user_id, exp) from a Supabase JWT, cached until the token expires"""
+    key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    claims = _token_cache.get(key)
+    if claims is None:
         # Decode without verification (Supabase RLS handles verification)
         payload = jwt.decode(token, options={"verify_signature": False})
-        return payload.get("sub")  # User ID from JWT
-    return None
+        claims = (payload.get("sub"), payload.get("exp"))
+        ttl = claims[1] - time.time() if claims[1] else None
+        if ttl is None or ttl > 0:
+            _token_cache.set(key, claims, ttl=ttl)
+    return claims
+
+
+class AuthContext:
+    """Auth state for one request, parsed once and attached as request.auth_ctx"""
+
+    def __init__(self, token):
+        self.token = token
+        self.user_id = None
+        self.expires_at = None
+        self.error = None
+        self._supabase = None
+        self._async_supabase = None
+        if token:
+            try:
+                self.user_id, self.expires_at = _decode_token(token)
+            except jwt.PyJWTError as e:
+                # Raised from get_user_id_from_token, where views used to hit it
+                self.error = e
+
+    @property
+    def supabase(self):
+        if self._supabase is None:
+            self._supabase = SupabaseClient(self.token)
+        return self._supabase
+
+    @property
+    def async_supabase(self):
+        if self._async_supabase is None:
+            self._async_supabase = AsyncSupabaseClient(self.token)
+        return self._async_supabase
+
+
+def get_auth_context(request):
+    """request.auth_ctx, built here if SupabaseAuthMiddleware didn't run"""
+    auth_ctx = getattr(request, "auth_ctx", None)
+    if auth_ctx is None:
+        auth_ctx = AuthContext(_get_token(request))
+        request.auth_ctx = auth_ctx
+    return auth_ctx
+
+
+def get_supabase_client(request):
+    """Create authenticated Supabase client"""
+    return get_auth_context(request).supabase
+
+
+async def get_async_supabase_client(request):
+    """Create authenticated async Supabase client"""
+    return get_auth_context(request).async_supabase
+
+
+def get_service_client():
+    """Supabase client with the service role key, for jobs that have no user JWT
+
+    SUPABASE_KEY is the anon key the web app sends with user JWTs; without a
+    JWT, RLS would hide every row from it, so background jobs need the
+    service role key, which bypasses RLS. They must filter by user themselves.
+    """
+    if not settings.SUPABASE_SERVICE_ROLE_KEY:
+        raise ImproperlyConfigured(
+            "DB_SERVICE_ROLE_KEY must be set for jobs that read without a user JWT"
+        )
+    return SupabaseClient(key=settings.SUPABASE_SERVICE_ROLE_KEY)
+
+
+def get_user_id_from_token(request):
+    auth_ctx = get_auth_context(request)
+    if auth_ctx.error is not None:
+        raise auth_ctx.error
+    return auth_ctx.user_id  # User ID from JWT
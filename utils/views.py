@@ -0,0 +1,17 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from drf_yasg.utils import swagger_auto_schema
+
+from utils.metrics import snapshot
+
+
+class MetricsView(APIView):
+    @swagger_auto_schema(
+        operation_summary="Process metrics",
+        operation_description="In-process cache and connection counters for this worker process",
+        responses={200: "Metrics snapshot"},
+        tags=["Metrics"],
+    )
+    def get(self, request):
+        return Response(snapshot(), status=status.HTTP_200_OK)